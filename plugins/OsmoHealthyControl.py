@@ -1,54 +1,63 @@
 import numpy as np
 
+from src.analysis.alignment import align_batch, aligned_mean
+from src.analysis.bootstrap import batch_bootstrap
 from src.base_classes.base_batch_plugin import BaseBatchPlugin
 
-from src.enums.enums import PluginType
+from src.enums.enums import AlignmentMode, PluginType
 from src.enums.plugin_decorators import plugin_type
 
 
 @plugin_type(PluginType.OSMO)
 class OsmoHealthControl(BaseBatchPlugin):
+    # band_k: half width of the reference band, in standard deviations
+    # alignment_mode: AlignmentMode (or its value) registering the curves to the batch mean,
+    # None draws them as measured
+    # bootstrap_resamples: resamples for the confidence band of the mean, 0 disables it
+    DEFAULT_PARAMETERS = {"band_k": 2.0, "alignment_mode": None, "bootstrap_resamples": 1000,
+                          "confidence": 0.95}
+
     @property
     def plugin_name(self):
         return "Osmo_hc"
 
-    lines = []
-
     def run_plugin(self, model):
         """Main entry point for the plugin."""
         self.set_model(model)
         self.create_composite_line_for_all_models()
-
-    def calculate_average_line(self):
-        """Calculate the average line for the given lines, normalizing them to the same number of points."""
-
-        # Find the maximum number of points across all lines (after normalization)
-        max_length = max(len(line[0]) for line in self.lines)
-
-        # Normalize the lines by interpolating them to the same length (max_length)
-        normalized_lines = []
-        for line in self.lines:
-            x, y = line  # O values and EI values
-            normalized_x = np.linspace(x.min(), x.max(), max_length)
-            normalized_y = np.interp(normalized_x, x, y)
-            normalized_lines.append((normalized_x, normalized_y))
-
-        # Calculate the average line by averaging the y-values at each x-point
-        avg_y = np.mean([y for _, y in normalized_lines], axis=0)
-
-        # Return the average line, using the normalized x-values
-        return normalized_lines[0][0], avg_y
+        if self.parameters["bootstrap_resamples"]:
+            self.create_mean_confidence_band()
 
     def create_composite_line_for_all_models(self):
         """Create a composite line element with separate lines for each model, and an average line."""
-
-        for model in self.model.models:
-            self.lines.append((model.O, model.EI))
-
-        self.add_composite_line_element(self.lines, label="Combined pO2 vs EI")
-
-        # Calculate the average line
-        avg_x, avg_y = self.calculate_average_line()
-
-        # Add the average line
+        # Average and band come from the batch's running statistics
+        statistics = self.model.reference_statistics()
+        mode = self.parameters["alignment_mode"]
+
+        if mode is None:
+            lines = [(model.O, model.EI) for model in self.model.selected_models()]
+            avg_x, avg_y = statistics.mean_curve()
+        else:
+            mode = AlignmentMode(mode)
+            lines = [(statistics.grid, result.values)
+                     for result in align_batch(self.model, mode).values()]
+            avg_x, avg_y = aligned_mean(self.model, mode)
+
+        self.add_composite_line_element(lines, label="Combined pO2 vs EI")
         self.add_line_element(avg_x, avg_y, label="Average pO2 vs EI")
+
+        k = self.parameters["band_k"]
+        band_x, lower, upper = statistics.band(k)
+        self.add_area_element(band_x, lower, upper, label=f"Mean ± {k:g} SD", key="sd_band")
+
+    def create_mean_confidence_band(self):
+        """Add the bootstrap confidence band of the average line and the parameter intervals."""
+        confidence = self.parameters["confidence"]
+        bands = batch_bootstrap(self.model, self.parameters["bootstrap_resamples"], confidence)
+
+        covered = ~np.isnan(bands.lower)
+        self.add_area_element(bands.grid[covered], bands.lower[covered], bands.upper[covered],
+                              label=f"Average {confidence:.0%} CI", key="mean_ci")
+        for key, (low, high) in bands.parameter_intervals.items():
+            self.add_scalar_result(f"{key}_ci_low", low)
+            self.add_scalar_result(f"{key}_ci_high", high)
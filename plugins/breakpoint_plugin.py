@@ -0,0 +1,67 @@
+from src.analysis import osmo_kernel
+from src.analysis.fitting_service import fitting_service
+from src.analysis.polynomial_fitting import adjust_fits, find_breaking_points
+from src.base_classes.base_plugin import BasePlugin
+
+from src.enums.enums import CurveType, PluginType
+from src.enums.plugin_decorators import plugin_type
+
+
+@plugin_type(PluginType.OSMO)
+class BreakpointPlugin(BasePlugin):
+    DEFAULT_PARAMETERS = {
+        "breakpoint_degree": 5,
+        "valley_degree": 2,
+        "bump_degree": 4,
+        "bump_end_fraction": 0.45,  # End of the bump fit as a fraction of the curve length
+        "points": 500,
+    }
+
+    @property
+    def plugin_name(self):
+        return "Breakpoint Plugin"
+
+    def run_plugin(self, model):
+        self.set_model(model)
+        o = self.model.O
+        ei = self.model.EI
+
+        parameters = osmo_kernel.calculate_model_parameters([self.model])
+        peak_idx = int(parameters["first_peak_idx"][0])
+        valley_idx = int(parameters["valley_idx"][0])
+        max_idx = int(parameters["max_idx"][0])
+        if valley_idx < 0:
+            raise ValueError("No prominent valley found.")
+
+        # Highest breaking point between the valley and EI max
+        breaking_idx = int(find_breaking_points(o, ei, [valley_idx], [max_idx],
+                                                self.parameters["breakpoint_degree"])[0])
+        if breaking_idx < 0:
+            raise ValueError("No breaking point found.")
+
+        bump_end_idx = int(len(o) * self.parameters["bump_end_fraction"])
+        if bump_end_idx <= breaking_idx:
+            raise ValueError("The bump segment ends before the breaking point.")
+
+        self.add_scalar_result("o_breaking_point", float(o[breaking_idx]), unit="mOsm/kg")
+        self.add_scalar_result("ei_breaking_point", float(ei[breaking_idx]))
+        self.add_point_element(o[breaking_idx], ei[breaking_idx],
+                               label=f"Breaking Point ({o[breaking_idx]}, {ei[breaking_idx]})",
+                               key="breaking_point", marker="x")
+
+        self.draw_adjusted_fit(peak_idx, breaking_idx, self.parameters["valley_degree"],
+                               CurveType.VALLEY)
+        self.draw_adjusted_fit(breaking_idx, bump_end_idx, self.parameters["bump_degree"],
+                               CurveType.BUMP)
+
+    def draw_adjusted_fit(self, lower_idx, upper_idx, degree, curve_type: CurveType):
+        """Fit the segment [lower_idx, upper_idx], adjust it for a bump or valley and draw it."""
+        o_segment = [self.model.O[lower_idx:upper_idx + 1]]
+        ei_segment = [self.model.EI[lower_idx:upper_idx + 1]]
+
+        fits = adjust_fits(o_segment, ei_segment,
+                           fitting_service.fit_curves(o_segment, ei_segment, degree), curve_type)
+        o_fit, ei_fit = fitting_service.evaluate_on_range(fits, self.parameters["points"])
+
+        self.add_line_element(o_fit[0], ei_fit[0], label=f"Degree {degree} {curve_type.value} fit",
+                              key=f"{curve_type.value}_fit")
@@ -0,0 +1,10 @@
+from src.base_classes.base_deviation_plugin import BaseDeviationPlugin
+from src.enums.enums import PluginType
+from src.enums.plugin_decorators import plugin_type
+
+
+@plugin_type(PluginType.OSMO)
+class OsmoDeviationPlugin(BaseDeviationPlugin):
+    @property
+    def plugin_name(self):
+        return "Osmo Deviation Plugin"
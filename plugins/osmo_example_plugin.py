@@ -1,6 +1,9 @@
 import numpy as np
-from scipy.signal import find_peaks
 
+from src.analysis import osmo_kernel
+from src.analysis.area_index import get_area_index, is_sorted
+from src.analysis.extremum_index import get_extremum_index
+from src.analysis.smoothing import SmoothingConfig
 from src.base_classes.base_plugin import BasePlugin
 
 from src.enums.enums import PluginType
@@ -9,34 +12,56 @@ from src.enums.plugin_decorators import plugin_type
 
 @plugin_type(PluginType.OSMO)
 class OsmoExamplePlugin(BasePlugin):
+    # Savitzky-Golay window for locating the first peak and valley, 0 uses raw EI
+    DEFAULT_PARAMETERS = {"peak_smoothing_window": 0}
+
     @property
     def plugin_name(self):
         return "Osmo Example Plugin"
 
+    @property
+    def smoothed_channels(self):
+        window = self.parameters["peak_smoothing_window"]
+        return [("EI", SmoothingConfig(window=window))] if window else []
+
     def run_plugin(self, model):
         self.set_model(model)
         o = self.model.O
         ei = self.model.EI
 
         # Calculate primary values
-        ei_max = self._calculate_ei_max_value(ei)
-        ei_hyper = self._calculate_ei_hyper_value(ei_max)
-
-        max_idx = self._get_o_idx_at_ei_max(ei, ei_max)
+        parameters = self._calculate_parameters(o, ei)
+        ei_max = float(parameters["ei_max"])
+        ei_hyper = float(parameters["ei_hyper"])
+        o_max = o[parameters["max_idx"]]
+        o_hyper = None if np.isnan(parameters["o_hyper"]) else float(parameters["o_hyper"])
 
-        o_max = o[max_idx]
-        o_hyper = self._calculate_o_hyper(o, ei, max_idx, ei_hyper)
-
-        first_peak_idx = self._find_prominent_peak(ei, max_idx)
-        o_first_peak = o[first_peak_idx]
-        ei_first_peak = ei[first_peak_idx]
+        if parameters["first_peak_idx"] < 0:
+            raise ValueError("No prominent peak found.")
+        o_first_peak = o[parameters["first_peak_idx"]]
+        ei_first_peak = ei[parameters["first_peak_idx"]]
 
-        min_idx = self._find_prominent_valley(ei, first_peak_idx, max_idx)
-        o_min = o[min_idx]
-        ei_min = ei[min_idx]
+        if parameters["valley_idx"] < 0:
+            raise ValueError("No prominent valley found.")
+        o_min = o[parameters["valley_idx"]]
+        ei_min = ei[parameters["valley_idx"]]
 
-        area, o_segment, ei_segment = self._calculate_area(o, ei, self.model.lower_limit,
-                                                           self.model.upper_limit)
+        if np.isnan(parameters["area"]):
+            raise ValueError("Not enough data points for area calculation.")
+        area = float(parameters["area"])
+        o_segment = o[parameters["lower_idx"]:parameters["upper_idx"]]
+        ei_segment = ei[parameters["lower_idx"]:parameters["upper_idx"]]
+
+        # Record numeric results
+        self.add_scalar_result("ei_max", ei_max)
+        self.add_scalar_result("ei_hyper", ei_hyper)
+        self.add_scalar_result("o_max", float(o_max), unit="mOsm/kg")
+        self.add_scalar_result("o_hyper", o_hyper, unit="mOsm/kg")
+        self.add_scalar_result("o_first_peak", float(o_first_peak), unit="mOsm/kg")
+        self.add_scalar_result("ei_first_peak", float(ei_first_peak))
+        self.add_scalar_result("o_min", float(o_min), unit="mOsm/kg")
+        self.add_scalar_result("ei_min", float(ei_min))
+        self.add_scalar_result("area", area)
 
         # Draw elements
         self.draw_raw(o, ei)
@@ -52,82 +77,34 @@ class OsmoExamplePlugin(BasePlugin):
 
     # Draw EI max
     def draw_ei_max(self, o_max, ei_max):
-        self.add_point_element(o_max, ei_max, label=f"EI max - {ei_max}")
+        self.add_point_element(o_max, ei_max, label=f"EI max - {ei_max}", key="ei_max")
 
     # Draw hyper point
     def draw_hyper(self, o_hyper, ei_hyper):
-        self.add_point_element(o_hyper, ei_hyper, label=f"Hyper - {ei_hyper}")
+        self.add_point_element(o_hyper, ei_hyper, label=f"Hyper - {ei_hyper}", key="hyper")
 
     # Draw first prominent peak
     def draw_first_peak(self, o_first_peak, ei_first_peak):
-        self.add_point_element(o_first_peak, ei_first_peak, label=f"First Peak - {ei_first_peak}")
+        self.add_point_element(o_first_peak, ei_first_peak, label=f"First Peak - {ei_first_peak}",
+                               key="first_peak")
 
     # Draw valley
     def draw_valley(self, o_min, ei_min):
-        self.add_point_element(o_min, ei_min, label=f"Valley - {ei_min}")
+        self.add_point_element(o_min, ei_min, label=f"Valley - {ei_min}", key="valley")
 
     # Draw area between limits
     def draw_area(self, o_segment, ei_segment, area):
         y2 = np.zeros_like(ei_segment)
-        self.add_area_element(o_segment, ei_segment, y2, label=f"Area: {area:.2f}")
-
-    @staticmethod
-    def _calculate_ei_max_value(ei_data: np.ndarray) -> float:
-        return float(np.max(ei_data))
-
-    @staticmethod
-    def _calculate_ei_hyper_value(ei_max: float) -> float:
-        return ei_max / 2
-
-    @staticmethod
-    def _get_o_idx_at_ei_max(ei_data: np.ndarray, ei_max: float) -> int:
-        indices = np.nonzero(ei_data == ei_max)[0]
-        center_idx = indices[len(indices) // 2]
-        return int(center_idx)
-
-    def _calculate_o_hyper(self, o_data: np.ndarray, ei_data: np.ndarray, o_max_idx: int,
-                           ei_hyper: float) -> float | None:
-        relevant_o = o_data[o_max_idx:]
-        relevant_ei = ei_data[o_max_idx:]
-
-        for i, ei_value in enumerate(relevant_ei):
-            if ei_value == ei_hyper:
-                return float(relevant_o[i])
-            elif ei_value < ei_hyper:
-                return self._interpolate_two_points(ei_hyper, relevant_ei[i - 1], relevant_o[i - 1],
-                                                    relevant_ei[i], relevant_o[i])
-        return None
-
-    @staticmethod
-    def _interpolate_two_points(value, x1, y1, x2, y2) -> float:
-        return y1 + (y2 - y1) * (value - x1) / (x2 - x1)
-
-    @staticmethod
-    def _find_prominent_peak(ei_data: np.ndarray, o_max_idx: int) -> int:
-        peaks, properties = find_peaks(ei_data[:o_max_idx], prominence=0)
-        if not peaks.size:
-            raise ValueError("No prominent peak found.")
-        return peaks[np.argmax(properties['prominences'])]
-
-    @staticmethod
-    def _find_prominent_valley(ei_data: np.ndarray, first_peak_idx: int, o_max_idx: int) -> int:
-        filtered_ei = -ei_data[first_peak_idx:o_max_idx]
-        peaks, properties = find_peaks(filtered_ei, prominence=0)
-        if not peaks.size:
-            raise ValueError("No prominent valley found.")
-        return first_peak_idx + peaks[np.argmax(properties['prominences'])]
-
-    @staticmethod
-    def _calculate_area(o_data: np.ndarray, ei_data: np.ndarray, lower_limit: int,
-                        upper_limit: int) -> tuple[float, np.ndarray, np.ndarray]:
-        lower_idx = np.searchsorted(o_data, lower_limit, side='left')
-        upper_idx = np.searchsorted(o_data, upper_limit, side='right')
-
-        o_segment = o_data[lower_idx:upper_idx]
-        ei_segment = ei_data[lower_idx:upper_idx]
-
-        if len(o_segment) < 2:
-            raise ValueError("Not enough data points for area calculation.")
-
-        area = np.trapz(ei_segment, o_segment)
-        return area, o_segment, ei_segment
+        self.add_area_element(o_segment, ei_segment, y2, label=f"Area: {area:.2f}", key="area")
+
+    def _calculate_parameters(self, o_data: np.ndarray, ei_data: np.ndarray) -> dict:
+        """Run the batched Osmoscan kernel on the current model and unpack the single row."""
+        config = next((config for channel, config in self.smoothed_channels), None)
+        parameters = osmo_kernel.calculate_parameters(
+            [o_data], [ei_data],
+            [self.model.metadata.get("lower_limit", np.nan)],
+            [self.model.metadata.get("upper_limit", np.nan)],
+            [get_extremum_index(self.model, "EI", config)],
+            [get_area_index(self.model)] if is_sorted(self.model) else None,
+        )
+        return {key: values[0] for key, values in parameters.items()}
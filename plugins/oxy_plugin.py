@@ -1,11 +1,14 @@
 import numpy as np
 
+from src.analysis import oxy_kernel
 from src.base_classes.base_plugin import BasePlugin
 from src.enums.enums import PluginType
 from src.enums.plugin_decorators import plugin_type
 
 @plugin_type(PluginType.OXY)
 class OxyPlugin(BasePlugin):
+    DEFAULT_PARAMETERS = {"pos_fraction": oxy_kernel.DEFAULT_POS_FRACTION}
+
     @property
     def plugin_name(self):
         return "OxyPlugin"
@@ -14,15 +17,38 @@ class OxyPlugin(BasePlugin):
         """Main entry point for the plugin."""
         self.set_model(model)
         self.raw_po2_vs_ei()
+        parameters = self.oxygenscan_parameters()
         self.calculate_sum_a_b()
         self.raw_t_vs_ei()
-        self.raw_t_vs_po2()
+        self.raw_t_vs_po2(parameters)
 
     def raw_po2_vs_ei(self):
         po2 = self.model.pO2
         ei = self.model.EI
         self.add_line_element(po2, ei, label=f"pO2 vs EI({self.model.name})")
 
+    def oxygenscan_parameters(self) -> dict[str, float]:
+        """Calculate the Oxygenscan parameters, record them and mark them on pO2 vs EI."""
+        parameters = oxy_kernel.calculate_model_parameters(
+            [self.model], pos_fraction=self.parameters["pos_fraction"])
+        parameters = {key: float(values[0]) for key, values in parameters.items()}
+
+        self.add_scalar_result("ei_max", parameters["ei_max"])
+        self.add_scalar_result("ei_min", parameters["ei_min"])
+        self.add_scalar_result("delta_ei", parameters["delta_ei"])
+        self.add_scalar_result("pos", parameters["pos"], unit="mmHg")
+        self.add_scalar_result("min_po2", parameters["min_po2"], unit="mmHg")
+        self.add_scalar_result("t_min_po2", parameters["t_min_po2"], unit="s")
+
+        self.add_point_element(parameters["po2_ei_max"], parameters["ei_max"],
+                               label=f"EI max: {parameters['ei_max']:.3f}", key="ei_max")
+        self.add_point_element(parameters["po2_ei_min"], parameters["ei_min"],
+                               label=f"EI min: {parameters['ei_min']:.3f}", key="ei_min")
+        if not np.isnan(parameters["pos"]):
+            self.add_point_element(parameters["pos"], parameters["pos_ei"],
+                                   label=f"PoS: {parameters['pos']:.2f}", key="pos")
+        return parameters
+
     def calculate_sum_a_b(self):
         """Fetch A and B, compute their sum, and visualize it."""
         a = self.model.A  # Fetch A
@@ -38,14 +64,10 @@ class OxyPlugin(BasePlugin):
         ei = self.model.EI
         self.add_line_element(t, ei, label=f"EI({self.model.name})")  # Set y-axis limits
 
-    def raw_t_vs_po2(self):
-        po2 = self.model.pO2
-        t = self.model.t
-
-        # Find the index of the minimum PO2 value
-        min_index = np.argmin(po2)
-        min_t = t[min_index]  # Corresponding T value
-        min_po2 = po2[min_index]  # Minimum PO2 value
+    def raw_t_vs_po2(self, parameters):
+        min_t = parameters["t_min_po2"]  # Time of the minimum pO2
+        min_po2 = parameters["min_po2"]  # Minimum PO2 value
 
         # Add a red dot at the min(pO2) point
-        self.add_line_element([min_t], [min_po2], label=f"Min pO2: {min_po2:.2f}", color="red", marker="o", linestyle="None")
\ No newline at end of file
+        self.add_line_element([min_t], [min_po2], label=f"Min pO2: {min_po2:.2f}", key="min_po2",
+                              color="red", marker="o", linestyle="None")
\ No newline at end of file
@@ -1,12 +1,17 @@
-from numpy import polyfit, polyval, linspace
+import numpy as np
+
+from src.analysis.fitting_service import fitting_service
 from src.base_classes.base_plugin import BasePlugin
+from src.base_classes.sweepable_plugin import SweepablePlugin
 
-from src.enums.enums import PluginType
+from src.enums.enums import PluginType, PolynomialBasis
 from src.enums.plugin_decorators import plugin_type
 
 
 @plugin_type(PluginType.OSMO)
-class PolynomialPlugin(BasePlugin):
+class PolynomialPlugin(BasePlugin, SweepablePlugin):
+    DEFAULT_PARAMETERS = {"degree": 8, "points": 500, "basis": PolynomialBasis.CHEBYSHEV.value}
+
     @property
     def plugin_name(self):
         return "Polynomial Plugin"
@@ -17,17 +22,29 @@ class PolynomialPlugin(BasePlugin):
 
         self._polynomial_curve()
 
+    def _fit(self, model):
+        return fitting_service.fit(model.O, model.EI, self.parameters["degree"],
+                                   PolynomialBasis(self.parameters["basis"]))
+
+    def score(self, model):
+        """Return the goodness of fit of the polynomial on the model's raw data."""
+        residuals = model.EI - self._fit(model).evaluate(model.O)[0]
+
+        rss = float(np.sum(residuals ** 2))
+        tss = float(np.sum((model.EI - np.mean(model.EI)) ** 2))
+        return {
+            "rss": rss,
+            "rmse": float(np.sqrt(rss / len(residuals))),
+            "r2": 1 - rss / tss if tss else float("nan"),
+        }
+
     def _polynomial_curve(self):
         """Generate and plot a polynomial curve based on the model's data."""
-        raw_o_range = self.model.O
-        raw_ei_range = self.model.EI
-
-        # Fit a polynomial to the data (degree 3, as an example)
-        degree = 8
-        coefficients = polyfit(raw_o_range, raw_ei_range, degree)
+        # Coefficients refer to the basis on O scaled to [-1, 1] over the model's O range
+        fit = self._fit(self.model)
+        self.add_vector_result("coefficients", fit.coefficients[0])
 
         # Generate a smooth curve using the polynomial
-        smooth_o = linspace(min(raw_o_range), max(raw_o_range), 500)
-        smooth_ei = polyval(coefficients, smooth_o)
+        smooth_o, smooth_ei = fitting_service.evaluate_on_range(fit, self.parameters["points"])
 
-        self.add_line_element(smooth_o, smooth_ei, label="Polynomial O vs EI")
+        self.add_line_element(smooth_o[0], smooth_ei[0], label="Polynomial O vs EI")
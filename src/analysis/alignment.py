@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+
+from src.analysis.resampling import extract_curve
+from src.enums.enums import AlignmentMode
+
+DEFAULT_MAX_SHIFT_FRACTION = 0.1  # Largest shift tried, as a fraction of the grid span
+DEFAULT_BAND_FRACTION = 0.1  # DTW band half width, as a fraction of the grid length
+MIN_OVERLAP_FRACTION = 0.5  # Shifts leaving less overlap with the reference are rejected
+
+
+@dataclass(frozen=True)
+class AlignmentReference:
+    """
+    Curve to align against.
+
+    `key` identifies the reference in the alignment cache and `version` its revision;
+    results against older versions of a reference are dropped from the cache.
+    """
+    key: Hashable
+    grid: np.ndarray
+    values: np.ndarray
+    version: Hashable = None
+
+
+@dataclass
+class AlignmentResult:
+    """A curve registered to a reference, resampled onto the reference grid."""
+    values: np.ndarray  # Aligned curve on the reference grid, NaN where it is undefined
+    cost: float  # Mean squared difference to the reference after alignment
+    shift: float = np.nan  # O (or pO2) offset added to the curve, shift mode only
+    path: Optional[np.ndarray] = None  # (curve index, reference index) pairs, DTW mode only
+
+
+def shift_candidates(x: np.ndarray, y: np.ndarray, grid: np.ndarray,
+                     shifts: np.ndarray) -> np.ndarray:
+    """The curve shifted by every candidate, resampled onto the grid: shape (shifts, grid)."""
+    positions = grid[None, :] - shifts[:, None]
+    return np.interp(positions.ravel(), x, y, left=np.nan, right=np.nan).reshape(positions.shape)
+
+
+def align_shift(x: np.ndarray, y: np.ndarray, reference: AlignmentReference,
+                max_shift: Optional[float] = None, step: Optional[float] = None) -> AlignmentResult:
+    """
+    Find the constant x offset that best registers a curve to the reference.
+
+    All candidate shifts are evaluated in one (shifts, grid) array; the cost of a shift
+    is the mean squared difference over the points where both curves are defined.
+    """
+    grid = reference.grid
+    if max_shift is None:
+        max_shift = DEFAULT_MAX_SHIFT_FRACTION * (grid[-1] - grid[0])
+    if step is None:
+        step = grid[1] - grid[0]
+    shifts = np.arange(-max_shift, max_shift + step / 2, step)
+
+    candidates = shift_candidates(x, y, grid, shifts)
+    squared = (candidates - reference.values) ** 2
+    overlap = np.sum(~np.isnan(squared), axis=1)
+    with np.errstate(invalid="ignore"):
+        costs = np.where(overlap >= MIN_OVERLAP_FRACTION * np.sum(~np.isnan(reference.values)),
+                         np.nansum(squared, axis=1) / np.maximum(overlap, 1), np.inf)
+
+    best = int(np.argmin(costs))
+    return AlignmentResult(values=candidates[best], cost=float(costs[best]),
+                           shift=float(shifts[best]))
+
+
+def _covered(values: np.ndarray) -> np.ndarray:
+    """Indices of the non-NaN entries."""
+    return np.nonzero(~np.isnan(values))[0]
+
+
+def dtw_path(a: np.ndarray, b: np.ndarray, band: int) -> tuple[np.ndarray, float]:
+    """
+    Banded dynamic time warping between two sequences.
+
+    The accumulated cost matrix is filled one anti-diagonal at a time, since every cell
+    of a diagonal only depends on the two previous diagonals. The band keeps cells
+    within `band` samples of the (length-normalized) main diagonal.
+
+    Returns:
+        (path as an (L, 2) array of (a index, b index) pairs, total squared cost).
+    """
+    n, m = len(a), len(b)
+    ratio = (n - 1) / max(m - 1, 1)
+    band = max(band, ratio, 1)  # Narrower bands could disconnect the path
+    accumulated = np.full((n + 1, m + 1), np.inf)
+    accumulated[0, 0] = 0.0
+
+    for d in range(n + m - 1):
+        i = np.arange(max(0, d - m + 1), min(n - 1, d) + 1)
+        j = d - i
+        inside = np.abs(i - j * ratio) <= band
+        i, j = i[inside], j[inside]
+        if not i.size:
+            continue
+        previous = np.minimum(np.minimum(accumulated[i, j + 1], accumulated[i + 1, j]),
+                              accumulated[i, j])
+        accumulated[i + 1, j + 1] = (a[i] - b[j]) ** 2 + previous
+
+    # Backtrack from the end to the start
+    i, j = n, m
+    path = []
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        steps = (accumulated[i - 1, j - 1], accumulated[i - 1, j], accumulated[i, j - 1])
+        move = int(np.argmin(steps))
+        if move == 0:
+            i, j = i - 1, j - 1
+        elif move == 1:
+            i -= 1
+        else:
+            j -= 1
+    return np.array(path[::-1], dtype=int).reshape(-1, 2), float(accumulated[n, m])
+
+
+def align_dtw(x: np.ndarray, y: np.ndarray, reference: AlignmentReference,
+              band: Optional[int] = None) -> AlignmentResult:
+    """
+    Warp a curve onto the reference with banded DTW over their covered grid ranges.
+
+    Reference points matched to several curve points take the mean of those points.
+    """
+    grid = reference.grid
+    curve = np.interp(grid, x, y, left=np.nan, right=np.nan)
+    curve_idx, reference_idx = _covered(curve), _covered(reference.values)
+    if band is None:
+        band = max(int(DEFAULT_BAND_FRACTION * len(grid)), 1)
+
+    path, cost = dtw_path(curve[curve_idx], reference.values[reference_idx], band)
+    sums = np.bincount(path[:, 1], weights=curve[curve_idx][path[:, 0]],
+                       minlength=len(reference_idx))
+    counts = np.bincount(path[:, 1], minlength=len(reference_idx))
+
+    values = np.full(len(grid), np.nan)
+    values[reference_idx] = sums / np.maximum(counts, 1)
+    return AlignmentResult(values=values, cost=cost / max(len(path), 1),
+                           path=np.column_stack([curve_idx[path[:, 0]],
+                                                 reference_idx[path[:, 1]]]))
+
+
+def align(x: np.ndarray, y: np.ndarray, reference: AlignmentReference,
+          mode: AlignmentMode = AlignmentMode.SHIFT, **options) -> AlignmentResult:
+    """Register a curve to a reference with the given mode."""
+    if np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    if mode == AlignmentMode.SHIFT:
+        return align_shift(x, y, reference, **options)
+    if mode == AlignmentMode.DTW:
+        return align_dtw(x, y, reference, **options)
+    raise ValueError(f"Unsupported alignment mode: {mode}")
+
+
+def align_model(model, reference: AlignmentReference, mode: AlignmentMode = AlignmentMode.SHIFT,
+                **options) -> AlignmentResult:
+    """Align a model's curve to the reference, cached on the model per reference and mode."""
+    key = ("aligned", reference.key, reference.version, mode, tuple(sorted(options.items())))
+    if key not in model.cache:
+        # Only the current version of the reference is worth keeping
+        for stale in [cached for cached in model.cache if cached[:2] == key[:2]
+                      and cached[2] != reference.version]:
+            del model.cache[stale]
+        model.cache[key] = align(*extract_curve(model), reference, mode, **options)
+    return model.cache[key]
+
+
+def batch_reference(batch) -> AlignmentReference:
+    """The running mean of a batch as a reference; a new version is used after every change."""
+    statistics = batch.reference_statistics()
+    values = np.where(statistics.count > 0, statistics.mean, np.nan)
+    return AlignmentReference(key=("batch_mean", batch.id), grid=statistics.grid, values=values,
+                              version=statistics.version)
+
+
+def align_batch(batch, mode: AlignmentMode = AlignmentMode.SHIFT,
+                **options) -> dict[str, AlignmentResult]:
+    """Align every selected member of a batch against the batch mean, by model ID."""
+    reference = batch_reference(batch)
+    return {model.id: align_model(model, reference, mode, **options)
+            for model in batch.selected_models()}
+
+
+def aligned_mean(batch, mode: AlignmentMode = AlignmentMode.SHIFT,
+                 **options) -> tuple[np.ndarray, np.ndarray]:
+    """Grid and mean of the aligned selected members of a batch."""
+    results = align_batch(batch, mode, **options)
+    grid = batch.reference_statistics().grid
+    values = np.array([result.values for result in results.values()]).reshape(-1, len(grid))
+    counts = np.sum(~np.isnan(values), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return grid, np.where(counts > 0, np.nansum(values, axis=0) / counts, np.nan)
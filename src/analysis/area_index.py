@@ -0,0 +1,91 @@
+import numpy as np
+
+from src.utils.data_validator import DataValidator
+
+
+class AreaIndex:
+    """
+    Cumulative trapezoidal integral of y over a non-decreasing x axis.
+
+    Built once per curve in O(n); the area between any two limits is then a binary
+    search plus a difference of two prefix values. Both query methods accept scalars
+    or arrays of limit pairs.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if len(self.x) != len(self.y):
+            raise ValueError("x and y must have the same length.")
+        if not DataValidator.is_sorted(self.x):
+            raise ValueError("x must be sorted in non-decreasing order.")
+        self.cumulative = np.concatenate([[0.0], np.cumsum(np.diff(self.x)
+                                                           * (self.y[1:] + self.y[:-1]) / 2.0)])
+
+    def sample_bounds(self, lower, upper) -> tuple[np.ndarray, np.ndarray]:
+        """Slice bounds [lower_idx, upper_idx) of the samples with lower <= x <= upper."""
+        return (np.searchsorted(self.x, lower, side="left"),
+                np.searchsorted(self.x, upper, side="right"))
+
+    def areas(self, lower, upper) -> np.ndarray:
+        """
+        Area over the samples inside [lower, upper], as np.trapz on that slice would give.
+
+        Limit pairs selecting fewer than two samples have a NaN area.
+        """
+        lower_idx, upper_idx = self.sample_bounds(lower, upper)
+        enough = upper_idx - lower_idx >= 2
+        last = np.where(enough, upper_idx - 1, 0)
+        first = np.where(enough, lower_idx, 0)
+        return np.where(enough, self.cumulative[last] - self.cumulative[first], np.nan)
+
+    def integral_to(self, limits) -> np.ndarray:
+        """Integral from x[0] to each limit, interpolating y linearly inside a sample interval."""
+        limits = np.clip(np.asarray(limits, dtype=float), self.x[0], self.x[-1])
+        k = np.clip(np.searchsorted(self.x, limits, side="right") - 1, 0, len(self.x) - 2)
+        dx = self.x[k + 1] - self.x[k]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y_limit = np.where(dx > 0, self.y[k] + (self.y[k + 1] - self.y[k])
+                               * (limits - self.x[k]) / dx, self.y[k])
+        return self.cumulative[k] + (limits - self.x[k]) * (self.y[k] + y_limit) / 2.0
+
+    def interpolated_areas(self, lower, upper) -> np.ndarray:
+        """Exact area between the limits (clipped to the x range), interpolating both ends."""
+        if len(self.x) < 2:
+            return np.full(np.shape(lower), np.nan)
+        return self.integral_to(upper) - self.integral_to(lower)
+
+
+def is_sorted(model, channel: str = "O.") -> bool:
+    """Whether a channel is non-decreasing; recorded at load, computed on first use otherwise."""
+    key = ("sorted", channel)
+    if key not in model.cache:
+        model.cache[key] = DataValidator.is_sorted(model.data[channel])
+    return model.cache[key]
+
+
+def get_area_index(model, x_channel: str = "O.", y_channel: str = "EI") -> AreaIndex:
+    """Return the area index of a model, cached on the model. Raises if x is not sorted."""
+    key = ("area_index", x_channel, y_channel)
+    if key not in model.cache:
+        if not is_sorted(model, x_channel):
+            raise ValueError(f"{x_channel} of model {model.name} is not sorted.")
+        model.cache[key] = AreaIndex(model.data[x_channel], model.data[y_channel])
+    return model.cache[key]
+
+
+def model_areas(models, lower_limits, upper_limits, interpolated: bool = False) -> np.ndarray:
+    """
+    Areas of every model for every limit pair, shape (len(models), len(limit pairs)).
+
+    Limits may be 1-D (the same pairs for every model) or 2-D with one row per model.
+    """
+    lower = np.broadcast_to(np.asarray(lower_limits, dtype=float),
+                            (len(models),) + np.shape(lower_limits)[-1:])
+    upper = np.broadcast_to(np.asarray(upper_limits, dtype=float), lower.shape)
+    areas = np.empty(lower.shape)
+    for row, model in enumerate(models):
+        index = get_area_index(model)
+        query = index.interpolated_areas if interpolated else index.areas
+        areas[row] = query(lower[row], upper[row])
+    return areas
@@ -0,0 +1,112 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.analysis.features import parameter_features, parameter_keys
+from src.analysis.resampling import resample_models
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+CHUNK_SIZE = 250  # Resamples drawn per index matrix
+PARALLEL_RESAMPLES = 5000  # From this many resamples on, chunks run in a process pool
+
+
+@dataclass
+class BootstrapBands:
+    """Percentile bootstrap confidence intervals for a batch mean curve and its parameters."""
+    grid: np.ndarray
+    lower: np.ndarray  # Lower bound of the mean curve, NaN where no member covers the grid
+    upper: np.ndarray
+    parameter_intervals: dict[str, tuple[float, float]]  # Interval of each parameter's mean
+    resamples: int
+    confidence: float
+
+
+def resample_counts(rng: np.random.Generator, n: int, size: int) -> np.ndarray:
+    """How often each of n members is drawn in `size` resamples with replacement: (size, n)."""
+    indices = rng.integers(0, n, size=(size, n))
+    # One bincount over the flattened (resample, member) cells
+    flat = (np.arange(size)[:, None] * n + indices).ravel()
+    return np.bincount(flat, minlength=size * n).reshape(size, n).astype(float)
+
+
+def weighted_means(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Mean of the non-NaN values (rows = members) for every row of counts, as matrix products."""
+    valid = ~np.isnan(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (counts @ np.where(valid, values, 0.0)) / (counts @ valid)
+
+
+def bootstrap_chunk(values: np.ndarray, size: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Means of `size` bootstrap resamples of the member rows of values: (size, columns)."""
+    rng = np.random.default_rng(seed)
+    return weighted_means(resample_counts(rng, len(values), size), values)
+
+
+def bootstrap_means(values: np.ndarray, resamples: int = DEFAULT_RESAMPLES, seed=None,
+                    max_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Bootstrap distribution of the column means of values (rows = members).
+
+    Resamples are drawn in chunks of index matrices, each with its own child seed, so
+    the result only depends on the seed, whether the chunks run in this process or,
+    for large resample counts, in a process pool.
+    """
+    sizes = [min(CHUNK_SIZE, resamples - start) for start in range(0, resamples, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if resamples >= PARALLEL_RESAMPLES and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(bootstrap_chunk, [values] * len(sizes), sizes, seeds))
+    else:
+        chunks = [bootstrap_chunk(values, size, chunk_seed)
+                  for size, chunk_seed in zip(sizes, seeds)]
+    return np.vstack(chunks)
+
+
+def percentile_interval(samples: np.ndarray, confidence: float) -> tuple[np.ndarray, np.ndarray]:
+    """Lower and upper percentile bounds along the first axis, ignoring NaN."""
+    tail = 100 * (1 - confidence) / 2
+    all_nan = np.all(np.isnan(samples), axis=0)
+    filled = np.where(all_nan, 0.0, samples)
+    lower, upper = np.nanpercentile(filled, [tail, 100 - tail], axis=0)
+    return np.where(all_nan, np.nan, lower), np.where(all_nan, np.nan, upper)
+
+
+def batch_bootstrap(batch, resamples: int = DEFAULT_RESAMPLES,
+                    confidence: float = DEFAULT_CONFIDENCE, seed: int = 0,
+                    max_workers: Optional[int] = None) -> BootstrapBands:
+    """
+    Bootstrap confidence bands for the mean curve and key parameters of a batch.
+
+    Uses the selected members on the batch's reference grid. Cached on the batch per
+    statistics version, so the bands are recomputed only after the members change.
+    """
+    statistics = batch.reference_statistics()
+    key = ("bootstrap", statistics.version, resamples, confidence, seed)
+    if key in batch.cache:
+        return batch.cache[key]
+
+    models = batch.selected_models()
+    if not models:
+        raise ValueError(f"Batch {batch.name} has no selected models.")
+    curves = resample_models(models, statistics.grid)
+    parameters = parameter_features(models)
+
+    # Curves and parameters share the resamples
+    means = bootstrap_means(np.hstack([curves, parameters]), resamples, seed, max_workers)
+    lower, upper = percentile_interval(means, confidence)
+
+    grid_size = len(statistics.grid)
+    intervals = {name: (float(lower[grid_size + column]), float(upper[grid_size + column]))
+                 for column, name in enumerate(parameter_keys(models[0]))}
+    bands = BootstrapBands(grid=statistics.grid, lower=lower[:grid_size], upper=upper[:grid_size],
+                           parameter_intervals=intervals, resamples=resamples,
+                           confidence=confidence)
+
+    # Only the current version is worth keeping
+    batch.cache = {k: v for k, v in batch.cache.items() if k[0] != "bootstrap"}
+    batch.cache[key] = bands
+    return bands
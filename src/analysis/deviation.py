@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.analysis.resampling import resample_models
+
+DEFAULT_BAND_K = 2.0
+
+
+@dataclass
+class DeviationResult:
+    """Deviation of one curve from a reference band, on the reference grid."""
+    grid: np.ndarray
+    values: np.ndarray  # Curve on the grid
+    z_scores: np.ndarray  # (curve - mean) / SD, NaN where undefined
+    lower: np.ndarray  # Band edges, mean -/+ k * SD
+    upper: np.ndarray
+    integrated_deviation: float  # Integral of |z| over the grid
+    max_abs_z: float
+    fraction_outside: float  # Fraction of the compared grid points outside the band
+    regions: list[tuple[int, int, bool]]  # [start, stop) grid slices outside the band, above?
+
+
+def z_scores(curves: np.ndarray, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+    """Pointwise z-scores of every curve (rows) against the reference mean and SD."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, (curves - mean) / std, np.nan)
+
+
+def integrated_deviations(grid: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Trapezoidal integral of |z| of every row, over intervals with z defined at both ends."""
+    absolute = np.abs(z)
+    terms = np.diff(grid) * (absolute[:, 1:] + absolute[:, :-1]) / 2.0
+    return np.nansum(terms, axis=1)
+
+
+def outside_regions(outside: np.ndarray, above: np.ndarray) -> list[list[tuple[int, int, bool]]]:
+    """Runs of consecutive outside points of every row as (start, stop, above) slices."""
+    state = np.where(outside, np.where(above, 1, -1), 0)
+    padded = np.pad(state, ((0, 0), (1, 1)))
+    # Every change of state starts a run that lasts until the next change in the same row
+    rows, changes = np.nonzero(padded[:, 1:] != padded[:, :-1])
+
+    regions = [[] for _ in range(len(state))]
+    same_row = rows[:-1] == rows[1:]
+    for row, start, stop in zip(rows[:-1][same_row], changes[:-1][same_row],
+                                changes[1:][same_row]):
+        if state[row, start] != 0:
+            regions[row].append((int(start), int(stop), bool(state[row, start] > 0)))
+    return regions
+
+
+def compare_curves(curves: np.ndarray, grid: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                   k: float = DEFAULT_BAND_K) -> list[DeviationResult]:
+    """Compare N curves resampled on the reference grid with the reference band in one pass."""
+    z = z_scores(curves, mean, std)
+    defined = ~np.isnan(z)
+    outside = defined & (np.abs(z) > k)
+    compared = np.sum(defined, axis=1)
+
+    integrated = integrated_deviations(grid, z)
+    with np.errstate(invalid="ignore"):
+        max_abs_z = np.where(compared > 0, np.nanmax(np.where(defined, np.abs(z), -np.inf),
+                                                     axis=1), np.nan)
+    fraction = np.where(compared > 0, np.sum(outside, axis=1) / np.maximum(compared, 1), np.nan)
+    regions = outside_regions(outside, z > 0)
+
+    lower, upper = mean - k * std, mean + k * std
+    return [DeviationResult(grid=grid, values=curves[row], z_scores=z[row], lower=lower,
+                            upper=upper, integrated_deviation=float(integrated[row]),
+                            max_abs_z=float(max_abs_z[row]), fraction_outside=float(fraction[row]),
+                            regions=regions[row])
+            for row in range(len(curves))]
+
+
+def compare_models(models, batch, k: float = DEFAULT_BAND_K) -> dict[str, DeviationResult]:
+    """
+    Compare models with the reference band of a batch, by model ID.
+
+    Results are cached on the models against the batch's statistics version, and all
+    models without a cached result are compared in one vectorized call.
+    """
+    statistics = batch.reference_statistics()
+    key = ("deviation", batch.id, statistics.version, k)
+    missing = [model for model in models if key not in model.cache]
+
+    if missing:
+        curves = resample_models(missing, statistics.grid)
+        mean = np.where(statistics.count > 0, statistics.mean, np.nan)
+        results = compare_curves(curves, statistics.grid, mean, statistics.std, k)
+        for model, result in zip(missing, results):
+            # Only the current version of the batch statistics is worth keeping
+            for stale in [cached for cached in model.cache if cached[:2] == key[:2]
+                          and cached[2] != statistics.version]:
+                del model.cache[stale]
+            model.cache[key] = result
+
+    return {model.id: model.cache[key] for model in models}
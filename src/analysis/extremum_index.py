@@ -0,0 +1,130 @@
+from typing import Optional
+
+import numpy as np
+
+from src.analysis.smoothing import SmoothingConfig, get_smoothed
+
+
+class SparseTable:
+    """Range minimum or maximum queries over a fixed array in O(1) after O(n log n) setup."""
+
+    def __init__(self, values: np.ndarray, reduce=np.minimum):
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        self.reduce = reduce
+        self._log = np.zeros(n + 1, dtype=int)
+        self._log[2:] = np.floor(np.log2(np.arange(2, n + 1))).astype(int)
+
+        # Row k reduces values[i:i + 2**k]; entries past the end are never queried
+        self.table = np.full((self._log[n] + 1 if n else 1, n), np.nan)
+        self.table[0] = values
+        for k in range(1, len(self.table)):
+            width = 1 << (k - 1)
+            self.table[k, :n - width] = reduce(self.table[k - 1, :n - width],
+                                               self.table[k - 1, width:])
+
+    def query(self, starts, stops) -> np.ndarray:
+        """Reduce values[start:stop] for every (start, stop) pair; every range must be non-empty."""
+        starts, stops = np.asarray(starts), np.asarray(stops)
+        level = self._log[stops - starts]
+        return self.reduce(self.table[level, starts], self.table[level, stops - (1 << level)])
+
+
+def _local_maxima(x: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Plateau maxima as (middle index, first plateau sample, last plateau sample)."""
+    if len(x) < 3:
+        empty = np.array([], dtype=int)
+        return empty, empty, empty
+    starts = np.concatenate([[0], np.nonzero(x[1:] != x[:-1])[0] + 1])
+    ends = np.concatenate([starts[1:] - 1, [len(x) - 1]])
+    inner = (starts >= 1) & (ends <= len(x) - 2)
+    starts, ends = starts[inner], ends[inner]
+    is_peak = (x[starts - 1] < x[starts]) & (x[ends + 1] < x[ends])
+    starts, ends = starts[is_peak], ends[is_peak]
+    return (starts + ends) // 2, starts, ends
+
+
+def _previous_higher(x: np.ndarray, indices: np.ndarray, maxima: SparseTable) -> np.ndarray:
+    """Index of the nearest sample left of each index that is strictly higher, or -1."""
+    # Binary lifting: extend the run of samples <= x[i] to the left in halving steps
+    position = indices.copy()
+    for k in range(len(maxima.table) - 1, -1, -1):
+        candidate = position - (1 << k)
+        can_move = candidate >= 0
+        can_move &= maxima.table[k, np.maximum(candidate, 0)] <= x[indices]
+        position = np.where(can_move, candidate, position)
+    return position - 1
+
+
+class PeakIndex:
+    """
+    All local maxima of a curve with the data needed to rank them in any sub-range.
+
+    Reproduces `scipy.signal.find_peaks(values[start:stop], prominence=0)` followed by
+    picking the largest prominence, without rescanning the curve per query: plateau
+    maxima are found once, together with the nearest strictly higher sample on either
+    side, and the prominence bases in a range are sparse-table minimum queries.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=float)
+        n = len(self.values)
+        self._minima = SparseTable(self.values, np.minimum)
+
+        self.peaks, self.plateau_starts, self.plateau_stops = _local_maxima(self.values)
+        self.previous_higher = _previous_higher(self.values, self.peaks,
+                                                SparseTable(self.values, np.maximum))
+        reversed_values = self.values[::-1]
+        self.next_higher = n - 1 - _previous_higher(reversed_values, n - 1 - self.peaks,
+                                                    SparseTable(reversed_values, np.maximum))
+
+    def prominences(self, candidates: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Prominence of the given peaks (positions in self.peaks) within values[start:stop]."""
+        peaks = self.peaks[candidates]
+        left_min = self._minima.query(np.maximum(self.previous_higher[candidates] + 1, start),
+                                      peaks + 1)
+        right_min = self._minima.query(peaks, np.minimum(self.next_higher[candidates], stop))
+        return self.values[peaks] - np.maximum(left_min, right_min)
+
+    def candidates(self, start: int, stop: int) -> np.ndarray:
+        """Positions in self.peaks of the maxima that find_peaks detects in values[start:stop]."""
+        first = np.searchsorted(self.plateau_starts, start + 1, side="left")
+        last = np.searchsorted(self.plateau_stops, stop - 2, side="right")
+        return np.arange(first, max(first, last))
+
+    def most_prominent(self, start: int, stop: int) -> int:
+        """Index of the most prominent local maximum in values[start:stop], or -1."""
+        start, stop = max(int(start), 0), min(int(stop), len(self.values))
+        if stop - start < 3:
+            return -1
+        candidates = self.candidates(start, stop)
+        if not candidates.size:
+            return -1
+        return int(self.peaks[candidates[np.argmax(self.prominences(candidates, start, stop))]])
+
+
+class ExtremumIndex:
+    """Peak and valley index of one curve, answering range queries without find_peaks."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=float)
+        self._peaks = PeakIndex(self.values)
+        self._valleys = PeakIndex(-self.values)
+
+    def most_prominent_peak(self, start: int, stop: int) -> int:
+        """Index of the most prominent peak in [start, stop), or -1."""
+        return self._peaks.most_prominent(start, stop)
+
+    def deepest_valley(self, start: int, stop: int) -> int:
+        """Index of the most prominent valley in [start, stop), or -1."""
+        return self._valleys.most_prominent(start, stop)
+
+
+def get_extremum_index(model, channel: str = "EI",
+                       config: Optional[SmoothingConfig] = None) -> ExtremumIndex:
+    """Return the extremum index of a (optionally smoothed) channel, cached on the model."""
+    key = ("extremum_index", channel, config)
+    if key not in model.cache:
+        values = model.data[channel] if config is None else get_smoothed(model, channel, config)
+        model.cache[key] = ExtremumIndex(values)
+    return model.cache[key]
@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.analysis import osmo_kernel, oxy_kernel
+from src.models.osmo_model import OsmoModel
+
+# Key parameters describing a measurement, per model type
+OSMO_FEATURE_PARAMETERS = ("ei_max", "o_max", "o_hyper", "o_min", "ei_min", "area")
+OXY_FEATURE_PARAMETERS = ("ei_max", "ei_min", "delta_ei", "pos")
+
+
+def parameter_keys(model) -> tuple[str, ...]:
+    """Names of the parameter_features columns for the model's type."""
+    return OSMO_FEATURE_PARAMETERS if isinstance(model, OsmoModel) else OXY_FEATURE_PARAMETERS
+
+
+def parameter_features(models) -> np.ndarray:
+    """Key parameters of every model, NaN where a parameter could not be determined."""
+    if isinstance(models[0], OsmoModel):
+        parameters = osmo_kernel.calculate_model_parameters(models)
+    else:
+        parameters = oxy_kernel.calculate_model_parameters(models)
+    return np.column_stack([np.asarray(parameters[key], dtype=float)
+                            for key in parameter_keys(models[0])])
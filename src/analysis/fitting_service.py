@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.polynomial import chebyshev, legendre
+
+from src.enums.enums import PolynomialBasis
+
+VANDERMONDE = {
+    PolynomialBasis.CHEBYSHEV: chebyshev.chebvander,
+    PolynomialBasis.LEGENDRE: legendre.legvander,
+}
+DERIVATIVE = {
+    PolynomialBasis.CHEBYSHEV: chebyshev.chebder,
+    PolynomialBasis.LEGENDRE: legendre.legder,
+}
+
+# Number of cached factorizations and evaluation matrices
+DEFAULT_CACHE_SIZE = 128
+
+
+@dataclass
+class PolynomialFit:
+    """
+    Orthogonal-polynomial fits of N curves on the scaled domain u = (x - center) / scale.
+
+    The domain is per curve, mapping each curve's x range onto [-1, 1].
+    """
+    basis: PolynomialBasis
+    coefficients: np.ndarray  # (N, degree + 1)
+    centers: np.ndarray  # (N,)
+    scales: np.ndarray  # (N,)
+
+    @property
+    def degree(self) -> int:
+        return self.coefficients.shape[1] - 1
+
+    def __len__(self):
+        return len(self.coefficients)
+
+    def scaled(self, x: np.ndarray) -> np.ndarray:
+        """Map x (shape (N, M), or (M,) for all rows) onto every curve's scaled domain."""
+        x = np.asarray(x, dtype=float)
+        return (x - self.centers[:, None]) / self.scales[:, None]
+
+    def evaluate(self, x: np.ndarray) -> np.ndarray:
+        """Evaluate every fit on its row of x (shape (N, M), or (M,) for all rows)."""
+        u = self.scaled(x)
+        return np.einsum("nmk,nk->nm", VANDERMONDE[self.basis](u, self.degree), self.coefficients)
+
+    def derivative(self, order: int = 1) -> "PolynomialFit":
+        """Return the order-th derivative with respect to the unscaled x."""
+        coefficients = DERIVATIVE[self.basis](self.coefficients, order, axis=1)
+        return PolynomialFit(self.basis, coefficients / self.scales[:, None] ** order,
+                             self.centers, self.scales)
+
+    def shifted(self, offsets: np.ndarray) -> "PolynomialFit":
+        """Return the fits moved up or down by a constant per row."""
+        coefficients = self.coefficients.copy()
+        coefficients[:, 0] += offsets  # The first basis polynomial is 1 in both bases
+        return PolynomialFit(self.basis, coefficients, self.centers, self.scales)
+
+
+def _domain(x: np.ndarray) -> tuple[float, float]:
+    low, high = float(np.min(x)), float(np.max(x))
+    return (low + high) / 2, max((high - low) / 2, np.finfo(float).tiny)
+
+
+class FittingService:
+    """
+    Least-squares polynomial fits with cached basis matrices.
+
+    Pseudo-inverses are cached per (basis, degree, x samples) and evaluation matrices
+    per (basis, degree, number of points), both in a small LRU cache. Curves sharing
+    their x samples are fitted with one matrix product, curves of their own with one
+    stacked solve, and evaluating on an evenly
+    spaced grid over each curve's own range reuses one matrix for every curve, since
+    that grid always maps onto the same points of [-1, 1].
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _cached(self, key, build):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        value = build()
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def pseudo_inverse(self, x: np.ndarray, degree: int, basis: PolynomialBasis) -> np.ndarray:
+        """Pseudo-inverse of the scaled basis matrix of x, shape (degree + 1, len(x))."""
+        x = np.ascontiguousarray(x, dtype=float)
+        center, scale = _domain(x)
+        return self._cached(("pinv", basis, degree, x.tobytes()),
+                            lambda: np.linalg.pinv(VANDERMONDE[basis]((x - center) / scale,
+                                                                      degree)))
+
+    def grid_matrix(self, points: int, degree: int, basis: PolynomialBasis) -> np.ndarray:
+        """Basis matrix of `points` evenly spaced samples of [-1, 1]."""
+        return self._cached(("grid", basis, degree, points),
+                            lambda: VANDERMONDE[basis](np.linspace(-1, 1, points), degree))
+
+    def fit(self, x: np.ndarray, y: np.ndarray, degree: int,
+            basis: PolynomialBasis = PolynomialBasis.CHEBYSHEV) -> PolynomialFit:
+        """
+        Fit every row of y (shape (N, M), or (M,)) against the shared x samples.
+
+        All rows are solved with a single product with the cached pseudo-inverse.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.atleast_2d(np.asarray(y, dtype=float))
+        if len(x) <= degree:
+            raise ValueError(f"At least {degree + 1} samples are needed for degree {degree}.")
+        center, scale = _domain(x)
+        coefficients = y @ self.pseudo_inverse(x, degree, basis).T
+        return PolynomialFit(basis, coefficients, np.full(len(y), center),
+                             np.full(len(y), scale))
+
+    def fit_curves(self, x_curves: list[np.ndarray], y_curves: list[np.ndarray], degree: int,
+                   basis: PolynomialBasis = PolynomialBasis.CHEBYSHEV) -> PolynomialFit:
+        """
+        Fit curves with their own x samples.
+
+        Curves sharing their x samples are solved together with the cached pseudo-inverse.
+        The remaining curves, e.g. breakpoint segments, rarely repeat their samples, so
+        they are solved in one batch by fit_ragged instead of filling the cache.
+        """
+        groups = {}
+        for i, x in enumerate(x_curves):
+            groups.setdefault(np.asarray(x, dtype=float).tobytes(), []).append(i)
+
+        coefficients = np.empty((len(x_curves), degree + 1))
+        centers, scales = np.empty(len(x_curves)), np.empty(len(x_curves))
+        ragged = [indices[0] for indices in groups.values() if len(indices) == 1]
+        if ragged:
+            fit = self.fit_ragged([x_curves[i] for i in ragged], [y_curves[i] for i in ragged],
+                                  degree, basis)
+            coefficients[ragged] = fit.coefficients
+            centers[ragged], scales[ragged] = fit.centers, fit.scales
+        for indices in groups.values():
+            if len(indices) > 1:
+                fit = self.fit(x_curves[indices[0]], [y_curves[i] for i in indices], degree,
+                               basis)
+                coefficients[indices] = fit.coefficients
+                centers[indices], scales[indices] = fit.centers, fit.scales
+        return PolynomialFit(basis, coefficients, centers, scales)
+
+    @staticmethod
+    def fit_ragged(x_curves: list[np.ndarray], y_curves: list[np.ndarray], degree: int,
+                   basis: PolynomialBasis = PolynomialBasis.CHEBYSHEV) -> PolynomialFit:
+        """
+        Fit curves of any lengths with one batched least-squares solve.
+
+        Every curve is scaled to [-1, 1] and its basis matrix is zero padded to the
+        longest curve, with the padding rows masked out, so all systems are solved by one
+        stacked QR factorization.
+        """
+        if not x_curves:
+            return PolynomialFit(basis, np.empty((0, degree + 1)), np.empty(0), np.empty(0))
+        lengths = np.array([len(x) for x in x_curves])
+        if np.any(lengths <= degree):
+            raise ValueError(f"At least {degree + 1} samples are needed for degree {degree}.")
+
+        valid = np.arange(lengths.max()) < lengths[:, None]
+        x = np.zeros(valid.shape)
+        y = np.zeros(valid.shape)
+        x[valid] = np.concatenate(x_curves)
+        y[valid] = np.concatenate(y_curves)
+        centers, scales = np.array([_domain(curve) for curve in x_curves]).T
+
+        u = np.where(valid, (x - centers[:, None]) / scales[:, None], 0.0)
+        vandermonde = VANDERMONDE[basis](u, degree) * valid[..., None]  # Padding rows are zero
+        q, r = np.linalg.qr(vandermonde)
+        coefficients = np.linalg.solve(r, np.einsum("nmk,nm->nk", q, y)[..., None])[..., 0]
+        return PolynomialFit(basis, coefficients, centers, scales)
+
+    def evaluate_on_range(self, fit: PolynomialFit,
+                          points: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate every fit on `points` evenly spaced x values spanning its own domain.
+
+        Returns:
+            (x, values), both of shape (N, points).
+        """
+        values = fit.coefficients @ self.grid_matrix(points, fit.degree, fit.basis).T
+        x = fit.centers[:, None] + fit.scales[:, None] * np.linspace(-1, 1, points)
+        return x, values
+
+
+# Shared instance, so plugins reuse each other's cached matrices
+fitting_service = FittingService()
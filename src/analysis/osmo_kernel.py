@@ -0,0 +1,178 @@
+from typing import Optional
+
+import numpy as np
+
+from src.analysis.area_index import AreaIndex, get_area_index, is_sorted
+from src.analysis.extremum_index import ExtremumIndex, get_extremum_index
+
+PARAMETER_KEYS = ("ei_max", "ei_hyper", "o_max", "o_hyper", "o_first_peak", "ei_first_peak",
+                  "o_min", "ei_min", "area")
+
+
+def pad_curves(curves: list[np.ndarray], fill=np.nan) -> tuple[np.ndarray, np.ndarray]:
+    """Stack ragged 1-D arrays into an (N, L) array padded with `fill`, plus their lengths."""
+    lengths = np.array([len(curve) for curve in curves], dtype=int)
+    padded = np.full((len(curves), lengths.max(initial=0)), fill, dtype=float)
+    if curves:
+        padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.concatenate(curves)
+    return padded, lengths
+
+
+def ei_max_values(ei: np.ndarray) -> np.ndarray:
+    """Maximum EI of every curve."""
+    return np.nanmax(ei, axis=1)
+
+
+def center_max_indices(ei: np.ndarray, ei_max: np.ndarray) -> np.ndarray:
+    """Index of the middle sample among all samples equal to EI max."""
+    at_max = ei == ei_max[:, None]
+    target = at_max.sum(axis=1) // 2
+    return np.argmax(at_max & (np.cumsum(at_max, axis=1) == target[:, None] + 1), axis=1)
+
+
+def hyper_crossings(o: np.ndarray, ei: np.ndarray, lengths: np.ndarray, start_idx: np.ndarray,
+                    ei_hyper: np.ndarray) -> np.ndarray:
+    """
+    O value where EI first drops to `ei_hyper` at or after `start_idx`.
+
+    An exact hit returns its O value, otherwise O is interpolated linearly between the
+    samples around the crossing. Curves that never cross return NaN.
+    """
+    rows = np.arange(len(o))
+    columns = np.arange(o.shape[1])
+    below = (ei <= ei_hyper[:, None]) & (columns >= start_idx[:, None])
+
+    found = below.any(axis=1)
+    cross = np.argmax(below, axis=1)
+    # The sample before the first one of the tail wraps around to the end of the curve
+    previous = np.where(cross > start_idx, cross - 1, lengths - 1)
+
+    ei_cross, o_cross = ei[rows, cross], o[rows, cross]
+    ei_prev, o_prev = ei[rows, previous], o[rows, previous]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interpolated = o_prev + (o_cross - o_prev) * (ei_hyper - ei_prev) / (ei_cross - ei_prev)
+
+    o_hyper = np.where(ei_cross == ei_hyper, o_cross, interpolated)
+    return np.where(found, o_hyper, np.nan)
+
+
+def first_peaks_and_valleys(indexes: list[ExtremumIndex],
+                            max_idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Most prominent peak before EI max, and the most prominent valley between it and EI max.
+
+    Returns:
+        (first peak indices, valley indices), -1 where a curve has none.
+    """
+    first_peak_idx = np.array([index.most_prominent_peak(0, stop)
+                               for index, stop in zip(indexes, max_idx)], dtype=int)
+    valley_idx = np.array([index.deepest_valley(start, stop) if start >= 0 else -1
+                           for index, start, stop in zip(indexes, first_peak_idx, max_idx)],
+                          dtype=int)
+    return first_peak_idx, valley_idx
+
+
+def calculate_areas(o: np.ndarray, ei: np.ndarray, lower_limits: np.ndarray,
+                    upper_limits: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Trapezoidal area under EI between the O samples inside [lower, upper].
+
+    Returns:
+        (areas, lower indices, upper indices); the segment of a curve is
+        o[lower:upper]. Segments with fewer than two samples have a NaN area.
+    """
+    lower_idx = np.sum(o < lower_limits[:, None], axis=1)
+    upper_idx = np.sum(o <= upper_limits[:, None], axis=1)
+
+    columns = np.arange(o.shape[1] - 1)
+    in_segment = (columns >= lower_idx[:, None]) & (columns + 1 < upper_idx[:, None])
+    terms = np.diff(o, axis=1) * (ei[:, 1:] + ei[:, :-1]) / 2.0
+    areas = np.where(in_segment, terms, 0.0).sum(axis=1)
+
+    return np.where(upper_idx - lower_idx >= 2, areas, np.nan), lower_idx, upper_idx
+
+
+def index_areas(indexes: list[AreaIndex], lower_limits: np.ndarray,
+                upper_limits: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Same as calculate_areas, answered from prebuilt area indexes."""
+    areas = np.array([index.areas(lower, upper)
+                      for index, lower, upper in zip(indexes, lower_limits, upper_limits)])
+    bounds = np.array([index.sample_bounds(lower, upper)
+                       for index, lower, upper in zip(indexes, lower_limits, upper_limits)],
+                      dtype=int).reshape(-1, 2)
+    return areas.reshape(-1), bounds[:, 0], bounds[:, 1]
+
+
+def calculate_parameters(o_curves: list[np.ndarray], ei_curves: list[np.ndarray],
+                         lower_limits, upper_limits,
+                         extremum_indexes: Optional[list[ExtremumIndex]] = None,
+                         area_indexes: Optional[list[AreaIndex]] = None) \
+        -> dict[str, np.ndarray]:
+    """
+    Calculate all standard Osmoscan parameters for N curves at once.
+
+    Ragged curves are NaN padded internally; padding never takes part in a result.
+    Missing results are NaN (values) or -1 (indices) instead of raising, so one bad
+    curve does not abort a whole batch.
+
+    The first peak and the valley are located with `extremum_indexes` when given (for
+    example the cached index of a model's smoothed EI), while their reported EI values
+    still come from `ei_curves`. Areas are answered from `area_indexes` when given.
+
+    Returns:
+        A dictionary with one array of length N per parameter (see PARAMETER_KEYS),
+        plus the sample indices max_idx, first_peak_idx, valley_idx, lower_idx and
+        upper_idx.
+    """
+    o, lengths = pad_curves(o_curves)
+    ei, _ = pad_curves(ei_curves)
+    rows = np.arange(len(o))
+
+    ei_max = ei_max_values(ei)
+    ei_hyper = ei_max / 2
+    max_idx = center_max_indices(ei, ei_max)
+    o_hyper = hyper_crossings(o, ei, lengths, max_idx, ei_hyper)
+
+    if extremum_indexes is None:
+        extremum_indexes = [ExtremumIndex(curve) for curve in ei_curves]
+    first_peak_idx, valley_idx = first_peaks_and_valleys(extremum_indexes, max_idx)
+
+    lower_limits = np.asarray(lower_limits, dtype=float)
+    upper_limits = np.asarray(upper_limits, dtype=float)
+    if area_indexes is None:
+        area, lower_idx, upper_idx = calculate_areas(o, ei, lower_limits, upper_limits)
+    else:
+        area, lower_idx, upper_idx = index_areas(area_indexes, lower_limits, upper_limits)
+
+    def take(values, indices):
+        return np.where(indices >= 0, values[rows, indices], np.nan)
+
+    return {
+        "ei_max": ei_max,
+        "ei_hyper": ei_hyper,
+        "o_max": o[rows, max_idx],
+        "o_hyper": o_hyper,
+        "o_first_peak": take(o, first_peak_idx),
+        "ei_first_peak": take(ei, first_peak_idx),
+        "o_min": take(o, valley_idx),
+        "ei_min": take(ei, valley_idx),
+        "area": area,
+        "max_idx": max_idx,
+        "first_peak_idx": first_peak_idx,
+        "valley_idx": valley_idx,
+        "lower_idx": lower_idx,
+        "upper_idx": upper_idx,
+    }
+
+
+def calculate_model_parameters(models) -> dict[str, np.ndarray]:
+    """Calculate all standard Osmoscan parameters for a list of OsmoModels."""
+    return calculate_parameters(
+        [model.O for model in models],
+        [model.EI for model in models],
+        [model.metadata.get("lower_limit", np.nan) for model in models],
+        [model.metadata.get("upper_limit", np.nan) for model in models],
+        [get_extremum_index(model) for model in models],
+        [get_area_index(model) for model in models]
+        if all(is_sorted(model) for model in models) else None,
+    )
@@ -0,0 +1,106 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.stats import chi2
+
+from src.analysis.features import parameter_features
+from src.analysis.resampling import resample_models
+
+logger = logging.getLogger(__name__)
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+DEFAULT_Z_THRESHOLD = 3.5
+DEFAULT_MAX_FRACTION = 0.2  # Fraction of the curve allowed beyond the z threshold
+DEFAULT_QUANTILE = 0.975  # Chi-square quantile of the Mahalanobis cut-off
+
+
+@dataclass
+class OutlierReport:
+    """Outlier scores of the members of a batch, one entry per model."""
+    model_ids: list[str]
+    curve_scores: np.ndarray  # Fraction of covered grid points with |robust z| above threshold
+    parameter_distances: np.ndarray  # Mahalanobis distance of the key parameters
+    is_outlier: np.ndarray
+
+    @property
+    def outlier_ids(self) -> list[str]:
+        return [model_id for model_id, flag in zip(self.model_ids, self.is_outlier) if flag]
+
+
+def robust_z_scores(values: np.ndarray) -> np.ndarray:
+    """Column-wise (value - median) / (1.4826 * MAD), ignoring NaN; zero MAD gives NaN."""
+    median = np.nanmedian(values, axis=0)
+    mad = MAD_SCALE * np.nanmedian(np.abs(values - median), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(mad > 0, (values - median) / mad, np.nan)
+
+
+def curve_scores(curves: np.ndarray, z_threshold: float = DEFAULT_Z_THRESHOLD) -> np.ndarray:
+    """Fraction of every curve's covered grid points whose robust z-score exceeds the threshold."""
+    z = np.abs(robust_z_scores(curves))
+    covered = np.sum(~np.isnan(z), axis=1)
+    beyond = np.sum(z > z_threshold, axis=1)
+    return np.where(covered > 0, beyond / np.maximum(covered, 1), 0.0)
+
+
+def mahalanobis_distances(parameters: np.ndarray) -> np.ndarray:
+    """
+    Robust Mahalanobis distance of every row; NaN entries count as typical values.
+
+    The mean and covariance come from the half of the rows closest to the median in
+    robust z units (one concentration step of the minimum covariance determinant), so
+    the outliers being searched for do not mask themselves.
+    """
+    n, p = parameters.shape
+    if n < 2:
+        return np.zeros(n)
+    z = np.nan_to_num(robust_z_scores(parameters))
+    core = np.argsort(np.sum(z ** 2, axis=1), kind="stable")[:max((n + p + 1) // 2, 2)]
+
+    filled = np.where(np.isnan(parameters), np.nanmedian(parameters, axis=0), parameters)
+    center = filled[core].mean(axis=0)
+    # The pseudo-inverse copes with small batches and constant parameters
+    inverse = np.linalg.pinv(np.atleast_2d(np.cov(filled[core], rowvar=False)))
+    centered = filled - center
+    return np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", centered, inverse, centered), 0.0))
+
+
+def detect_outliers(models, grid: np.ndarray, z_threshold: float = DEFAULT_Z_THRESHOLD,
+                    max_fraction: float = DEFAULT_MAX_FRACTION,
+                    quantile: float = DEFAULT_QUANTILE) -> OutlierReport:
+    """
+    Score every model against the others on a shared grid and on its key parameters.
+
+    A model is an outlier when more than `max_fraction` of its curve lies beyond
+    `z_threshold` robust standard deviations, or when its parameters lie beyond the
+    chi-square `quantile` of the Mahalanobis distance.
+    """
+    scores = curve_scores(resample_models(models, grid), z_threshold)
+    parameters = parameter_features(models)
+    distances = mahalanobis_distances(parameters)
+    cutoff = np.sqrt(chi2.ppf(quantile, df=parameters.shape[1]))
+
+    return OutlierReport(model_ids=[model.id for model in models], curve_scores=scores,
+                         parameter_distances=distances,
+                         is_outlier=(scores > max_fraction) | (distances > cutoff))
+
+
+def screen_batch(batch, exclude: bool = False, **thresholds) -> OutlierReport:
+    """
+    Score all members of a batch, selected or not, and log the outliers.
+
+    With `exclude`, outliers are deselected through the batch's models_selection, so
+    its reference statistics follow. Other members keep their selection state.
+    """
+    report = detect_outliers(batch.models, batch.reference_statistics().grid, **thresholds)
+    for model, flag in zip(batch.models, report.is_outlier):
+        if flag:
+            logger.warning(f"Possible outlier in batch {batch.name}: {model.name}")
+
+    if exclude:
+        for model_id in report.outlier_ids:
+            if batch.models_selection.get(model_id):
+                batch.change_model_selection(model_id, False)
+    return report
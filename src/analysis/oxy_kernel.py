@@ -0,0 +1,97 @@
+import numpy as np
+
+from src.analysis.osmo_kernel import pad_curves
+
+PARAMETER_KEYS = ("ei_max", "ei_min", "delta_ei", "pos", "min_po2", "t_min_po2")
+
+# EI drop relative to EI max that defines the Point of Sickling
+DEFAULT_POS_FRACTION = 0.05
+
+
+def deoxygenation_ends(po2: np.ndarray) -> np.ndarray:
+    """Index of the lowest pO2 of every curve, which ends the deoxygenation phase."""
+    return np.argmin(np.where(np.isnan(po2), np.inf, po2), axis=1)
+
+
+def first_crossings_below(values: np.ndarray, thresholds: np.ndarray, starts: np.ndarray,
+                          stops: np.ndarray) -> np.ndarray:
+    """Index of the first sample in [start, stop] that drops below the threshold, or -1."""
+    columns = np.arange(values.shape[1])
+    window = (columns >= starts[:, None]) & (columns <= stops[:, None])
+    below = (values < thresholds[:, None]) & window
+    return np.where(below.any(axis=1), np.argmax(below, axis=1), -1)
+
+
+def interpolate_crossings(x: np.ndarray, y: np.ndarray, indices: np.ndarray,
+                          levels: np.ndarray) -> np.ndarray:
+    """Linearly interpolate x where y reaches `levels` between sample index-1 and index."""
+    rows = np.arange(len(x))
+    current = np.maximum(indices, 0)
+    previous = np.maximum(current - 1, 0)
+
+    x0, x1 = x[rows, previous], x[rows, current]
+    y0, y1 = y[rows, previous], y[rows, current]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = np.where(y1 != y0, x0 + (x1 - x0) * (levels - y0) / (y1 - y0), x1)
+
+    return np.where(indices > 0, crossing, np.nan)
+
+
+def calculate_parameters(t_curves: list[np.ndarray], po2_curves: list[np.ndarray],
+                         ei_curves: list[np.ndarray],
+                         pos_fraction: float = DEFAULT_POS_FRACTION) -> dict[str, np.ndarray]:
+    """
+    Calculate the Oxygenscan parameters for N curves at once.
+
+    EI max, EI min and ΔEI are taken over the deoxygenation phase, from the start of the
+    measurement to the lowest pO2. The Point of Sickling (PoS) is the pO2 at which EI
+    first drops `pos_fraction` below EI max after EI max is reached, interpolated
+    between the samples around the crossing.
+
+    Returns:
+        A dictionary with one array of length N per parameter (see PARAMETER_KEYS),
+        plus the sample indices max_idx, min_idx, pos_idx and deoxy_end_idx.
+    """
+    t, _ = pad_curves(t_curves)
+    po2, _ = pad_curves(po2_curves)
+    ei, _ = pad_curves(ei_curves)
+    rows = np.arange(len(ei))
+
+    deoxy_end = deoxygenation_ends(po2)
+    in_deoxy = np.arange(ei.shape[1]) <= deoxy_end[:, None]
+
+    max_idx = np.argmax(np.where(in_deoxy, ei, -np.inf), axis=1)
+    min_idx = np.argmin(np.where(in_deoxy, ei, np.inf), axis=1)
+    ei_max = ei[rows, max_idx]
+    ei_min = ei[rows, min_idx]
+
+    pos_level = ei_max * (1 - pos_fraction)
+    pos_idx = first_crossings_below(ei, pos_level, max_idx, deoxy_end)
+    pos = interpolate_crossings(po2, ei, pos_idx, pos_level)
+
+    return {
+        "ei_max": ei_max,
+        "ei_min": ei_min,
+        "delta_ei": ei_max - ei_min,
+        "pos": pos,
+        "pos_ei": np.where(pos_idx > 0, pos_level, np.nan),
+        "min_po2": po2[rows, deoxy_end],
+        "t_min_po2": t[rows, deoxy_end],
+        "po2_ei_max": po2[rows, max_idx],
+        "po2_ei_min": po2[rows, min_idx],
+        "max_idx": max_idx,
+        "min_idx": min_idx,
+        "pos_idx": pos_idx,
+        "deoxy_end_idx": deoxy_end,
+    }
+
+
+def calculate_model_parameters(models, pos_fraction: float = DEFAULT_POS_FRACTION) \
+        -> dict[str, np.ndarray]:
+    """Calculate the Oxygenscan parameters for a list of OxyModels."""
+    return calculate_parameters(
+        [model.t for model in models],
+        [model.pO2 for model in models],
+        [model.EI for model in models],
+        pos_fraction,
+    )
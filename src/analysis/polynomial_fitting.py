@@ -0,0 +1,75 @@
+import numpy as np
+
+from src.analysis.fitting_service import FittingService, PolynomialFit, fitting_service
+from src.analysis.osmo_kernel import pad_curves
+from src.enums.enums import CurveType
+
+# Number of evaluation points used to look for second-derivative sign changes
+BREAKING_POINT_SAMPLES = 50
+
+
+def adjust_fits(x_segments: list[np.ndarray], y_segments: list[np.ndarray],
+                fits: PolynomialFit, curve_type: CurveType) -> PolynomialFit:
+    """
+    Move every fit so it touches the data point that exceeds it the most.
+
+    For a bump the fit is raised to the highest point above it, for a valley it is
+    lowered to the lowest point below it. A fit without exceeding points is unchanged.
+    """
+    x, _ = pad_curves(x_segments)
+    y, _ = pad_curves(y_segments)
+    residuals = y - fits.evaluate(x)  # NaN on padding
+
+    if curve_type == CurveType.BUMP:
+        offsets = np.nanmax(np.where(residuals > 0, residuals, 0.0), axis=1)
+    elif curve_type == CurveType.VALLEY:
+        offsets = np.nanmin(np.where(residuals < 0, residuals, 0.0), axis=1)
+    else:
+        raise ValueError("Invalid curve type. Use CurveType.BUMP or CurveType.VALLEY.")
+
+    return fits.shifted(offsets)
+
+
+def find_segment_breaking_points(x_segments: list[np.ndarray], y_segments: list[np.ndarray],
+                                 degree: int, samples: int = BREAKING_POINT_SAMPLES,
+                                 service: FittingService = fitting_service) -> np.ndarray:
+    """
+    Find the highest inflection point of a polynomial fit to every segment.
+
+    A polynomial of the given degree is fit to every segment and its second derivative
+    is sampled on an even grid. Grid points where the sign changes are breaking points.
+    The highest one (by fitted value) is mapped back to the closest sample of the
+    segment.
+
+    Returns:
+        One index into each segment, or -1 when a segment has no breaking point.
+    """
+    fits = service.fit_curves(x_segments, y_segments, degree)
+    grids, heights = service.evaluate_on_range(fits, samples)
+    _, curvature = service.evaluate_on_range(fits.derivative(2), samples)
+    rows = np.arange(len(fits))
+
+    sign_changes = np.diff(np.sign(curvature), axis=1) != 0
+    heights = np.where(sign_changes, heights[:, :-1], -np.inf)
+    breaking_x = grids[rows, np.argmax(heights, axis=1)]
+
+    x, _ = pad_curves(x_segments)
+    nearest = np.nanargmin(np.abs(x - breaking_x[:, None]), axis=1)
+    return np.where(sign_changes.any(axis=1), nearest, -1)
+
+
+def find_breaking_points(x: np.ndarray, y: np.ndarray, starts, stops, degree: int,
+                         samples: int = BREAKING_POINT_SAMPLES,
+                         service: FittingService = fitting_service) -> np.ndarray:
+    """
+    Find the highest breaking point in every [start, stop) segment of one curve.
+
+    Returns:
+        One index into x per segment, or -1 when a segment has no breaking point.
+    """
+    starts = np.asarray(starts)
+    x_segments = [x[start:stop] for start, stop in zip(starts, stops)]
+    y_segments = [y[start:stop] for start, stop in zip(starts, stops)]
+
+    local = find_segment_breaking_points(x_segments, y_segments, degree, samples, service)
+    return np.where(local >= 0, local + starts, -1)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.analysis.resampling import resample_model
+
+
+class ReferenceStatistics:
+    """
+    Running count, mean and variance per grid point of a set of reference curves.
+
+    Curves are resampled onto a fixed grid and folded in with Welford's algorithm, so
+    adding or removing a member costs O(grid) regardless of how many members there are.
+    Grid points outside a curve's range do not count for that curve.
+    """
+
+    def __init__(self, grid: np.ndarray):
+        self.grid = grid
+        self.count = np.zeros(len(grid), dtype=int)
+        self.mean = np.zeros(len(grid))
+        self._m2 = np.zeros(len(grid))  # Sum of squared deviations from the mean
+        self.members: set[str] = set()
+        self.version = 0  # Incremented on every change, used to invalidate derived caches
+
+    def add(self, model):
+        """Fold a model's curve into the statistics."""
+        if model.id in self.members:
+            return
+        y = resample_model(model, self.grid)
+        valid = ~np.isnan(y)
+
+        self.count[valid] += 1
+        delta = y[valid] - self.mean[valid]
+        self.mean[valid] += delta / self.count[valid]
+        self._m2[valid] += delta * (y[valid] - self.mean[valid])
+
+        self.members.add(model.id)
+        self.version += 1
+
+    def remove(self, model):
+        """Take a model's curve back out of the statistics."""
+        if model.id not in self.members:
+            return
+        y = resample_model(model, self.grid)
+        valid = ~np.isnan(y)
+        last = valid & (self.count == 1)
+        remaining = valid & (self.count > 1)
+
+        count = self.count[remaining]
+        old_mean = (count * self.mean[remaining] - y[remaining]) / (count - 1)
+        self._m2[remaining] -= (y[remaining] - old_mean) * (y[remaining] - self.mean[remaining])
+        self.mean[remaining] = old_mean
+        self.count[remaining] -= 1
+
+        self.count[last] = 0
+        self.mean[last] = 0.0
+        self._m2[last] = 0.0
+
+        self.members.discard(model.id)
+        self.version += 1
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance per grid point (NaN with fewer than two curves)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(self.count > 1, self._m2 / (self.count - 1), np.nan)
+        return np.maximum(variance, 0.0)  # Guard against tiny negative rounding errors
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+    def mean_curve(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the grid and the mean curve on the points covered by any member."""
+        covered = self.count > 0
+        return self.grid[covered], self.mean[covered]
+
+    def band(self, k: float = 2.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the grid, mean - k*SD and mean + k*SD on the points with a defined SD."""
+        std = self.std
+        defined = ~np.isnan(std)
+        return (self.grid[defined], self.mean[defined] - k * std[defined],
+                self.mean[defined] + k * std[defined])
+
+    def __len__(self):
+        return len(self.members)
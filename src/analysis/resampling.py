@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.models.osmo_model import OsmoModel
+from src.models.oxy_model import OxyModel
+
+# Default number of points of a common resampling grid
+GRID_POINTS = 500
+
+
+def extract_curve(model) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (x, y) curve used to compare measurements of the model's type.
+
+    Osmoscans use O vs EI. Oxygenscans use pO2 vs EI of the deoxygenation phase (up to
+    the lowest pO2), reversed so that pO2 increases.
+    """
+    if isinstance(model, OsmoModel):
+        return model.O, model.EI
+    if isinstance(model, OxyModel):
+        end = int(np.argmin(model.pO2)) + 1
+        return model.pO2[:end][::-1], model.EI[:end][::-1]
+    raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+
+def resample(x: np.ndarray, y: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Linearly resample y onto the grid; grid points outside the x range become NaN."""
+    if np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    return np.interp(grid, x, y, left=np.nan, right=np.nan)
+
+
+def model_grid(models, points: int = GRID_POINTS) -> np.ndarray:
+    """Evenly spaced grid spanning the x ranges of all models."""
+    curves = [extract_curve(model)[0] for model in models]
+    return np.linspace(min(np.min(x) for x in curves), max(np.max(x) for x in curves), points)
+
+
+def grid_key(grid: np.ndarray) -> tuple:
+    """Hashable key identifying an evenly spaced grid."""
+    return float(grid[0]), float(grid[-1]), len(grid)
+
+
+def resample_model(model, grid: np.ndarray) -> np.ndarray:
+    """Return the model's curve resampled onto the grid, cached on the model."""
+    key = ("resampled", grid_key(grid))
+    if key not in model.cache:
+        model.cache[key] = resample(*extract_curve(model), grid)
+    return model.cache[key]
+
+
+def resample_models(models, grid: np.ndarray) -> np.ndarray:
+    """Resample every model onto the grid, shape (N, len(grid))."""
+    return np.array([resample_model(model, grid) for model in models]).reshape(-1, len(grid))
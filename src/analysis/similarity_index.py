@@ -0,0 +1,111 @@
+from typing import Optional
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.analysis.features import parameter_features
+from src.analysis.resampling import extract_curve, model_grid
+
+# Number of resampled EI values in a feature vector
+FEATURE_POINTS = 32
+
+
+def curve_features(models, grid: np.ndarray) -> np.ndarray:
+    """EI of every model on the grid, holding the edge values outside a curve's range."""
+    features = np.empty((len(models), len(grid)))
+    for row, model in enumerate(models):
+        x, y = extract_curve(model)
+        order = np.argsort(x, kind="stable")
+        features[row] = np.interp(grid, x[order], y[order])
+    return features
+
+
+class SimilarityIndex:
+    """
+    k-nearest-neighbour index over measurement curves of one model type.
+
+    Every model becomes a feature vector of its resampled EI curve plus its key
+    parameters. Columns are standardized, and the curve and parameter blocks are
+    weighted so each contributes equally to the distance. New models go to a pending
+    buffer that is searched by brute force; the KD-tree is rebuilt once the buffer
+    outgrows `rebuild_fraction` of the indexed models, keeping additions cheap.
+    """
+
+    def __init__(self, grid: Optional[np.ndarray] = None, points: int = FEATURE_POINTS,
+                 rebuild_fraction: float = 0.1, min_pending: int = 32):
+        self.grid = grid
+        self.points = points
+        self.rebuild_fraction = rebuild_fraction
+        self.min_pending = min_pending
+
+        self.models = []  # Indexed models first, then pending ones
+        self._ids = set()
+        self._features = np.empty((0, 0))  # Raw feature rows of self.models
+        self._indexed = 0  # Number of models in the tree
+        self._tree: Optional[cKDTree] = None
+        self._center = self._scale = None
+
+    def __len__(self):
+        return len(self.models)
+
+    def add(self, models):
+        """Add models to the index; the grid is taken from the first models when not given."""
+        models = [model for model in models if model.id not in self._ids]
+        if not models:
+            return
+        if self.grid is None:
+            self.grid = model_grid(models, self.points)
+
+        features = np.hstack([curve_features(models, self.grid), parameter_features(models)])
+        self._features = features if not self.models else np.vstack([self._features, features])
+        self.models.extend(models)
+        self._ids.update(model.id for model in models)
+
+        pending = len(self.models) - self._indexed
+        if self._tree is None or pending > max(self.min_pending,
+                                               self.rebuild_fraction * self._indexed):
+            self.rebuild()
+
+    def rebuild(self):
+        """Re-estimate the column scaling and build the tree over all models."""
+        features = self._features
+        self._center = np.nanmean(features, axis=0)
+        scale = np.nanstd(features, axis=0)
+        self._scale = np.where(scale > 0, scale, 1.0)
+
+        # Equal weight for the curve block and the parameter block
+        weights = np.empty(features.shape[1])
+        weights[:len(self.grid)] = 1 / np.sqrt(len(self.grid))
+        weights[len(self.grid):] = 1 / np.sqrt(max(features.shape[1] - len(self.grid), 1))
+        self._scale = self._scale / weights
+
+        self._tree = cKDTree(self._scaled(features))
+        self._indexed = len(self.models)
+
+    def _scaled(self, features: np.ndarray) -> np.ndarray:
+        # Missing parameters sit at the column center, so they do not add distance
+        return np.nan_to_num((features - self._center) / self._scale)
+
+    def query(self, model, k: int = 5, exclude_self: bool = True) -> list[tuple]:
+        """Return up to k (model, distance) pairs most similar to the model, closest first."""
+        if not self.models:
+            return []
+        point = self._scaled(np.hstack([curve_features([model], self.grid),
+                                        parameter_features([model])]))[0]
+
+        # Tree candidates plus a brute-force pass over the pending models
+        tree_k = min(k + 1, self._indexed)
+        distances, indices = self._tree.query(point, k=tree_k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        pending = self._scaled(self._features[self._indexed:])
+        distances = np.concatenate([distances, np.linalg.norm(pending - point, axis=1)])
+        indices = np.concatenate([indices, np.arange(self._indexed, len(self.models))])
+
+        results = []
+        for i in np.argsort(distances, kind="stable"):
+            if exclude_self and self.models[indices[i]].id == model.id:
+                continue
+            results.append((self.models[indices[i]], float(distances[i])))
+            if len(results) == k:
+                break
+        return results
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy.interpolate import make_smoothing_spline
+from scipy.ndimage import median_filter
+from scipy.signal import savgol_filter
+
+from src.enums.enums import SmoothingMethod
+from src.models.osmo_model import OsmoModel
+from src.models.oxy_model import OxyModel
+
+
+@dataclass(frozen=True)
+class SmoothingConfig:
+    """Filter settings; equal configurations share one cache entry per model."""
+    method: SmoothingMethod = SmoothingMethod.SAVGOL
+    window: int = 11  # Savitzky-Golay and moving median window, in samples
+    polyorder: int = 3  # Savitzky-Golay polynomial order
+    lam: Optional[float] = None  # Smoothing spline penalty, None selects it by GCV
+
+
+def _odd_window(window: int, length: int) -> int:
+    """Clamp the window to the curve length, keeping it odd."""
+    window = min(window, length if length % 2 else length - 1)
+    return max(window, 1)
+
+
+def _smooth_stack(x: np.ndarray, y: np.ndarray, config: SmoothingConfig) -> np.ndarray:
+    """Smooth an (M, L) stack of equal-length curves along the last axis."""
+    window = _odd_window(config.window, y.shape[1])
+
+    if config.method == SmoothingMethod.SAVGOL:
+        if window <= config.polyorder:
+            return y.copy()
+        return savgol_filter(y, window, config.polyorder, axis=1)
+    if config.method == SmoothingMethod.MEDIAN:
+        return median_filter(y, size=(1, window), mode="nearest")
+    if config.method == SmoothingMethod.SPLINE:
+        return np.array([make_smoothing_spline(x_row, y_row, lam=config.lam)(x_row)
+                         for x_row, y_row in zip(x, y)])
+    raise ValueError(f"Unsupported smoothing method: {config.method}")
+
+
+def smooth_curves(x_curves: list[np.ndarray], y_curves: list[np.ndarray],
+                  config: SmoothingConfig) -> list[np.ndarray]:
+    """
+    Smooth many curves, filtering all curves of the same length in one vectorized call.
+
+    x is only used by the smoothing spline, which needs strictly increasing x values.
+    """
+    smoothed = [None] * len(y_curves)
+    groups = {}
+    for i, y in enumerate(y_curves):
+        groups.setdefault(len(y), []).append(i)
+
+    for indices in groups.values():
+        x = np.array([x_curves[i] for i in indices], dtype=float)
+        y = np.array([y_curves[i] for i in indices], dtype=float)
+        for i, row in zip(indices, _smooth_stack(x, y, config)):
+            smoothed[i] = row
+    return smoothed
+
+
+def abscissa(model) -> np.ndarray:
+    """
+    The x values the channels of a model are smoothed against.
+
+    Osmoscans are recorded along the osmolality O, Oxygenscans along the time t, which
+    unlike pO2 keeps increasing through the reoxygenation phase.
+    """
+    if isinstance(model, OsmoModel):
+        return model.O
+    if isinstance(model, OxyModel):
+        return model.t
+    raise TypeError(f"Unsupported model type: {type(model).__name__}")
+
+
+def _cache_key(channel: str, config: SmoothingConfig) -> tuple:
+    return "smoothed", channel, config
+
+
+def smooth_models(models, channel: str, config: SmoothingConfig):
+    """Compute and cache the smoothed channel for every model that does not have it yet."""
+    missing = [model for model in models if _cache_key(channel, config) not in model.cache]
+    if not missing:
+        return
+
+    smoothed = smooth_curves([abscissa(model) for model in missing],
+                             [model.data[channel] for model in missing], config)
+    for model, values in zip(missing, smoothed):
+        model.cache[_cache_key(channel, config)] = values
+
+
+def get_smoothed(model, channel: str, config: SmoothingConfig) -> np.ndarray:
+    """Return the smoothed channel of a model, computing it on first use."""
+    smooth_models([model], channel, config)
+    return model.cache[_cache_key(channel, config)]
@@ -0,0 +1,49 @@
+from abc import ABC
+
+from src.analysis.deviation import DEFAULT_BAND_K, DeviationResult, compare_models
+from src.base_classes.base_plugin import BasePlugin
+
+
+class BaseDeviationPlugin(BasePlugin, ABC):
+    """
+    Shades where a measurement leaves the mean ± k·SD band of each selected HC batch.
+
+    The pointwise z-scores against the batch are only recorded as results; they are in
+    SD units and would stretch the EI axes if drawn next to the curves.
+
+    Concrete plugins only add a name and a plugin type; the curve compared is the one
+    given by src.analysis.resampling.extract_curve for the model type.
+    """
+
+    DEFAULT_PARAMETERS = {"band_k": DEFAULT_BAND_K}
+    USES_REFERENCE_BATCHES = True
+
+    def prepare(self, models):
+        """Compare all models with every reference batch in one vectorized call per batch."""
+        super().prepare(models)
+        for batch in self.reference_batches():
+            compare_models(models, batch, self.parameters["band_k"])
+
+    def run_plugin(self, model):
+        """Main entry point for the plugin."""
+        self.set_model(model)
+        for batch in self.reference_batches():
+            result = compare_models([model], batch, self.parameters["band_k"])[model.id]
+            self.record_deviation(batch, result)
+            self.draw_deviation(batch, result)
+
+    def record_deviation(self, batch, result: DeviationResult):
+        self.add_scalar_result(f"integrated_deviation_{batch.name}", result.integrated_deviation)
+        self.add_scalar_result(f"max_abs_z_{batch.name}", result.max_abs_z)
+        self.add_scalar_result(f"fraction_outside_{batch.name}", result.fraction_outside)
+        self.add_vector_result(f"z_scores_{batch.name}", result.z_scores)
+
+    def draw_deviation(self, batch, result: DeviationResult):
+        # Fill between the curve and the band edge it crossed, one area per region
+        for start, stop, above in result.regions:
+            x = result.grid[start:stop]
+            edge = result.upper[start:stop] if above else result.lower[start:stop]
+            side = "Above" if above else "Below"
+            self.add_area_element(x, result.values[start:stop], edge,
+                                  label=f"{side} {batch.name} band ({x[0]:.0f}-{x[-1]:.0f})",
+                                  key=f"{side.lower()} {batch.name} band")
@@ -1,11 +1,14 @@
 import logging
 import uuid
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 
+from src.analysis import smoothing
+from src.analysis.smoothing import SmoothingConfig
 from src.base_classes.base_scan_model import BaseScanModel
+from src.base_classes.sweepable_plugin import SweepablePlugin
 from src.models.plot_element import LineElement, AreaElement, ScatterElement, CompositeLineElement
 
 logger = logging.getLogger(__name__)
@@ -16,10 +19,20 @@ UnionList = Union[list, np.ndarray]
 class BasePlugin(ABC):
     """Base class for all plugins."""
 
-    def __init__(self, plot_manager):
+    # Tunable parameters and their default values, e.g. {"degree": 8}
+    DEFAULT_PARAMETERS: dict = {}
+    # Whether the results depend on the selected HC batches, so a change reruns the plugin
+    USES_REFERENCE_BATCHES = False
+
+    def __init__(self, plot_manager, results_store=None):
         self.model = None
-        self.plot_manager = plot_manager
+        self.plot_manager = plot_manager  # None when running headless
+        self.results_store = results_store
+        self.model_container = None  # Set by the PluginManager, gives access to the HC batches
         self.id = str(uuid.uuid4())
+        self.parameters = dict(self.DEFAULT_PARAMETERS)
+        # (model ID, element type, element key) -> elements added in the current run
+        self._element_counts = {}
 
     @property
     @abstractmethod
@@ -29,39 +42,121 @@ class BasePlugin(ABC):
     def set_model(self, model):
         self.model = model
 
+    def run(self, model: BaseScanModel):
+        """
+        Run the plugin on a model, replacing the plot elements of its previous run.
+
+        Elements are keyed by plugin, model, element type and element key (the label
+        unless given), so a rerun overwrites them in place even when it skips some, and
+        elements it no longer creates are removed. Elements sharing a key are told apart
+        by their order in the run.
+        """
+        self._element_counts = {}
+        self.run_plugin(model)
+        if self.plot_manager is not None:
+            self.plot_manager.retain_elements(self.id, model.id, self._element_ids(model.id))
+
+    def _element_ids(self, model_id) -> set[str]:
+        """IDs of the elements added for a model in the current run."""
+        return {self._element_id(model_id, element_type, key, ordinal)
+                for (counted_model_id, element_type, key), count in self._element_counts.items()
+                if counted_model_id == model_id for ordinal in range(count)}
+
+    def _element_id(self, model_id, element_type: str, key: str, ordinal: int) -> str:
+        element_id = f"{self.id}:{model_id}:{element_type}:{key}"
+        return element_id if ordinal == 0 else f"{element_id}:{ordinal}"
+
+    def reference_batches(self) -> list:
+        """The selected HC batch models to compare against, empty without a model container."""
+        if self.model_container is None:
+            return []
+        return self.model_container.get_selected_batch_models()
+
+    def set_parameters(self, **parameters):
+        """Override one or more of the plugin's tunable parameters."""
+        unknown = parameters.keys() - self.parameters.keys()
+        if unknown:
+            raise ValueError(f"Unknown parameters for plugin {self.plugin_name}: {unknown}")
+        self.parameters.update(parameters)
+
+    @property
+    def smoothed_channels(self) -> list[tuple[str, SmoothingConfig]]:
+        """(channel, config) pairs the plugin reads through get_smoothed. Override if needed."""
+        return []
+
+    def prepare(self, models: list[BaseScanModel]):
+        """
+        Called once with all models before run_plugin runs on each of them.
+
+        Precomputes the smoothed channels for the whole batch; the results are cached on
+        the models and shared with every other plugin using the same configuration.
+        """
+        for channel, config in self.smoothed_channels:
+            smoothing.smooth_models(models, channel, config)
+
+    def get_smoothed(self, channel: str, config: SmoothingConfig) -> np.ndarray:
+        """Return a smoothed channel of the current model."""
+        return smoothing.get_smoothed(self.model, channel, config)
+
+    @classmethod
+    def is_sweepable(cls) -> bool:
+        """Whether the plugin implements SweepablePlugin, which parameter sweeps need."""
+        return issubclass(cls, SweepablePlugin)
+
     def add_line_element(self, x: UnionList, y: UnionList, label: str, is_batch=False,
-                         is_reference=False, **kwargs):
+                         is_reference=False, key: Optional[str] = None, **kwargs):
         """Helper method to add a line plot element."""
+        if self.plot_manager is None:
+            return
         element = LineElement(x, y, label, self, self.model, **kwargs)
-        element.is_batch = is_batch
-        element.is_reference = is_reference
-        self.plot_manager.add_element(element)
+        self._add_element(element, is_batch, is_reference, key)
 
     def add_point_element(self, x: float, y: float, label: str, is_batch=False,
-                          is_reference=False, **kwargs):
+                          is_reference=False, key: Optional[str] = None, **kwargs):
         """Helper method to add a point plot element."""
+        if self.plot_manager is None:
+            return
         element = ScatterElement([x], [y], label, self, self.model, **kwargs)
-        element.is_batch = is_batch
-        element.is_reference = is_reference
-        self.plot_manager.add_element(element)
+        self._add_element(element, is_batch, is_reference, key)
 
     def add_area_element(self, x: UnionList, y1: UnionList, y2: UnionList, label: str,
-                         is_batch=False, is_reference=False, **kwargs):
+                         is_batch=False, is_reference=False, key: Optional[str] = None, **kwargs):
         """Helper method to add an area plot element."""
+        if self.plot_manager is None:
+            return
         kwargs.setdefault("alpha", 0.5)  # Default transparency
         element = AreaElement(x, y1, y2, label, self, self.model, **kwargs)
-        element.is_batch = is_batch
-        element.is_reference = is_reference
-        self.plot_manager.add_element(element)
+        self._add_element(element, is_batch, is_reference, key)
 
     def add_composite_line_element(self, lines: list[tuple], label: str, is_batch=False,
-                                   is_reference=False, **kwargs):
+                                   is_reference=False, key: Optional[str] = None, **kwargs):
         """Helper method to add a composite line plot element."""
+        if self.plot_manager is None:
+            return
         element = CompositeLineElement(lines, label, self, self.model, **kwargs)
+        self._add_element(element, is_batch, is_reference, key)
+
+    def _add_element(self, element, is_batch, is_reference, key: Optional[str] = None):
+        """Key and flag the element and hand it over to the plot manager."""
+        count_key = (element.model_id, type(element).__name__,
+                     element.label if key is None else key)
+        ordinal = self._element_counts.get(count_key, 0)
+        self._element_counts[count_key] = ordinal + 1
+        element.id = self._element_id(*count_key, ordinal)
         element.is_batch = is_batch
         element.is_reference = is_reference
         self.plot_manager.add_element(element)
 
+    def add_scalar_result(self, key: str, value: float, unit: str = ""):
+        """Helper method to record a numeric result for the current model."""
+        if self.results_store is not None:
+            self.results_store.add_scalar(self.model, self, key, value, unit)
+
+    def add_vector_result(self, key: str, values: UnionList, unit: str = ""):
+        """Helper method to record an array of results for the current model."""
+        if self.results_store is not None:
+            self.results_store.add_vector(self.model, self, key, values, unit)
+
     @abstractmethod
     def run_plugin(self, model: BaseScanModel):
         pass
@@ -11,14 +11,19 @@ class BaseScanModel(ABC):
     data: dict[str, np.ndarray]
     metadata: dict
     id: str = field(default_factory=lambda: str(uuid.uuid4()))  # Automatically assign an ID
+    cache: dict = field(default_factory=dict, repr=False, compare=False)  # Derived data
 
     def __getattr__(self, item):
+        # Read the fields from __dict__ so lookups made before they exist (e.g. while
+        # unpickling in a worker process) fail cleanly instead of recursing
+        data = self.__dict__.get("data", {})
+        metadata = self.__dict__.get("metadata", {})
         # Convert attribute-like access for data keys
-        if item in self.data:
-            return self.data[item]
+        if item in data:
+            return data[item]
         # Check metadata as fallback
-        if item in self.metadata:
-            return self.metadata[item]
+        if item in metadata:
+            return metadata[item]
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
 
     def __hash__(self):
@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+
+from src.base_classes.base_scan_model import BaseScanModel
+
+
+class SweepablePlugin(ABC):
+    """Mixin for plugins that support parameter sweeps; see ParameterSweep."""
+
+    @abstractmethod
+    def score(self, model: BaseScanModel) -> dict[str, float]:
+        """Return goodness-of-fit metrics of the analysis for the current parameters."""
+        pass
@@ -0,0 +1,124 @@
+import csv
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from src.base_classes.base_scan_model import BaseScanModel
+
+logger = logging.getLogger(__name__)
+
+
+def _evaluate_combination(plugin_class, parameters: dict, model: BaseScanModel) -> dict:
+    """Score one parameter combination on one model (runs inside a worker)."""
+    row = {"model_id": model.id, "model_name": model.name, **parameters}
+
+    # Sweeps never render, so the plugin is created without a plot manager
+    plugin = plugin_class(None)
+    plugin.set_parameters(**parameters)
+
+    start = time.perf_counter()
+    try:
+        row.update(plugin.score(model))
+        row["error"] = ""
+    except Exception as e:
+        row["error"] = str(e)
+    row["elapsed_s"] = time.perf_counter() - start
+
+    return row
+
+
+class SweepResults:
+    """Table of sweep results, one row per (parameter combination, model)."""
+
+    def __init__(self, parameter_names: list[str], rows: Optional[list[dict]] = None):
+        self.parameter_names = parameter_names
+        self.rows = rows or []
+
+    @property
+    def columns(self) -> list[str]:
+        """Return all column names in a stable order."""
+        columns = []
+        for row in self.rows:
+            columns.extend(key for key in row if key not in columns)
+        return columns
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a single column as an array (missing values become NaN)."""
+        return np.array([row.get(name, np.nan) for row in self.rows])
+
+    def mean_by_combination(self, metric: str) -> list[tuple[dict, float]]:
+        """Average a metric over all models for each parameter combination."""
+        groups = {}
+        for row in self.rows:
+            if row.get("error") or metric not in row:
+                continue
+            key = tuple(row[name] for name in self.parameter_names)
+            groups.setdefault(key, []).append(row[metric])
+
+        return [(dict(zip(self.parameter_names, key)), float(np.mean(values)))
+                for key, values in groups.items()]
+
+    def best(self, metric: str, minimize=True) -> Optional[tuple[dict, float]]:
+        """Return the parameter combination with the best cohort-average metric."""
+        averages = self.mean_by_combination(metric)
+        if not averages:
+            return None
+        select = min if minimize else max
+        return select(averages, key=lambda item: item[1])
+
+    def to_csv(self, filepath: str):
+        """Write the results table to a CSV file."""
+        with open(filepath, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=self.columns)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class ParameterSweep:
+    """Evaluate a plugin over a grid of parameter values for a set of models."""
+
+    def __init__(self, plugin_class, parameter_grid: dict[str, list],
+                 max_workers: Optional[int] = None, use_processes=True):
+        # Checked up front, so a sweep never fails on every task inside the workers
+        if not plugin_class.is_sweepable():
+            raise ValueError(f"Plugin {plugin_class.__name__} does not support parameter sweeps.")
+        unknown = parameter_grid.keys() - plugin_class.DEFAULT_PARAMETERS.keys()
+        if unknown:
+            raise ValueError(f"Unknown parameters for plugin {plugin_class.__name__}: {unknown}")
+        self.plugin_class = plugin_class
+        self.parameter_grid = parameter_grid
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+    def combinations(self) -> list[dict]:
+        """Expand the parameter grid into all parameter combinations."""
+        names = list(self.parameter_grid)
+        return [dict(zip(names, values))
+                for values in itertools.product(*(self.parameter_grid[n] for n in names))]
+
+    def run(self, models: list[BaseScanModel]) -> SweepResults:
+        """Score every parameter combination on every model in a worker pool."""
+        results = SweepResults(list(self.parameter_grid))
+        tasks = [(parameters, model) for parameters in self.combinations() for model in models]
+        if not tasks:
+            logger.warning("Nothing to sweep: no models or parameter combinations given.")
+            return results
+
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        start = time.perf_counter()
+        with executor_class(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(_evaluate_combination, self.plugin_class, parameters,
+                                       model)
+                       for parameters, model in tasks]
+            for future in futures:
+                results.rows.append(future.result())
+
+        logger.info(f"Swept {len(tasks)} combinations in {time.perf_counter() - start:.2f}s")
+        return results
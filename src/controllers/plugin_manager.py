@@ -6,6 +6,8 @@ import os
 from src.base_classes.base_batch_plugin import BaseBatchPlugin
 from src.base_classes.base_plugin import BasePlugin
 from src.base_classes.base_scan_model import BaseScanModel
+from src.controllers.parameter_sweep import ParameterSweep, SweepResults
+from src.controllers.report_export import ReportExport, ReportOptions
 from src.models.batch_model import BatchModel
 
 PLUGINS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)),
@@ -21,10 +23,12 @@ class PluginManager:
         self.plugins = {}
         self.plugin_selection = {}  # Dictionary to store the selection state of plugins
         self.plot_manager = None
+        self.results_store = None
 
-    def load_plugins(self, plot_manager):
+    def load_plugins(self, plot_manager, results_store=None):
         """Loads all plugins from the plugins folder."""
         self.plot_manager = plot_manager
+        self.results_store = results_store
         if not os.path.isdir(PLUGINS_FOLDER):
             logger.info(f"Plugins folder does not exist. Creating: {PLUGINS_FOLDER}")
             os.makedirs(PLUGINS_FOLDER, exist_ok=True)
@@ -47,7 +51,8 @@ class PluginManager:
                         and attr is not BasePlugin
                         and not inspect.isabstract(attr)
                 ):
-                    plugin_instance = attr(self.plot_manager)
+                    plugin_instance = attr(self.plot_manager, self.results_store)
+                    plugin_instance.model_container = self.model_container
 
                     # Filter for plugins based on type of the measurements eg. Osmo, Oxy .etc
                     if self.model_container.model_type.value != plugin_instance.plugin_type.value:
@@ -97,10 +102,24 @@ class PluginManager:
             return
 
         for batch_model in selected_models:
-            plugin_instance.run_plugin(batch_model)
+            plugin_instance.run(batch_model)
 
         logger.info(f"Ran plugin: {plugin_instance.plugin_name} on selected models.")
 
+    def rerun_batch_plugins(self):
+        """Redraw every selected batch plugin, e.g. after the members of a batch changed."""
+        for plugin_id, plugin_instance in self.plugins.items():
+            if isinstance(plugin_instance, BaseBatchPlugin) \
+                    and self.plugin_selection.get(plugin_id):
+                self.run_plugin(plugin_id)  # Replaces the plugin's elements in place
+        self.rerun_reference_plugins()
+
+    def rerun_reference_plugins(self):
+        """Rerun the selected plugins that compare against the HC batches, e.g. after a change."""
+        for plugin_id, plugin_instance in self.plugins.items():
+            if plugin_instance.USES_REFERENCE_BATCHES and self.plugin_selection.get(plugin_id):
+                self.run_plugin(plugin_id)
+
     def _run_base_plugin(self, plugin_instance):
         """Run the base plugin for selected models."""
         selected_models = self.model_container.get_selected_models()
@@ -108,11 +127,72 @@ class PluginManager:
             logger.warning("No models selected to run the plugin on.")
             return
 
+        plugin_instance.prepare(selected_models)
         for model in selected_models:
-            plugin_instance.run_plugin(model)
+            plugin_instance.run(model)
 
         logger.info(f"Ran plugin: {plugin_instance.plugin_name} on selected models.")
 
+    def sweep_plugin(self, plugin_id, parameter_grid: dict[str, list],
+                     max_workers=None) -> SweepResults | None:
+        """Evaluate a plugin over a parameter grid on all selected models."""
+        plugin_instance = self.plugins.get(plugin_id)
+        if not plugin_instance:
+            logger.warning(f"Plugin with ID {plugin_id} not found.")
+            return None
+
+        if not plugin_instance.is_sweepable():
+            logger.warning(f"Plugin {plugin_instance.plugin_name} does not support parameter "
+                           f"sweeps.")
+            return None
+
+        selected_models = self.model_container.get_selected_models()
+        if not selected_models:
+            logger.warning("No models selected to run the parameter sweep on.")
+            return None
+
+        sweep = ParameterSweep(type(plugin_instance), parameter_grid, max_workers=max_workers)
+        return sweep.run(selected_models)
+
+    def export_report(self, folder: str, options: ReportOptions, progress=None,
+                      max_workers=None) -> list[dict]:
+        """Export one page per selected model with the selected (non-batch) plugins."""
+        selected_models = self.model_container.get_selected_models()
+        if not selected_models:
+            logger.warning("No models selected to export a report for.")
+            return []
+
+        plugins = [(type(plugin), dict(plugin.parameters))
+                   for plugin_id, plugin in self.plugins.items()
+                   if self.plugin_selection.get(plugin_id)
+                   and not isinstance(plugin, BaseBatchPlugin)]
+        report = ReportExport(plugins, folder, options, max_workers=max_workers)
+        return report.run(selected_models, progress)
+
+    def extract_results(self, models: list[BaseScanModel], results_store):
+        """
+        Run the selected plugins headless on the given models, writing only numeric results.
+
+        No plot elements are created, so this scales to large cohorts.
+        """
+        for plugin_id, plugin in self.plugins.items():
+            if not self.plugin_selection.get(plugin_id) or isinstance(plugin, BaseBatchPlugin):
+                continue
+
+            headless_plugin = type(plugin)(None, results_store)
+            headless_plugin.id = plugin.id  # Keep results keyed by the visible plugin
+            headless_plugin.model_container = self.model_container
+            headless_plugin.set_parameters(**plugin.parameters)
+            headless_plugin.prepare(models)
+            for model in models:
+                try:
+                    headless_plugin.run_plugin(model)
+                except Exception as e:
+                    logger.error(f"Error running plugin {plugin.plugin_name} on model "
+                                 f"{model.id}: {e}")
+
+        return results_store
+
     def analyze_model(self, model_id: str):
         """
         Analyzes the specified model by running all available selected plugins on it.
@@ -144,7 +224,9 @@ class PluginManager:
                     if isinstance(plugin, plugin_class):
                         logger.info(f"Running plugin: {plugin.plugin_name} on model ID {model_id}")
                         try:
-                            plugin.run_plugin(model)  # Run the plugin on the model
+                            if plugin_class is BasePlugin:
+                                plugin.prepare([model])
+                            plugin.run(model)  # Run the plugin on the model
                             logger.info(f"Ran plugin: {plugin.plugin_name} successfully.")
                         except Exception as e:
                             logger.error(
@@ -171,6 +253,8 @@ class PluginManager:
                 self.run_plugin(plugin_id)
             else:
                 self.plot_manager.remove_elements_by_plugin_id(plugin_id)
+                if self.results_store is not None:
+                    self.results_store.remove_by_plugin_id(plugin_id)
         else:
             logger.warning(f"Plugin with ID {plugin_id} not found.")
 
@@ -0,0 +1,245 @@
+import csv
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.backends.backend_pdf import PdfPages
+
+from src.base_classes.base_scan_model import BaseScanModel
+from src.models.plot_element import data_limits
+from src.utils.plot_export_helper import ExportSnapshot, export_plot, render_figure
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.csv"
+MANIFEST_COLUMNS = ["page_key", "model_name", "files", "error", "elapsed_s"]
+COMBINED_PDF_FILENAME = "report.pdf"
+
+
+@dataclass(frozen=True)
+class ReportOptions:
+    """Layout of every page of a report."""
+    formats: tuple[str, ...] = ("png",)  # One file per model and format
+    combined_pdf: bool = False  # Also write all pages into one multi-page PDF
+    width: int = 1920
+    height: int = 1080
+    dpi: int = 200
+    x_label: Optional[str] = None
+    y_label: Optional[str] = None
+    grid: bool = True
+
+
+class ElementCollector:
+    """Stands in for the PlotManager of a headless plugin and keeps the elements it adds."""
+
+    def __init__(self):
+        self.elements = {}
+
+    def add_element(self, element):
+        self.elements[element.id] = element
+
+    def retain_elements(self, plugin_id, model_id, element_ids):
+        pass  # Every report starts from a fresh collector, so there is nothing to drop
+
+
+def page_filename(model: BaseScanModel) -> str:
+    """File name stem of a model's page: its name with unsafe characters replaced."""
+    return re.sub(r"[^\w.-]+", "_", model.name).strip("_") or model.id
+
+
+def page_key(model: BaseScanModel) -> str:
+    """
+    Identifies a model's page across runs and sessions: a hash of its name and data.
+
+    Model IDs are assigned anew on every load, so they cannot key a resumable manifest.
+    """
+    key = ("page_key",)
+    if key not in model.cache:
+        digest = hashlib.sha1(model.name.encode())
+        for channel in sorted(model.data):
+            digest.update(channel.encode())
+            digest.update(np.ascontiguousarray(model.data[channel], dtype=float).tobytes())
+        model.cache[key] = digest.hexdigest()
+    return model.cache[key]
+
+
+def page_filenames(models: list[BaseScanModel]) -> dict[str, str]:
+    """
+    File name stems by page key.
+
+    Stems shared by several models (ignoring case, as some file systems do) get the
+    start of the page key appended, so no page overwrites another.
+    """
+    stems = {page_key(model): page_filename(model) for model in models}
+    counts = Counter(stem.lower() for stem in stems.values())
+    return {key: stem if counts[stem.lower()] == 1 else f"{stem}_{key[:8]}"
+            for key, stem in stems.items()}
+
+
+def collect_snapshot(plugins: list[tuple], model: BaseScanModel) -> ExportSnapshot:
+    """Run the plugins headless on a model and capture their elements as an export snapshot."""
+    collector = ElementCollector()
+    for plugin_class, parameters in plugins:
+        plugin = plugin_class(collector)
+        plugin.set_parameters(**parameters)
+        plugin.prepare([model])
+        plugin.run(model)
+
+    elements = list(collector.elements.values())
+    for element in elements:
+        element.plugin = element.model = None  # Pages only need the data, not the sources
+    colors = itertools.cycle(rcParams["axes.prop_cycle"].by_key()["color"])
+    limits = data_limits(elements) or ((0.0, 1.0), (0.0, 1.0))
+    return ExportSnapshot(elements=[(element, next(colors)) for element in elements],
+                          x_limits=limits[0], y_limits=limits[1])
+
+
+def _export_model(plugins: list[tuple], model: BaseScanModel, key: str, stem: str, folder: str,
+                  options: ReportOptions, write_files: bool) -> tuple[dict, ExportSnapshot]:
+    """Write the page files of one model (runs inside a worker)."""
+    row = {"page_key": key, "model_name": model.name, "files": "", "error": ""}
+    start = time.perf_counter()
+    snapshot = None
+    try:
+        snapshot = collect_snapshot(plugins, model)
+        if write_files:
+            files = []
+            for file_format in options.formats:
+                filepath = os.path.join(folder, f"{stem}.{file_format}")
+                export_plot(snapshot, filepath, options.width, options.height, options.dpi,
+                            options.x_label, options.y_label, model.name, options.grid,
+                            file_format)
+                files.append(os.path.basename(filepath))
+            row["files"] = ";".join(files)
+    except Exception as e:
+        row["error"] = str(e)
+    row["elapsed_s"] = time.perf_counter() - start
+    return row, snapshot if options.combined_pdf else None
+
+
+def read_manifest(folder: str) -> dict[str, dict]:
+    """Rows of an existing manifest by page key, empty if there is none."""
+    filepath = os.path.join(folder, MANIFEST_FILENAME)
+    if not os.path.exists(filepath):
+        return {}
+    with open(filepath, newline="") as file:
+        return {row["page_key"]: row for row in csv.DictReader(file) if row.get("page_key")}
+
+
+def is_complete(row: Optional[dict], folder: str, options: ReportOptions) -> bool:
+    """Whether a manifest row lists every requested file of its model and they all exist."""
+    if not row or row.get("error"):
+        return False
+    files = row.get("files", "").split(";")
+    return all(any(name.endswith(f".{file_format}") for name in files)
+               for file_format in options.formats) \
+        and all(os.path.exists(os.path.join(folder, name)) for name in files if name)
+
+
+class ReportExport:
+    """
+    Export one page per model for a set of plugins, as files in a report folder.
+
+    Pages are rendered offscreen in a worker pool. Worker processes are always
+    spawned, never forked, since the exporting process may be the multithreaded GUI.
+    A manifest row is written as soon as a model is done, so an interrupted export
+    resumes with the missing models only.
+    The combined PDF always holds every model and is written in model order.
+    """
+
+    def __init__(self, plugins: list[tuple], folder: str,
+                 options: ReportOptions = ReportOptions(), max_workers: Optional[int] = None,
+                 use_processes=True):
+        self.plugins = plugins  # (plugin class, parameters) pairs
+        self.folder = folder
+        self.options = options
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+    def run(self, models: list[BaseScanModel],
+            progress: Optional[Callable[[int, int], None]] = None) -> list[dict]:
+        """
+        Export the pages of all models, skipping those the manifest lists as complete.
+
+        Args:
+            models: The models to export, in page order. Models with the same name and
+                data share one page.
+            progress: Called with (pages done, total) after every page.
+
+        Returns:
+            The manifest rows of all pages, in page order.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        pages = {}
+        for model in models:
+            pages.setdefault(page_key(model), model)
+        keys = list(pages)
+        stems = page_filenames(list(pages.values()))
+        manifest = read_manifest(self.folder)
+        done = [key for key in keys if is_complete(manifest.get(key), self.folder, self.options)]
+        complete = set(done)
+        # Without a combined PDF, complete pages need no work at all
+        tasks = [key for key in keys if key not in complete or self.options.combined_pdf]
+
+        snapshots = {}
+        start = time.perf_counter()
+        if self.use_processes:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        with executor, \
+                open(os.path.join(self.folder, MANIFEST_FILENAME), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=MANIFEST_COLUMNS)
+            writer.writeheader()
+            for key in done:
+                writer.writerow({column: manifest[key].get(column, "")
+                                 for column in MANIFEST_COLUMNS})
+            file.flush()
+
+            futures = {executor.submit(_export_model, self.plugins, pages[key], key, stems[key],
+                                       self.folder, self.options, key not in complete): key
+                       for key in tasks}
+            finished = len(keys) - len(tasks)
+            for future in as_completed(futures):
+                key = futures[future]
+                row, snapshots[key] = future.result()
+                if key not in complete:
+                    manifest[key] = row
+                    writer.writerow(row)
+                    file.flush()
+                    if row["error"]:
+                        logger.error(f"Failed to export the report of {row['model_name']}: "
+                                     f"{row['error']}")
+                finished += 1
+                if progress is not None:
+                    progress(finished, len(keys))
+
+        if self.options.combined_pdf:
+            self.write_combined_pdf([pages[key] for key in keys], snapshots)
+
+        logger.info(f"Exported {len(tasks)} report pages in {time.perf_counter() - start:.2f}s")
+        return [manifest[key] for key in keys if key in manifest]
+
+    def write_combined_pdf(self, models: list[BaseScanModel], snapshots: dict):
+        """Write one PDF page per model with a snapshot (by page key), in model order."""
+        options = self.options
+        with PdfPages(os.path.join(self.folder, COMBINED_PDF_FILENAME)) as pdf:
+            for model in models:
+                snapshot = snapshots.get(page_key(model))
+                if snapshot is None:
+                    continue
+                fig = render_figure(snapshot, options.width, options.height, options.dpi,
+                                    options.x_label, options.y_label, model.name, options.grid,
+                                    "pdf")
+                pdf.savefig(fig)
@@ -1,19 +1,28 @@
+import functools
 import logging
+import os
 
 from src.controllers.plugin_manager import PluginManager
+from src.models.batch_model import BatchModel
 from src.models.model_container import ModelContainer
-from src.views.plot_manager import PlotManager
+from src.models.results_store import ResultsStore
+from src.utils.sparkline import SparklineCache
+from src.views.plot_manager import PlotManager, RESULTS_FOLDER
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
 
+SPARKLINE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), '../cache/sparklines')
+
 
 class ViewController:
     def __init__(self):
         self.view = None
         self._model_container = ModelContainer()  # Store models and sets
         self._plot_manager = PlotManager()
+        self._results_store = ResultsStore()  # Numeric plugin results of this view
         self._plugin_manager = PluginManager(self._model_container)
+        self._sparklines = SparklineCache(SPARKLINE_FOLDER)  # Measurement tree previews
 
     def register_view(self, view):
         """Register a view instance."""
@@ -22,7 +31,7 @@ class ViewController:
     def initial_file_load(self, file_paths):
         try:
             self._model_container.load_files(file_paths)
-            self._plugin_manager.load_plugins(self._plot_manager)
+            self._plugin_manager.load_plugins(self._plot_manager, self._results_store)
             return True
         except Exception as e:
             logger.error(f"Error during loading files: {e}")
@@ -49,11 +58,32 @@ class ViewController:
         # Return the updated figure
         return self._plot_manager.get_figure()
 
+    def update_selection(self, added_element_ids, removed_element_ids):
+        """Apply element check state changes to the canvas and return the figure."""
+        self._plot_manager.update_selection(added_element_ids, removed_element_ids)
+        return self._plot_manager.get_figure()
+
+    def update_hover(self, x_pixel, y_pixel, inside_axes=True):
+        """Update the canvas hover readout; True if the canvas needs a redraw."""
+        return self._plot_manager.update_hover(x_pixel, y_pixel, inside_axes)
+
+    def pick_element(self, x_pixel, y_pixel):
+        """(model ID, element ID) of the shown element under a canvas position, or None."""
+        result = self._plot_manager.pick(x_pixel, y_pixel)
+        if result is None:
+            return None
+        return self._plot_manager.get_element_by_id(result.element_id).model_id, result.element_id
+
     def run_plugin(self, plugin_id):
         """Run the plugin(s) with the provided plugin IDs."""
         self._plugin_manager.run_plugin(plugin_id)
         logger.info(
-            f"Ran plugin {plugin_id}. Elements after running: {self._plot_manager.get_all_elements()}")
+            f"Ran plugin {plugin_id}. Elements after running: "
+            f"{len(self._plot_manager.get_all_elements())}")
+
+    def sweep_plugin(self, plugin_id, parameter_grid, max_workers=None):
+        """Evaluate a plugin over a parameter grid on the selected models."""
+        return self._plugin_manager.sweep_plugin(plugin_id, parameter_grid, max_workers)
 
     def get_all_elements(self):
         """Retrieve all elements for listing."""
@@ -64,18 +94,66 @@ class ViewController:
     def get_all_measurements_with_selection(self):
         return self._model_container.get_models_with_selection()
 
+    def get_cached_sparkline(self, model_id):
+        """File path of the model's preview if it is on disk already, else None."""
+        model = self._model_container.get_model_by_id(model_id)
+        return self._sparklines.cached(model) if model is not None else None
+
+    def create_sparkline_job(self, model_id):
+        """A callable rendering the model's preview and returning (model ID, file path)."""
+        model = self._model_container.get_model_by_id(model_id)
+        return functools.partial(self._render_sparkline, model_id, model)
+
+    def _render_sparkline(self, model_id, model):
+        """Render a preview; a failure gives no path, so the view can tell which row failed."""
+        try:
+            return model_id, self._sparklines.render(model)
+        except Exception as e:
+            logger.error(f"Failed to render the sparkline of model {model_id}: {e}")
+            return model_id, None
+
+    def find_similar_models(self, model_id, k=5):
+        return self._model_container.find_similar_models(model_id, k)
+
     def get_elements_by_model_id(self, model_id):
         return self._plot_manager.get_elements_by_model_id(model_id)
 
-    def save_plot(self, filename, width, height, dpi, x_label, y_label, title, grid: bool):
+    def has_visible_elements(self):
+        return self._plot_manager.has_visible_elements()
+
+    def save_plot(self, filename, width, height, dpi, x_label, y_label, title, grid: bool,
+                  file_format="png"):
         """Delegate the save plot operation to PlotManager."""
         self._plot_manager.save_plot(
-            filename, width, height, dpi, x_label, y_label, title, grid
+            filename, width, height, dpi, x_label, y_label, title, grid, file_format
+        )
+
+    def create_export_job(self, filename, width, height, dpi, x_label, y_label, title,
+                          grid: bool, file_format="png"):
+        """Capture the current plot for an export that can run in a background worker."""
+        return self._plot_manager.export_job(
+            filename, width, height, dpi, x_label, y_label, title, grid, file_format
         )
 
+    def export_report(self, name, options, progress=None, max_workers=None):
+        """Export a page per selected model into a report folder in the results folder."""
+        folder = os.path.join(RESULTS_FOLDER, name)
+        self._plugin_manager.export_report(folder, options, progress, max_workers)
+        return folder
+
+    def get_results_store(self):
+        return self._results_store
+
+    def export_results(self, filename, wide=False):
+        """Export the numeric plugin results as a CSV file in the results folder."""
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        filepath = os.path.join(RESULTS_FOLDER, filename + ".csv")
+        self._results_store.to_csv(filepath, wide=wide)
+        return filepath
+
     def update_canvas(self):
         if self.view:
-            self.view.update_canvas()
+            self.view.request_canvas_update()
 
     def update_model_selection(self, model_id, selected):
         self._model_container.update_selection(model_id, selected)
@@ -83,6 +161,11 @@ class ViewController:
             self._plugin_manager.analyze_model(model_id)
         else:
             self._plot_manager.remove_elements_by_model_id(model_id)
+            self._results_store.remove_by_model_id(model_id)
+
+        # Comparisons against the HC batches follow the batch selection
+        if isinstance(self._model_container.get_model_by_id(model_id), BatchModel):
+            self._plugin_manager.rerun_reference_plugins()
 
     def update_plugin_selection(self, plugin_id, selected, is_batch=False):
         self._plugin_manager.set_plugin_selection(plugin_id, selected)
@@ -102,6 +185,13 @@ class ViewController:
     def get_batch_models(self):
         return self._model_container.get_batch_models_with_selection()
 
+    def exclude_hc_outliers(self):
+        """Deselect outlying members of every HC batch and redraw the batch plugins."""
+        reports = self._model_container.exclude_batch_outliers()
+        self._plugin_manager.rerun_batch_plugins()
+        self.update_canvas()
+        return reports
+
     def __del__(self):
         """Notify when the controller is deleted."""
         logger.info(f"Controller {self} deleted.")
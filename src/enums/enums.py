@@ -9,3 +9,24 @@ class PluginType(Enum):
 class ContainerType(Enum):
     OSMO = "Osmo"
     OXY = "Oxy"
+
+
+class CurveType(Enum):
+    BUMP = "bump"
+    VALLEY = "valley"
+
+
+class SmoothingMethod(Enum):
+    SAVGOL = "savgol"
+    MEDIAN = "median"
+    SPLINE = "spline"
+
+
+class AlignmentMode(Enum):
+    SHIFT = "shift"
+    DTW = "dtw"
+
+
+class PolynomialBasis(Enum):
+    CHEBYSHEV = "chebyshev"
+    LEGENDRE = "legendre"
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 
 from PySide6.QtWidgets import QApplication
@@ -6,6 +7,8 @@ from src.ui.main_ui import MainWindow
 
 
 def main():
+    # Spawned worker processes of frozen builds must not start another GUI
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
 
     # Initialize the Main View and Controller
@@ -1,7 +1,9 @@
 import uuid
 from dataclasses import field, dataclass
-from typing import List
+from typing import List, Optional
 
+from src.analysis.reference_statistics import ReferenceStatistics
+from src.analysis.resampling import GRID_POINTS, model_grid
 from src.base_classes.base_scan_model import BaseScanModel
 
 
@@ -12,6 +14,28 @@ class BatchModel:
     models: List[BaseScanModel] = field(default_factory=list)
     models_selection: dict[str, bool] = field(default_factory=dict)
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # Running statistics of the selected models, created on first use
+    statistics: Optional[ReferenceStatistics] = field(default=None, init=False, repr=False)
+    # Results derived from the members, keyed by what they depend on (e.g. statistics version)
+    cache: dict = field(default_factory=dict, init=False, repr=False)
+
+    def selected_models(self) -> List[BaseScanModel]:
+        return [model for model in self.models if self.models_selection.get(model.id, False)]
+
+    def reference_statistics(self, points: int = GRID_POINTS) -> ReferenceStatistics:
+        """
+        Return the reference statistics of the selected models.
+
+        The grid spans the models present on first use; afterwards the statistics are
+        updated incrementally as models are added, removed, selected or deselected.
+        """
+        if self.statistics is None:
+            if self.is_empty():
+                raise ValueError(f"Batch {self.name} has no models.")
+            self.statistics = ReferenceStatistics(model_grid(self.models, points))
+            for model in self.selected_models():
+                self.statistics.add(model)
+        return self.statistics
 
     def is_empty(self) -> bool:
         return not bool(self.models)
@@ -20,6 +44,8 @@ class BatchModel:
         if model not in self.models:
             self.models.append(model)
             self.models_selection[model.id] = True
+            if self.statistics is not None:
+                self.statistics.add(model)
         else:
             print(f"Model {model} already exists in Batch_Model")
 
@@ -27,11 +53,19 @@ class BatchModel:
         if model in self.models:
             self.models.remove(model)
             self.models_selection.pop(model.id, None)
+            if self.statistics is not None:
+                self.statistics.remove(model)
 
     def change_model_selection(self, model_id, is_selected):
         """Change the selection state of a model."""
         if model_id in self.models_selection:
             self.models_selection[model_id] = is_selected
+            if self.statistics is not None:
+                model = next(model for model in self.models if model.id == model_id)
+                if is_selected:
+                    self.statistics.add(model)
+                else:
+                    self.statistics.remove(model)
         else:
             print(f"Model with ID {model_id} does not exist in selection.")
 
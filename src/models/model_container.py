@@ -2,6 +2,8 @@ import logging
 import os
 from typing import Set, List, Union, Optional
 
+from src.analysis.outlier_detection import OutlierReport, screen_batch
+from src.analysis.similarity_index import SimilarityIndex
 from src.base_classes.base_scan_model import BaseScanModel
 from src.enums.enums import ContainerType
 from src.models.batch_model import BatchModel
@@ -23,6 +25,7 @@ class ModelContainer:
         self.selection_state: dict[str, bool] = {}  # Track selection state by model ID
         self.batch_models: Set[BatchModel] = set()  # Set of Batch Models Models
         self.model_type = None  # Model type (either OsmoModel or OxyModel)
+        self.similarity_index = SimilarityIndex()  # k-NN search over all loaded models
 
     def determine_loader(self, file_path: str) -> Union[
         OsmoDataLoader, OxyDataLoader]:
@@ -57,6 +60,7 @@ class ModelContainer:
                 logger.warning(f"Failed to load model from file: {file_path}")
 
         self.single_models.update(models)
+        self._index_models(models)
         if not self.batch_models:
             self._load_batch()
 
@@ -92,6 +96,9 @@ class ModelContainer:
             logger.info(f"No valid CSV files found in folder: {folder_path}. Skipping...")
             return
 
+        # Flag suspicious runs; excluding them is left to an explicit request
+        self._screen_batch(hc_model)
+
         # Add the HCModel to the main collection
         self.batch_models.add(hc_model)
 
@@ -105,6 +112,41 @@ class ModelContainer:
                     hc_model.add_model(model)
                 else:
                     logger.warning(f"Failed to load model from file: {file_path}")
+        self._index_models(hc_model.models)
+
+    def _index_models(self, models):
+        """Add models to the similarity index; indexing problems never block loading."""
+        if not models:
+            return
+        try:
+            self.similarity_index.add(list(models))
+        except Exception as e:
+            logger.error(f"Error adding models to the similarity index: {e}")
+
+    @staticmethod
+    def _screen_batch(batch_model: BatchModel, exclude: bool = False) -> Optional[OutlierReport]:
+        """Run the outlier screening on a batch; screening problems never block loading."""
+        try:
+            return screen_batch(batch_model, exclude=exclude)
+        except Exception as e:
+            logger.error(f"Error screening batch {batch_model.name} for outliers: {e}")
+            return None
+
+    def exclude_batch_outliers(self) -> dict[str, OutlierReport]:
+        """Deselect the outliers of every batch model, returning the reports by batch ID."""
+        reports = {}
+        for batch_model in self.batch_models:
+            report = self._screen_batch(batch_model, exclude=True)
+            if report is not None:
+                reports[batch_model.id] = report
+        return reports
+
+    def find_similar_models(self, model_id: str, k: int = 5) -> List[tuple]:
+        """Return up to k (model, distance) pairs of loaded measurements most similar to a model."""
+        model = self.get_model_by_id(model_id)
+        if model is None or isinstance(model, BatchModel):
+            return []
+        return self.similarity_index.query(model, k)
 
     @staticmethod
     def _get_first_csv_file(folder_path):
@@ -40,4 +40,7 @@ class OsmoDataLoader(BaseDataLoader):
 
         filename = os.path.splitext(os.path.basename(filepath))[0]
 
-        return OsmoModel(data=data, metadata=meta_data, name=filename)
+        model = OsmoModel(data=data, metadata=meta_data, name=filename)
+        # Area queries rely on a sorted O axis, so check it once here
+        model.cache[("sorted", "O.")] = DataValidator.is_sorted(data["O."])
+        return model
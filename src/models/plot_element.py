@@ -1,9 +1,20 @@
 import uuid
 from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+from src.utils.decimation import MIN_DECIMATION_POINTS, build_pyramid
+
+# Fraction of the data range added around it when setting the axis limits
+LIMIT_MARGIN = 0.05
 
 
 # Base class for plot elements
 class PlotElement(ABC):
+    pickable = True  # Whether hover and click pick the element's points
+
     def __init__(self, label: str, plugin, model, **kwargs):
         self.id = str(uuid.uuid4())  # Generate a unique ID for each element
         self.label = label
@@ -12,10 +23,44 @@ class PlotElement(ABC):
         self.kwargs = kwargs
         self.is_batch = False  # True for batch plugin' elements
         self.is_reference = False  # True if used as a reference in the background
+        self._bounds = None
+        self._pyramids = None
+
+    @abstractmethod
+    def render(self, ax, color=None) -> list:
+        """Plot the element on the axes and return the created artists."""
+        pass
 
     @abstractmethod
-    def render(self, ax):
-        """Subclasses must implement the render method to plot the element."""
+    def data_arrays(self) -> list[tuple]:
+        """Return the (x, y) arrays spanned by the element's data."""
+        pass
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """(x min, x max, y min, y max) of the element's finite data, NaN if it has none."""
+        if self._bounds is None:
+            arrays = [(np.ravel(np.asarray(x, dtype=float)), np.ravel(np.asarray(y, dtype=float)))
+                      for x, y in self.data_arrays()]
+            x = np.concatenate([x for x, _ in arrays])
+            y = np.concatenate([y for _, y in arrays])
+            x, y = x[np.isfinite(x)], y[np.isfinite(y)]
+            self._bounds = (float(x.min()), float(x.max()), float(y.min()), float(y.max())) \
+                if x.size and y.size else (np.nan,) * 4
+        return self._bounds
+
+    def decimation_pyramids(self) -> list:
+        """Decimation structure (or None) per curve, see build_pyramid; only lines have any."""
+        return []
+
+    def update_decimation(self, artists: list, view: Optional[tuple[float, float, int]]):
+        """
+        Redraw the decimated curves of the element's artists.
+
+        Args:
+            artists: The artists returned by render.
+            view: (x min, x max, pixels) of the axes, or None for full resolution.
+        """
         pass
 
     def get_render_kwargs(self, color=None):
@@ -52,6 +97,32 @@ class PlotElement(ABC):
         return self.plugin.id
 
 
+def data_bounds(elements) -> Optional[np.ndarray]:
+    """(x min, x max, y min, y max) spanned by the data of the elements, None without data."""
+    bounds = np.array([element.bounds for element in elements]).reshape(-1, 4)
+    if np.all(np.isnan(bounds)):
+        return None
+    return np.concatenate([[np.nanmin(bounds[:, column]), np.nanmax(bounds[:, column + 1])]
+                           for column in (0, 2)])
+
+
+def data_limits(elements, margin: float = LIMIT_MARGIN) -> Optional[tuple[tuple, tuple]]:
+    """((x min, x max), (y min, y max)) around the data of the elements, None without data."""
+    bounds = data_bounds(elements)
+    return None if bounds is None else bounds_limits(bounds, margin)
+
+
+def bounds_limits(bounds, margin: float = LIMIT_MARGIN) -> tuple[tuple, tuple]:
+    """((x min, x max), (y min, y max)) around (x min, x max, y min, y max) data bounds."""
+    x_min, x_max, y_min, y_max = bounds
+    return _with_margin(x_min, x_max, margin), _with_margin(y_min, y_max, margin)
+
+
+def _with_margin(low, high, margin):
+    padding = margin * (high - low) if high > low else 0.5
+    return float(low - padding), float(high + padding)
+
+
 # Line plot element
 class LineElement(PlotElement):
     def __init__(self, x, y, label, plugin, model, **kwargs):
@@ -60,11 +131,25 @@ class LineElement(PlotElement):
         self.y = y
 
     def render(self, ax, color=None):
-        ax.plot(self.x, self.y, label=self.label, **self.get_render_kwargs(color))
+        return ax.plot(self.x, self.y, label=self.label, **self.get_render_kwargs(color))
+
+    def data_arrays(self):
+        return [(self.x, self.y)]
+
+    def decimation_pyramids(self):
+        if self._pyramids is None:
+            self._pyramids = [build_pyramid(self.x, self.y)]
+        return self._pyramids
+
+    def update_decimation(self, artists, view):
+        pyramid = self.decimation_pyramids()[0]
+        if pyramid is not None:
+            artists[0].set_data(*(pyramid.view(*view) if view else (pyramid.x, pyramid.y)))
 
 
 # Area plot element
 class AreaElement(PlotElement):
+    pickable = False  # Areas shade other curves; their edges are not data points
     def __init__(self, x, y1, y2, label, plugin, model, **kwargs):
         super().__init__(label, plugin, model, **kwargs)
         self.x = x
@@ -72,7 +157,11 @@ class AreaElement(PlotElement):
         self.y2 = y2
 
     def render(self, ax, color=None):
-        ax.fill_between(self.x, self.y1, self.y2, label=self.label, **self.get_render_kwargs(color))
+        return [ax.fill_between(self.x, self.y1, self.y2, label=self.label,
+                                **self.get_render_kwargs(color))]
+
+    def data_arrays(self):
+        return [(self.x, self.y1), (self.x, self.y2)]
 
 
 # Scatter plot element
@@ -83,7 +172,10 @@ class ScatterElement(PlotElement):
         self.y = y
 
     def render(self, ax, color=None):
-        ax.scatter(self.x, self.y, label=self.label, **self.get_render_kwargs(color))
+        return [ax.scatter(self.x, self.y, label=self.label, **self.get_render_kwargs(color))]
+
+    def data_arrays(self):
+        return [(self.x, self.y)]
 
 
 # Composite Line plot element
@@ -93,8 +185,28 @@ class CompositeLineElement(PlotElement):
         self.lines = lines
 
     def render(self, ax, color=None):
-        kwargs = self.get_render_kwargs(color)
-        for i, (x, y) in enumerate(self.lines):
-            line_kwargs = kwargs.copy()
-            line_kwargs["label"] = self.label if i == 0 else "_nolegend_"
-            ax.plot(x, y, **line_kwargs)
+        # One collection for all lines keeps the artist count, and the legend, at one entry
+        collection = LineCollection(self.segments(), label=self.label,
+                                    **self.get_render_kwargs(color))
+        ax.add_collection(collection, autolim=False)
+        return [collection]
+
+    def segments(self, view: Optional[tuple[float, float, int]] = None) -> list[np.ndarray]:
+        """(M, 2) vertex arrays of the lines, decimated to the view where possible."""
+        pyramids = self.decimation_pyramids() if view else [None] * len(self.lines)
+        return [np.column_stack(pyramid.view(*view) if pyramid is not None else (x, y))
+                for (x, y), pyramid in zip(self.lines, pyramids)]
+
+    def data_arrays(self):
+        return self.lines or [([], [])]
+
+    def decimation_pyramids(self):
+        if self._pyramids is None:
+            # Overlays of many shorter curves are as heavy as one long curve
+            total = sum(len(x) for x, _ in self.lines)
+            self._pyramids = [build_pyramid(x, y, min_points=0) for x, y in self.lines] \
+                if total >= MIN_DECIMATION_POINTS else [None] * len(self.lines)
+        return self._pyramids
+
+    def update_decimation(self, artists, view):
+        artists[0].set_segments(self.segments(view))
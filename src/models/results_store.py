@@ -0,0 +1,124 @@
+import csv
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCALAR_COLUMNS = ("model_id", "model_name", "plugin_id", "plugin_name", "key", "value", "unit")
+
+
+class ResultsStore:
+    """Columnar store of numeric plugin results, keyed by model, plugin and result key."""
+
+    def __init__(self):
+        self._columns: dict[str, list] = {name: [] for name in SCALAR_COLUMNS}
+        self._rows: dict[tuple[str, str, str], int] = {}  # (model_id, plugin_id, key) -> row
+        self._vectors: dict[tuple[str, str, str], np.ndarray] = {}
+        self._vector_units: dict[tuple[str, str, str], str] = {}
+
+    def add_scalar(self, model, plugin, key: str, value: float, unit: str = ""):
+        """Write a scalar result, replacing an earlier value with the same key."""
+        row_key = (model.id, plugin.id, key)
+        row = self._rows.get(row_key)
+        if row is None:
+            self._rows[row_key] = len(self._columns["value"])
+            for name, cell in zip(SCALAR_COLUMNS, (model.id, model.name, plugin.id,
+                                                   plugin.plugin_name, key, value, unit)):
+                self._columns[name].append(cell)
+        else:
+            self._columns["value"][row] = value
+            self._columns["unit"][row] = unit
+
+    def add_vector(self, model, plugin, key: str, values, unit: str = ""):
+        """Write a vector result, replacing an earlier vector with the same key."""
+        row_key = (model.id, plugin.id, key)
+        self._vectors[row_key] = np.asarray(values, dtype=float)
+        self._vector_units[row_key] = unit
+
+    def get_scalar(self, model_id: str, plugin_id: str, key: str) -> Optional[float]:
+        """Return a single scalar result, or None if it was never written."""
+        row = self._rows.get((model_id, plugin_id, key))
+        return None if row is None else self._columns["value"][row]
+
+    def get_vector(self, model_id: str, plugin_id: str, key: str) -> Optional[np.ndarray]:
+        """Return a single vector result, or None if it was never written."""
+        return self._vectors.get((model_id, plugin_id, key))
+
+    def query(self, model_id: Optional[str] = None, plugin_id: Optional[str] = None,
+              key: Optional[str] = None) -> dict[str, np.ndarray]:
+        """Return the scalar results matching all given filters as columns."""
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in (("model_id", model_id), ("plugin_id", plugin_id), ("key", key)):
+            if wanted is not None:
+                mask &= np.asarray(self._columns[name], dtype=object) == wanted
+
+        return {name: np.asarray(values, dtype=float if name == "value" else object)[mask]
+                for name, values in self._columns.items()}
+
+    def pivot(self, plugin_id: Optional[str] = None) -> tuple[list[str], list[str], np.ndarray]:
+        """
+        Return a wide table with one row per model and one column per result key.
+
+        Returns:
+            (model names, result keys, values array of shape (models, keys))
+        """
+        table = self.query(plugin_id=plugin_id)
+        model_ids = list(dict.fromkeys(table["model_id"]))
+        keys = list(dict.fromkeys(table["key"]))
+        names = dict(zip(table["model_id"], table["model_name"]))
+
+        rows = {model_id: i for i, model_id in enumerate(model_ids)}
+        columns = {key: j for j, key in enumerate(keys)}
+        values = np.full((len(model_ids), len(keys)), np.nan)
+        values[[rows[m] for m in table["model_id"]], [columns[k] for k in table["key"]]] = \
+            table["value"]
+
+        return [names[model_id] for model_id in model_ids], keys, values
+
+    def remove_by_model_id(self, model_id: str):
+        """Remove every result belonging to a model."""
+        self._remove(lambda row_key: row_key[0] == model_id)
+
+    def remove_by_plugin_id(self, plugin_id: str):
+        """Remove every result produced by a plugin."""
+        self._remove(lambda row_key: row_key[1] == plugin_id)
+
+    def _remove(self, predicate):
+        """Drop the matching rows and vectors and compact the columns."""
+        for row_key in [row_key for row_key in self._vectors if predicate(row_key)]:
+            del self._vectors[row_key]
+            del self._vector_units[row_key]
+
+        keep = [row for row_key, row in self._rows.items() if not predicate(row_key)]
+        if len(keep) == len(self._rows):
+            return
+        keep.sort()
+        self._columns = {name: [values[row] for row in keep]
+                         for name, values in self._columns.items()}
+        self._rows = {
+            (self._columns["model_id"][row], self._columns["plugin_id"][row],
+             self._columns["key"][row]): row
+            for row in range(len(keep))
+        }
+
+    def clear(self):
+        """Remove all results."""
+        self.__init__()
+
+    def to_csv(self, filepath: str, wide=False):
+        """Export the scalar results, either in long format or one row per model."""
+        with open(filepath, "w", newline="") as file:
+            writer = csv.writer(file)
+            if wide:
+                names, keys, values = self.pivot()
+                writer.writerow(["model_name", *keys])
+                writer.writerows([name, *row] for name, row in zip(names, values.tolist()))
+            else:
+                writer.writerow(SCALAR_COLUMNS)
+                writer.writerows(zip(*self._columns.values()))
+        logger.info(f"Exported {len(self)} results to {filepath}")
+
+    def __len__(self):
+        return len(self._columns["value"])
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.alignment import AlignmentReference, align, align_batch
+from src.enums.enums import AlignmentMode
+from src.models.batch_model import BatchModel
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data
+
+O = day_56_data["O."]
+EI = day_56_data["EI"]
+
+
+class TestAlignment(unittest.TestCase):
+
+    def setUp(self):
+        grid = np.linspace(O.min(), O.max(), 500)
+        self.reference = AlignmentReference("day_56", grid,
+                                            np.interp(grid, O, EI, left=np.nan, right=np.nan))
+        self.step = grid[1] - grid[0]
+
+    # A shifted copy is registered back to within one grid step
+    def test_shift(self):
+        result = align(O + 12.3, EI, self.reference)
+        self.assertLess(abs(result.shift + 12.3), self.step)
+
+    # Warping a shifted copy brings it much closer than leaving it as is
+    def test_dtw(self):
+        unaligned = np.interp(self.reference.grid, O + 12.3, EI, left=np.nan, right=np.nan)
+        result = align(O + 12.3, EI, self.reference, AlignmentMode.DTW)
+
+        both = ~np.isnan(unaligned) & ~np.isnan(self.reference.values)
+        error = np.mean((unaligned[both] - self.reference.values[both]) ** 2)
+        self.assertLess(result.cost, 0.1 * error)
+        self.assertTrue(np.all(np.diff(result.path, axis=0) >= 0))
+
+    # Batch results are cached until the batch changes, then replaced
+    def test_batch_cache(self):
+        batch = BatchModel("hc")
+        for offset in (-5.0, 0.0, 5.0):
+            batch.add_model(OsmoModel(name=str(offset), data={"O.": O + offset, "EI": EI},
+                                      metadata={}))
+
+        first = align_batch(batch)
+        self.assertIs(align_batch(batch)[batch.models[0].id], first[batch.models[0].id])
+
+        batch.change_model_selection(batch.models[2].id, False)
+        self.assertIsNot(align_batch(batch)[batch.models[0].id], first[batch.models[0].id])
+        self.assertEqual(len([key for key in batch.models[0].cache if key[0] == "aligned"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
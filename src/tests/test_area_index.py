@@ -0,0 +1,56 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.area_index import AreaIndex, model_areas
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_28
+
+O = day_56_data["O."]
+EI = day_56_data["EI"]
+
+
+class TestAreaIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AreaIndex(O, EI)
+        self.lower = np.array([75.0, 100.0, 80.5, 300.0, 260.0])
+        self.upper = np.array([450.0, 500.0, 300.2, 300.1, 600.0])
+
+    # Snapped areas match np.trapezoid over the samples inside the limits
+    def test_snapped_areas(self):
+        areas = self.index.areas(self.lower, self.upper)
+
+        for area, lower, upper in zip(areas, self.lower, self.upper):
+            inside = (O >= lower) & (O <= upper)
+            if inside.sum() < 2:
+                self.assertTrue(np.isnan(area))
+            else:
+                self.assertAlmostEqual(area, np.trapezoid(EI[inside], O[inside]), places=9)
+
+    # Interpolated areas match integrating the piecewise linear curve on a fine grid
+    def test_interpolated_areas(self):
+        areas = self.index.interpolated_areas(self.lower[:3], self.upper[:3])
+
+        for area, lower, upper in zip(areas, self.lower, self.upper):
+            x = np.unique(np.concatenate([O[(O > lower) & (O < upper)], [lower, upper]]))
+            self.assertAlmostEqual(area, np.trapezoid(np.interp(x, O, EI), x), places=9)
+
+    # One row per model, one column per limit pair
+    def test_model_areas(self):
+        models = [OsmoModel(name=f"m{i}", data=data, metadata={})
+                  for i, data in enumerate([day_56_data, day_28])]
+        areas = model_areas(models, self.lower, self.upper)
+
+        self.assertEqual(areas.shape, (2, len(self.lower)))
+        self.assertTrue(np.allclose(areas[0], self.index.areas(self.lower, self.upper),
+                                    equal_nan=True))
+
+    # Unsorted axes are rejected
+    def test_unsorted(self):
+        with self.assertRaises(ValueError):
+            AreaIndex(np.array([1.0, 3.0, 2.0]), np.ones(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.analysis.bootstrap import (bootstrap_means, percentile_interval, resample_counts,
+                                    weighted_means)
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.default_rng(0).normal(size=(20, 3))
+
+    # Count-weighted means equal the means of explicitly resampled rows
+    def test_weighted_means(self):
+        indices = np.array([[0, 0, 1], [2, 1, 2]])
+        values = self.values[:3]
+        counts = np.array([[2.0, 1.0, 0.0], [0.0, 1.0, 2.0]])
+
+        expected = values[indices].mean(axis=1)
+        self.assertTrue(np.allclose(weighted_means(counts, values), expected))
+
+    # Every resample draws n members, matching the drawn indices
+    def test_resample_counts(self):
+        counts = resample_counts(np.random.default_rng(3), 5, 40)
+        indices = np.random.default_rng(3).integers(0, 5, size=(40, 5))
+
+        self.assertEqual(counts.shape, (40, 5))
+        self.assertTrue(np.all(counts.sum(axis=1) == 5))
+        for row in range(40):
+            self.assertTrue(np.array_equal(counts[row], np.bincount(indices[row], minlength=5)))
+
+    # Chunks run in a process pool give the same resamples as in this process
+    def test_process_pool(self):
+        with mock.patch("src.analysis.bootstrap.PARALLEL_RESAMPLES", 300):
+            pooled = bootstrap_means(self.values, 600, seed=2, max_workers=2)
+        self.assertTrue(np.array_equal(pooled,
+                                       bootstrap_means(self.values, 600, seed=2, max_workers=1)))
+
+    # Results only depend on the seed, and the interval covers the sample mean
+    def test_bootstrap_means(self):
+        first = bootstrap_means(self.values, 600, seed=1)
+        self.assertTrue(np.array_equal(first, bootstrap_means(self.values, 600, seed=1)))
+        self.assertEqual(first.shape, (600, 3))
+
+        lower, upper = percentile_interval(first, 0.95)
+        mean = self.values.mean(axis=0)
+        self.assertTrue(np.all((lower < mean) & (mean < upper)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from src.models.plot_element import CompositeLineElement
+from src.utils.decimation import DecimationPyramid, IndexDecimation, build_pyramid
+
+
+class TestDecimationPyramid(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.cumsum(rng.random(100_000))
+        self.y = np.cumsum(rng.normal(size=self.x.size))
+        self.pyramid = DecimationPyramid(self.x, self.y)
+
+    # Every pixel keeps its extremes, allowing for buckets straddling a pixel edge
+    def test_view_keeps_pixel_extremes(self):
+        pixels = 400
+        x_min, x_max = self.x[1234], self.x[87654]
+        x, y = self.pyramid.view(x_min, x_max, pixels)
+        self.assertLessEqual(len(x), 4 * pixels + 2)
+        self.assertTrue(np.all(np.diff(x) >= 0))
+
+        edges = np.linspace(x_min, x_max, pixels + 1)
+        inside = (self.x >= x_min) & (self.x <= x_max)
+        sample_pixels = np.clip(np.digitize(self.x[inside], edges) - 1, 0, pixels - 1)
+        view_pixels = np.digitize(x, edges) - 1
+        for pixel in range(pixels):
+            values = self.y[inside][sample_pixels == pixel]
+            kept = y[np.abs(view_pixels - pixel) <= 1]
+            self.assertGreaterEqual(kept.max(), values.max())
+            self.assertLessEqual(kept.min(), values.min())
+
+    # Views with few samples are returned at full resolution
+    def test_narrow_view_is_not_decimated(self):
+        x, y = self.pyramid.view(self.x[500], self.x[600], 400)
+        np.testing.assert_array_equal(x, self.x[499:602])
+        np.testing.assert_array_equal(y, self.y[499:602])
+
+    # Short curves get nothing, unsorted ones index-order decimation
+    def test_build_pyramid(self):
+        self.assertIsNone(build_pyramid(self.x[:100], self.y[:100]))
+        self.assertIsInstance(build_pyramid(self.x[:100], self.y[:100], min_points=0),
+                              DecimationPyramid)
+        self.assertIsInstance(build_pyramid(self.x[::-1], self.y), IndexDecimation)
+        self.assertIsInstance(build_pyramid(self.x, self.y), DecimationPyramid)
+
+    # Unsorted curves keep their extremes in view and break where they leave it
+    def test_index_decimation(self):
+        t = np.linspace(0, 1, 100_000)
+        x = 100 * (1 - np.sin(np.pi * t))  # Falls to 0 and rises back, as pO2 does
+        y = np.sin(40 * t) + t
+        x_min, x_max = 50.0, 100.0
+        view_x, view_y = IndexDecimation(x, y).view(x_min, x_max, 400)
+
+        self.assertLessEqual(len(view_x), 3 * 400 + 3)
+        self.assertEqual(np.count_nonzero(np.isnan(view_x)), 1)  # Leaves the view once
+        inside = (x >= x_min) & (x <= x_max)
+        self.assertEqual(np.nanmax(view_y), y[inside].max())
+        self.assertEqual(np.nanmin(view_y), y[inside].min())
+
+    # Composites are decimated by their total point count
+    def test_composite_threshold(self):
+        lines = [(self.x[:1000], self.y[:1000] + i) for i in range(10)]
+        element = CompositeLineElement(lines, "Overlay", None, None)
+        self.assertTrue(all(isinstance(pyramid, DecimationPyramid)
+                            for pyramid in element.decimation_pyramids()))
+        self.assertLess(sum(len(segment) for segment in element.segments((0, self.x[999], 100))),
+                        10 * 1000)
+
+        short = CompositeLineElement(lines[:2], "Overlay", None, None)
+        self.assertEqual(short.decimation_pyramids(), [None, None])
+
+if __name__ == "__main__":
+    unittest.main()
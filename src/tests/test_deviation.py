@@ -0,0 +1,80 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from plugins.osmo_deviation_plugin import OsmoDeviationPlugin
+from src.analysis.deviation import compare_curves, compare_models
+from src.controllers.plugin_manager import PluginManager
+from src.models.batch_model import BatchModel
+from src.models.osmo_model import OsmoModel
+from src.models.plot_element import AreaElement
+from src.models.results_store import ResultsStore
+from src.setup import day_56_data, day_28
+from src.views.plot_manager import PlotManager
+
+
+def hc_batch():
+    batch = BatchModel("hc")
+    for scale in (0.95, 1.0, 1.05):
+        batch.add_model(OsmoModel(name=str(scale), metadata={},
+                                  data={"O.": day_56_data["O."],
+                                        "EI": day_56_data["EI"] * scale}))
+    return batch
+
+
+class TestDeviation(unittest.TestCase):
+
+    # z-scores, band regions and the integrated deviation of a hand-made curve
+    def test_compare_curves(self):
+        grid = np.arange(6.0)
+        mean, std = np.zeros(6), np.array([1.0, 1.0, 1.0, 1.0, 0.0, 1.0])
+        curve = np.array([[0.0, 3.0, 3.0, -3.0, 5.0, np.nan]])
+
+        result = compare_curves(curve, grid, mean, std, k=2.0)[0]
+        self.assertTrue(np.allclose(result.z_scores[:4], [0, 3, 3, -3]))
+        self.assertTrue(np.all(np.isnan(result.z_scores[4:])))
+        self.assertEqual(result.regions, [(1, 3, True), (3, 4, False)])
+        self.assertAlmostEqual(result.integrated_deviation, 1.5 + 3 + 3)
+        self.assertAlmostEqual(result.fraction_outside, 0.75)
+
+    # Results are reused until the batch statistics change, then replaced
+    def test_cached_per_version(self):
+        batch = hc_batch()
+        patient = OsmoModel(name="patient", data=day_28, metadata={})
+
+        first = compare_models([patient], batch)[patient.id]
+        self.assertIs(compare_models([patient], batch)[patient.id], first)
+        batch.change_model_selection(batch.models[0].id, False)
+        self.assertIsNot(compare_models([patient], batch)[patient.id], first)
+        self.assertEqual(len([key for key in patient.cache if key[0] == "deviation"]), 1)
+
+    # Band regions are redrawn and z-scores recorded when the HC selection changes
+    def test_overlays_follow_batch_selection(self):
+        patient = OsmoModel(name="patient", data=day_28, metadata={})
+        container = SimpleNamespace(batches=[hc_batch()], get_selected_models=lambda: [patient])
+        container.get_selected_batch_models = lambda: container.batches
+        plot_manager = PlotManager()
+        results_store = ResultsStore()
+        plugin = OsmoDeviationPlugin(plot_manager, results_store)
+        plugin.model_container = container
+
+        plugin_manager = PluginManager(container)
+        plugin_manager.plot_manager = plot_manager
+        plugin_manager.plugins = {plugin.id: plugin}
+        plugin_manager.plugin_selection = {plugin.id: True}
+
+        plugin_manager.rerun_reference_plugins()
+        elements = list(plot_manager.get_all_elements().values())
+        self.assertTrue(elements)
+        self.assertTrue(all(isinstance(element, AreaElement) for element in elements))
+        z_scores = results_store.get_vector(patient.id, plugin.id, "z_scores_hc")
+        self.assertEqual(len(z_scores), len(container.batches[0].reference_statistics().grid))
+
+        container.batches = []
+        plugin_manager.rerun_reference_plugins()
+        self.assertEqual(plot_manager.get_all_elements(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
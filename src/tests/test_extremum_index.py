@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+from scipy.signal import find_peaks
+
+from src.analysis.extremum_index import ExtremumIndex
+from src.setup import day_56_data
+
+
+def reference_peak(values, start, stop):
+    peaks, properties = find_peaks(values[start:stop], prominence=0)
+    return start + peaks[np.argmax(properties["prominences"])] if peaks.size else -1
+
+
+class TestExtremumIndex(unittest.TestCase):
+
+    # Range queries match find_peaks on the slice, including plateaus and ties
+    def test_matches_find_peaks(self):
+        rng = np.random.default_rng(0)
+        curves = [day_56_data["EI"], rng.integers(0, 5, 200).astype(float)]
+
+        for values in curves:
+            index = ExtremumIndex(values)
+            for _ in range(500):
+                start, stop = sorted(rng.integers(0, len(values) + 1, 2))
+                self.assertEqual(index.most_prominent_peak(start, stop),
+                                 reference_peak(values, start, stop))
+                self.assertEqual(index.deepest_valley(start, stop),
+                                 reference_peak(-values, start, stop))
+
+    # Ranges without an interior maximum have no peak
+    def test_no_peak(self):
+        index = ExtremumIndex(np.arange(10.0))
+        self.assertEqual(index.most_prominent_peak(0, 10), -1)
+        self.assertEqual(index.deepest_valley(2, 4), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.fitting_service import FittingService
+from src.enums.enums import PolynomialBasis
+from src.setup import day_56_data
+
+O = day_56_data["O."]
+EI = day_56_data["EI"]
+
+
+class TestFittingService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = FittingService()
+
+    # Both bases reproduce np.polyfit, on the samples and on an evenly spaced grid
+    def test_matches_polyfit(self):
+        expected = np.poly1d(np.polyfit(O, EI, 8))
+        for basis in PolynomialBasis:
+            fit = self.service.fit(O, EI, 8, basis)
+            x, values = self.service.evaluate_on_range(fit, 100)
+
+            self.assertTrue(np.allclose(fit.evaluate(O)[0], expected(O), atol=1e-9))
+            self.assertTrue(np.allclose(values[0], expected(x[0]), atol=1e-9))
+
+    # Curves sharing x are fitted together, curves with other x separately
+    def test_fit_curves(self):
+        fit = self.service.fit_curves([O, O[:150], O], [EI, EI[:150], 2 * EI], 4)
+
+        self.assertTrue(np.allclose(fit.coefficients[2], 2 * fit.coefficients[0]))
+        expected = np.polyval(np.polyfit(O[:150], EI[:150], 4), O[:150])
+        self.assertTrue(np.allclose(fit.evaluate(O[:150])[1], expected, atol=1e-9))
+
+
+    # Segments of different lengths are solved in one batch, as each would be on its own
+    def test_fit_ragged_segments(self):
+        bounds = [(0, 40), (35, 120), (100, 111), (150, 300)]
+        x_segments = [O[start:stop] for start, stop in bounds]
+        y_segments = [EI[start:stop] for start, stop in bounds]
+
+        for basis in PolynomialBasis:
+            fit = self.service.fit_curves(x_segments, y_segments, 5, basis)
+            for row, (x, y) in enumerate(zip(x_segments, y_segments)):
+                single = FittingService().fit(x, y, 5, basis)
+                np.testing.assert_allclose(fit.coefficients[row], single.coefficients[0],
+                                           rtol=1e-6, atol=1e-9)
+                np.testing.assert_allclose(fit.evaluate(x)[row], single.evaluate(x)[0],
+                                           atol=1e-9)
+        self.assertEqual(len(self.service._cache), 0)  # Single-use samples are not cached
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+from scipy.signal import find_peaks
+
+from src.analysis import osmo_kernel
+from src.setup import day_56_data, day_28
+
+
+# Single-curve reference implementation the kernel has to reproduce
+def reference_parameters(o, ei, lower_limit, upper_limit):
+    ei_max = float(np.max(ei))
+    ei_hyper = ei_max / 2
+    indices = np.nonzero(ei == ei_max)[0]
+    max_idx = int(indices[len(indices) // 2])
+
+    o_hyper = None
+    for i, ei_value in enumerate(ei[max_idx:]):
+        if ei_value == ei_hyper:
+            o_hyper = float(o[max_idx + i])
+            break
+        elif ei_value < ei_hyper:
+            x1, y1 = ei[max_idx:][i - 1], o[max_idx:][i - 1]
+            x2, y2 = ei[max_idx + i], o[max_idx + i]
+            o_hyper = y1 + (y2 - y1) * (ei_hyper - x1) / (x2 - x1)
+            break
+
+    peaks, properties = find_peaks(ei[:max_idx], prominence=0)
+    first_peak_idx = peaks[np.argmax(properties["prominences"])]
+    peaks, properties = find_peaks(-ei[first_peak_idx:max_idx], prominence=0)
+    valley_idx = first_peak_idx + peaks[np.argmax(properties["prominences"])]
+
+    lower_idx = np.searchsorted(o, lower_limit, side="left")
+    upper_idx = np.searchsorted(o, upper_limit, side="right")
+    area = np.trapezoid(ei[lower_idx:upper_idx], o[lower_idx:upper_idx])
+
+    return {"ei_max": ei_max, "ei_hyper": ei_hyper, "o_max": o[max_idx], "o_hyper": o_hyper,
+            "o_first_peak": o[first_peak_idx], "ei_first_peak": ei[first_peak_idx],
+            "o_min": o[valley_idx], "ei_min": ei[valley_idx], "area": area}
+
+
+class TestOsmoKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.o_curves = [day_56_data["O."], day_28["O."], day_56_data["O."][:150]]
+        self.ei_curves = [day_56_data["EI"], day_28["EI"], day_56_data["EI"][:150]]
+        self.lower_limits = [75, 100, 80]
+        self.upper_limits = [450, 500, 300]
+
+    # Batched results match the single-curve methods for ragged curves
+    def test_matches_single_curve_methods(self):
+        batch = osmo_kernel.calculate_parameters(self.o_curves, self.ei_curves,
+                                                 self.lower_limits, self.upper_limits)
+
+        for row, curve in enumerate(zip(self.o_curves, self.ei_curves, self.lower_limits,
+                                         self.upper_limits)):
+            expected = reference_parameters(*curve)
+            for key in osmo_kernel.PARAMETER_KEYS:
+                if key == "area":
+                    self.assertAlmostEqual(batch[key][row], expected[key], places=9)
+                else:
+                    self.assertEqual(batch[key][row], expected[key], msg=key)
+
+    # Curves that never reach EI hyper report NaN instead of raising
+    def test_missing_hyper_crossing(self):
+        o = np.linspace(100, 200, 20)
+        ei = np.concatenate([np.linspace(0.1, 0.5, 10), np.linspace(0.5, 0.4, 10)])
+
+        batch = osmo_kernel.calculate_parameters([o], [ei], [100], [200])
+        self.assertTrue(np.isnan(batch["o_hyper"][0]))
+        self.assertEqual(batch["first_peak_idx"][0], -1)
+
+    # Limits that select fewer than two samples give a NaN area
+    def test_empty_area_segment(self):
+        areas, _, _ = osmo_kernel.calculate_areas(np.array([[1.0, 2.0, 3.0]]),
+                                                  np.array([[1.0, 1.0, 1.0]]),
+                                                  np.array([2.5]), np.array([2.7]))
+        self.assertTrue(np.isnan(areas[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.outlier_detection import robust_z_scores, screen_batch
+from src.models.batch_model import BatchModel
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_28
+
+METADATA = {"lower_limit": 100, "upper_limit": 500}
+
+
+class TestOutlierDetection(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.batch = BatchModel("hc")
+        for i in range(12):
+            data = {"O.": day_56_data["O."] + rng.normal(0, 3),
+                    "EI": day_56_data["EI"] * (1 + rng.normal(0, 0.03))}
+            self.batch.add_model(OsmoModel(name=f"hc_{i}", data=data, metadata=METADATA))
+        self.bad = OsmoModel(name="bad", data={"O.": day_28["O."] + 40, "EI": day_28["EI"] * 0.8},
+                             metadata=METADATA)
+        self.batch.add_model(self.bad)
+
+    # Robust z-scores are insensitive to a single extreme value
+    def test_robust_z_scores(self):
+        z = robust_z_scores(np.array([[1.0], [2.0], [3.0], [4.0], [1000.0]]))
+        self.assertEqual(z[2, 0], 0.0)
+        self.assertGreater(z[4, 0], 100)
+
+    # Only the bad run is flagged, and excluding it updates selection and statistics
+    def test_screen_batch(self):
+        statistics = self.batch.reference_statistics()
+        report = screen_batch(self.batch)
+        self.assertEqual(report.outlier_ids, [self.bad.id])
+        self.assertTrue(self.batch.models_selection[self.bad.id])
+
+        screen_batch(self.batch, exclude=True)
+        self.assertFalse(self.batch.models_selection[self.bad.id])
+        self.assertEqual(len(statistics), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
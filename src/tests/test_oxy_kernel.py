@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from src.analysis import oxy_kernel
+from src.models.oxy_model import OxyModel
+
+
+def oxy_curve(samples, ei_max, drop, seed):
+    """Synthetic Oxygenscan: pO2 falls to its minimum halfway, EI sickles below a pO2 of 40."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(samples, dtype=float)
+    half = samples // 2
+    po2 = np.concatenate([np.linspace(160, 5, half), np.linspace(5, 150, samples - half)])
+    ei = ei_max - drop / (1 + np.exp((po2 - 40) / 5)) + rng.normal(0, 0.002, samples)
+    return t, po2, ei
+
+
+# Single-curve reference implementation the kernel has to reproduce
+def reference_parameters(t, po2, ei, pos_fraction):
+    end = int(np.argmin(po2))
+    max_idx = int(np.argmax(ei[:end + 1]))
+    min_idx = int(np.argmin(ei[:end + 1]))
+    ei_max, ei_min = ei[max_idx], ei[min_idx]
+
+    pos_level = ei_max * (1 - pos_fraction)
+    pos = np.nan
+    for i in range(max_idx, end + 1):
+        if ei[i] < pos_level:
+            if i > 0:
+                pos = po2[i - 1] + (po2[i] - po2[i - 1]) * (pos_level - ei[i - 1]) \
+                    / (ei[i] - ei[i - 1])
+            break
+
+    return {"ei_max": ei_max, "ei_min": ei_min, "delta_ei": ei_max - ei_min, "pos": pos,
+            "min_po2": po2[end], "t_min_po2": t[end]}
+
+
+class TestOxyKernel(unittest.TestCase):
+
+    def setUp(self):
+        # Ragged curves; the last one barely drops and never crosses the PoS level
+        self.models = [OxyModel(data=dict(zip(("t", "pO2", "EI"), oxy_curve(*arguments))),
+                                metadata={}, name=f"Oxy {row}")
+                       for row, arguments in enumerate([(400, 0.6, 0.4, 0), (300, 0.55, 0.3, 1),
+                                                        (351, 0.5, 0.01, 2)])]
+
+    # Batched results match the single-curve computation, with NaN where EI never drops
+    def test_matches_single_curve_computation(self):
+        batch = oxy_kernel.calculate_model_parameters(self.models, pos_fraction=0.05)
+
+        for row, model in enumerate(self.models):
+            expected = reference_parameters(model.t, model.pO2, model.EI, 0.05)
+            for key in oxy_kernel.PARAMETER_KEYS:
+                np.testing.assert_allclose(batch[key][row], expected[key], rtol=1e-12,
+                                           err_msg=key)
+
+        self.assertTrue(np.isnan(batch["pos"][2]))
+        self.assertEqual(batch["pos_idx"][2], -1)
+        self.assertTrue(40 < batch["pos"][0] < 160)
+
+    # A crossing at the very first sample cannot be interpolated and reports NaN
+    def test_crossing_without_previous_sample(self):
+        indices = np.array([0, 2, -1])
+        x = np.tile(np.array([10.0, 20.0, 30.0]), (3, 1))
+        y = np.tile(np.array([1.0, 0.8, 0.4]), (3, 1))
+
+        crossings = oxy_kernel.interpolate_crossings(x, y, indices, np.full(3, 0.6))
+        self.assertTrue(np.isnan(crossings[0]))
+        self.assertAlmostEqual(crossings[1], 25.0)
+        self.assertTrue(np.isnan(crossings[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from plugins.osmo_example_plugin import OsmoExamplePlugin
+from plugins.polynomial_plugin import PolynomialPlugin
+from src.controllers.parameter_sweep import ParameterSweep
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_56_metadata, day_28
+
+PARAMETER_GRID = {"degree": [2, 4, 8]}
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.models = [
+            OsmoModel(data=day_56_data, metadata=day_56_metadata, name="day_56"),
+            OsmoModel(data=day_28, metadata=day_56_metadata, name="day_28"),
+        ]
+
+    # Every combination is evaluated on every model
+    def test_sweep_covers_grid(self):
+        sweep = ParameterSweep(PolynomialPlugin, PARAMETER_GRID, use_processes=False)
+        results = sweep.run(self.models)
+
+        self.assertEqual(len(results), len(PARAMETER_GRID["degree"]) * len(self.models))
+        self.assertTrue(all(row["error"] == "" for row in results.rows))
+        self.assertIn("rmse", results.columns)
+        self.assertIn("elapsed_s", results.columns)
+
+    # Higher degrees fit the raw data better
+    def test_best_combination(self):
+        sweep = ParameterSweep(PolynomialPlugin, PARAMETER_GRID, use_processes=False)
+        best_parameters, _ = sweep.run(self.models).best("rss")
+
+        self.assertEqual(best_parameters, {"degree": 8})
+
+    # Process workers produce the same table as thread workers
+    def test_process_pool_matches_threads(self):
+        threaded = ParameterSweep(PolynomialPlugin, PARAMETER_GRID, use_processes=False)
+        pooled = ParameterSweep(PolynomialPlugin, PARAMETER_GRID, max_workers=2)
+
+        self.assertTrue((threaded.run(self.models).column("rss") ==
+                         pooled.run(self.models).column("rss")).all())
+
+    # Unknown parameters are rejected
+    def test_unknown_parameter(self):
+        with self.assertRaises(ValueError):
+            PolynomialPlugin(None).set_parameters(order=3)
+        with self.assertRaises(ValueError):
+            ParameterSweep(PolynomialPlugin, {"order": [3]})
+
+    # Plugins without a score are rejected before any work is submitted
+    def test_plugin_without_score(self):
+        self.assertTrue(PolynomialPlugin.is_sweepable())
+        self.assertFalse(OsmoExamplePlugin.is_sweepable())
+        with self.assertRaises(ValueError):
+            ParameterSweep(OsmoExamplePlugin, {"peak_smoothing_window": [0, 11]})
+
+    # The table can be exported without a plot
+    def test_export_csv(self):
+        results = ParameterSweep(PolynomialPlugin, PARAMETER_GRID,
+                                 use_processes=False).run(self.models)
+        with tempfile.TemporaryDirectory() as folder:
+            filepath = os.path.join(folder, "sweep.csv")
+            results.to_csv(filepath)
+            with open(filepath) as file:
+                self.assertEqual(len(file.readlines()), len(results) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.models.plot_element import AreaElement, CompositeLineElement, LineElement
+from src.views.pick_index import PickIndex
+from src.views.plot_manager import PlotManager
+
+PLUGIN = SimpleNamespace(id="plugin", plugin_name="Plugin")
+MODEL = SimpleNamespace(id="model", name="Model")
+
+
+class TestPickIndex(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(0, 100, 50_000)
+        self.line = LineElement(x, np.sin(x / 10), "Line", PLUGIN, MODEL)
+        self.composite = CompositeLineElement([(x[::100], np.full(500, 5.0)),
+                                               (x[::100], np.full(500, 10.0))],
+                                              "Composite", PLUGIN, MODEL)
+        area = AreaElement(x, np.zeros_like(x), np.ones_like(x), "Area", PLUGIN, MODEL)
+        self.index = PickIndex([self.line, self.composite, area])
+
+    # The nearest point within the radius wins, measured in pixels
+    def test_nearest(self):
+        result = self.index.nearest(50.0, 5.2, x_scale=10.0, y_scale=10.0)
+        self.assertEqual(result.element_id, self.composite.id)
+        self.assertAlmostEqual(result.y, 5.0)
+        self.assertLess(result.distance, 2.1)
+
+        line_result = self.index.nearest(20.0, np.sin(2.0), x_scale=10.0, y_scale=10.0)
+        self.assertEqual(line_result.element_id, self.line.id)
+
+    # Nothing is picked beyond the radius, and areas are never picked
+    def test_radius_and_areas(self):
+        self.assertIsNone(self.index.nearest(50.0, 7.5, x_scale=10.0, y_scale=1.0, radius=2))
+        self.assertIsNotNone(self.index.nearest(50.0, 7.5, x_scale=10.0, y_scale=10.0,
+                                                radius=30))
+        self.assertIsNone(self.index.nearest(50.0, -3.0, x_scale=10.0, y_scale=10.0))
+
+
+class TestPlotManagerPicking(unittest.TestCase):
+
+    # Points on a long curve stay pickable when zoomed in far beyond its decimation
+    def test_pick_when_zoomed(self):
+        manager = PlotManager()
+        manager.fig.set_size_inches(8, 6)
+        manager.fig.set_dpi(100)
+        x = np.linspace(0, 1000, 200_000)
+        line = LineElement(x, np.sin(x), "Sine", PLUGIN, MODEL)
+        manager.add_element(line)
+        manager.visualize_selected_elements([line.id])
+        manager.ax.set_xlim(500, 510)  # 100x zoom
+
+        for index in np.linspace(100_000, 101_900, 200).astype(int):
+            x_pixel, y_pixel = manager.ax.transData.transform((x[index], np.sin(x[index])))
+            result = manager.pick(x_pixel, y_pixel)
+            self.assertIsNotNone(result)
+            self.assertEqual(result.element_id, line.id)
+            self.assertLess(result.distance, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.backend_bases import ResizeEvent
+from matplotlib.colors import to_rgba
+
+from src.base_classes.base_plugin import BasePlugin
+from src.models.plot_element import CompositeLineElement, LineElement, ScatterElement, \
+    data_bounds
+from src.views.plot_manager import PlotManager
+
+
+class PeakPlugin(BasePlugin):
+    plugin_name = "Peaks"
+
+    def __init__(self, plot_manager):
+        super().__init__(plot_manager)
+        self.peaks = {}
+
+    def run_plugin(self, model):
+        self.set_model(model)
+        self.add_line_element(np.arange(10), np.arange(10), label="Curve")
+        for name, x in self.peaks.items():
+            self.add_point_element(x, x, label=f"{name} at {x}", key=name)
+
+
+class TestPlotManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = PlotManager()
+        self.models = [SimpleNamespace(id=f"model-{i}", name=f"Model {i}") for i in range(2)]
+        self.plugins = [SimpleNamespace(id=f"plugin-{i}", plugin_name=f"Plugin {i}")
+                        for i in range(2)]
+        self.elements = {}
+        for model in self.models:
+            for plugin in self.plugins:
+                element = LineElement(np.arange(10), np.arange(10) * 2, f"{plugin.id}",
+                                      plugin, model)
+                self.manager.add_element(element)
+                self.elements[model.id, plugin.id] = element
+
+    # The indexes follow additions and removals, in insertion order
+    def test_indexes(self):
+        self.assertEqual(self.manager.get_elements_by_model_id("model-0"),
+                         [self.elements["model-0", "plugin-0"],
+                          self.elements["model-0", "plugin-1"]])
+
+        self.manager.remove_elements_by_plugin_id("plugin-0")
+        self.assertEqual(self.manager.get_elements_by_model_id("model-1"),
+                         [self.elements["model-1", "plugin-1"]])
+
+        self.manager.remove_elements_by_model_id("model-1")
+        self.assertEqual(list(self.manager.get_all_elements().values()),
+                         [self.elements["model-0", "plugin-1"]])
+        self.assertEqual(self.manager.get_elements_by_model_id("model-1"), [])
+
+    # Artists are created once, then only shown or hidden
+    def test_retained_artists(self):
+        first, second = self.elements["model-0", "plugin-0"], self.elements["model-1", "plugin-0"]
+        point = ScatterElement([4.0], [30.0], "Point", self.plugins[0], self.models[0])
+        self.manager.add_element(point)
+
+        self.manager.visualize_selected_elements([first.id, point.id])
+        self.assertEqual(len(self.manager.ax.lines), 1)
+        self.assertAlmostEqual(self.manager.ax.get_ylim()[1], 30.0 + 0.05 * 30.0)
+
+        self.manager.visualize_selected_elements([second.id])
+        self.assertEqual(len(self.manager.ax.lines), 2)
+        self.assertEqual([line.get_visible() for line in self.manager.ax.lines], [False, True])
+        self.assertFalse(self.manager.ax.collections[0].get_visible())
+
+        self.manager.remove_element_by_id(second.id)
+        self.assertEqual(len(self.manager.ax.lines), 1)
+        self.assertFalse(self.manager.has_visible_elements())
+
+    # The legend and limits follow the shown elements; inner elements never rescan the rest
+    def test_legend_and_limits(self):
+        first = self.elements["model-0", "plugin-0"]
+        inner = ScatterElement([4.0], [3.0], "Inner", self.plugins[0], self.models[0])
+        peak = ScatterElement([4.0], [30.0], "Peak", self.plugins[0], self.models[0])
+        for element in (inner, peak):
+            self.manager.add_element(element)
+
+        def legend_labels():
+            return [text.get_text() for text in self.manager.ax.get_legend().get_texts()]
+
+        self.manager.update_selection([first.id, inner.id, peak.id], [])
+        self.assertEqual(legend_labels(), ["plugin-0", "Inner", "Peak"])
+        self.assertAlmostEqual(self.manager.ax.get_ylim()[1], 30.0 + 0.05 * 30.0)
+
+        with mock.patch("src.views.plot_manager.data_bounds", wraps=data_bounds) as rescan:
+            self.manager.update_selection([], [inner.id])
+            rescan.assert_not_called()
+            self.manager.update_selection([], [peak.id])
+            rescan.assert_called_once()
+        self.assertEqual(legend_labels(), ["plugin-0"])
+        self.assertAlmostEqual(self.manager.ax.get_ylim()[1], 18.0 + 0.05 * 18.0)
+
+    # A zoom or pan by the user is kept until nothing is shown
+    def test_user_view_kept(self):
+        first, second = self.elements["model-0", "plugin-0"], self.elements["model-1", "plugin-1"]
+        self.manager.update_selection([first.id], [])
+        self.manager.ax.set_xlim(2.0, 3.0)
+
+        self.manager.update_selection([second.id], [])
+        self.assertEqual(self.manager.ax.get_xlim(), (2.0, 3.0))
+        self.assertEqual(len(self.manager.ax.get_legend().get_texts()), 2)
+
+        self.manager.update_selection([], [first.id, second.id])
+        self.manager.update_selection([second.id], [])
+        np.testing.assert_allclose(self.manager.ax.get_xlim(), (-0.45, 9.45))
+
+    # A composite is one LineCollection with one legend entry, decimated to the view
+    def test_composite_line_element(self):
+        x = np.linspace(0, 10, 20_000)
+        composite = CompositeLineElement([(x, np.sin(x)), (x[:50], np.cos(x[:50]))], "Composite",
+                                         self.plugins[0], self.models[0])
+        self.manager.add_element(composite)
+        self.manager.update_selection([composite.id], [])
+
+        collections = [artist for artist in self.manager.ax.collections
+                       if isinstance(artist, LineCollection)]
+        self.assertEqual(len(collections), 1)
+        self.assertEqual([text.get_text() for text in self.manager.ax.get_legend().get_texts()],
+                         ["Composite"])
+        self.assertEqual(len(collections[0].get_colors()), 1)  # One color for every line
+        self.assertEqual(tuple(collections[0].get_colors()[0]),
+                         to_rgba(plt.rcParams["axes.prop_cycle"].by_key()["color"][0]))
+
+        long, short = collections[0].get_segments()
+        self.assertLessEqual(len(long), 4 * self.manager.ax.bbox.width + 4)
+        self.assertEqual(len(short), 50)
+        self.assertEqual((long[:, 1].min(), long[:, 1].max()), (np.sin(x).min(), np.sin(x).max()))
+
+        self.manager.ax.set_xlim(2.0, 2.5)  # Zooming in brings back the samples of the view
+        long = collections[0].get_segments()[0]
+        self.assertEqual(len(long), np.count_nonzero((x >= 2.0) & (x <= 2.5)) + 2)
+
+    # Resizing the canvas re-decimates the shown lines to the new width
+    def test_resize_redecimates(self):
+        x = np.linspace(0, 10, 100_000)
+        element = LineElement(x, np.sin(x), "Long", self.plugins[0], self.models[0])
+        self.manager.add_element(element)
+        self.manager.update_selection([element.id], [])
+        line = self.manager.ax.lines[-1]
+        narrow = len(line.get_xdata())
+
+        self.manager.fig.set_size_inches(4 * self.manager.fig.get_size_inches())
+        ResizeEvent("resize_event", self.manager.fig.canvas)._process()
+        self.assertGreater(len(line.get_xdata()), 2 * narrow)
+        self.assertLessEqual(len(line.get_xdata()), 4 * self.manager.ax.bbox.width + 4)
+
+    # Selection deltas only change the toggled elements
+    def test_update_selection(self):
+        first, second = self.elements["model-0", "plugin-0"], self.elements["model-1", "plugin-0"]
+        self.manager.update_selection([first.id, "unknown"], [])
+        self.manager.update_selection([second.id], [first.id])
+
+        self.assertEqual([line.get_visible() for line in self.manager.ax.lines], [False, True])
+        self.manager.update_selection([], [second.id])
+        self.assertFalse(self.manager.has_visible_elements())
+
+    # Adding an element with a known ID replaces it; retain drops what a rerun did not write
+    def test_replace_and_retain(self):
+        model, plugin = self.models[0], self.plugins[0]
+        old = self.elements[model.id, plugin.id]
+        self.manager.visualize_selected_elements([old.id])
+        color = self.manager.ax.lines[0].get_color()
+
+        new = LineElement(np.arange(5), np.arange(5), "New", plugin, model)
+        new.id = old.id
+        self.manager.add_element(new)
+        self.assertEqual(len(self.manager.get_all_elements()), 4)
+        self.assertEqual(len(self.manager.ax.lines), 0)
+
+        self.manager.visualize_selected_elements([new.id])
+        self.assertEqual(self.manager.ax.lines[0].get_label(), "New")
+        self.assertEqual(self.manager.ax.lines[0].get_color(), color)
+
+        self.manager.retain_elements(plugin.id, model.id, set())
+        self.assertIsNone(self.manager.get_element_by_id(new.id))
+        self.assertEqual(len(self.manager.get_all_elements()), 3)
+
+    # Element IDs follow the element keys, so a rerun skipping one keeps the others' IDs
+    def test_stable_element_ids(self):
+        plugin, model = PeakPlugin(self.manager), self.models[0]
+        plugin.peaks = {"first": 1, "second": 2, "third": 3}
+        plugin.run(model)
+        ids = {element.label.split()[0]: element_id
+               for element_id, element in self.manager.get_all_elements().items()
+               if element.plugin is plugin}
+
+        plugin.peaks = {"first": 1, "third": 4}
+        plugin.run(model)
+        labels = {element_id: element.label
+                  for element_id, element in self.manager.get_all_elements().items()
+                  if element.plugin is plugin}
+        self.assertEqual(labels, {ids["Curve"]: "Curve", ids["first"]: "first at 1",
+                                  ids["third"]: "third at 4"})
+
+    # Exports render the shown elements on a separate figure, leaving the live axes alone
+    def test_export_job(self):
+        shown = self.elements["model-0", "plugin-0"]
+        self.manager.visualize_selected_elements([shown.id])
+
+        with tempfile.TemporaryDirectory() as folder, \
+                mock.patch("src.views.plot_manager.RESULTS_FOLDER", folder):
+            job = self.manager.export_job("plot", 400, 300, 100, "O", "EI", "Title", True, "svg")
+            self.manager.visualize_selected_elements([])
+            filepath = job()
+            self.assertEqual(filepath, os.path.join(folder, "plot.svg"))
+            with open(filepath) as file:
+                self.assertIn("plugin-0", file.read())  # The legend of the captured element
+        self.assertEqual(len(self.manager.ax.lines), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
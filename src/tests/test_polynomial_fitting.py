@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.fitting_service import FittingService
+from src.analysis.polynomial_fitting import adjust_fits, find_breaking_points
+from src.enums.enums import CurveType
+from src.setup import day_56_data
+
+O = day_56_data["O."]
+EI = day_56_data["EI"]
+SEGMENTS = [(10, 80), (20, 120), (5, 60)]
+
+
+class TestPolynomialFitting(unittest.TestCase):
+
+    def setUp(self):
+        self.o_segments = [O[start:stop] for start, stop in SEGMENTS]
+        self.ei_segments = [EI[start:stop] for start, stop in SEGMENTS]
+        self.service = FittingService()
+
+    # Fits of ragged segments through the service match np.polyfit on every segment
+    def test_fit_matches_polyfit(self):
+        fits = self.service.fit_curves(self.o_segments, self.ei_segments, 4)
+
+        for row, (o, ei) in enumerate(zip(self.o_segments, self.ei_segments)):
+            expected = np.polyval(np.polyfit(o, ei, 4), o)
+            actual = fits.evaluate(np.broadcast_to(o, (len(SEGMENTS), len(o))))[row]
+            self.assertTrue(np.allclose(actual, expected, atol=1e-10))
+
+    # Derivatives are taken with respect to the unscaled x
+    def test_second_derivative(self):
+        fits = self.service.fit_curves(self.o_segments, self.ei_segments, 5)
+
+        expected = np.polyder(np.poly1d(np.polyfit(self.o_segments[0], self.ei_segments[0], 5)), 2)
+        actual = fits.derivative(2).evaluate(self.o_segments[0])[0]
+        self.assertTrue(np.allclose(actual, expected(self.o_segments[0]), atol=1e-12))
+
+    # A bump fit touches the data from above, a valley fit from below
+    def test_adjust_fits(self):
+        fits = self.service.fit_curves(self.o_segments, self.ei_segments, 2)
+        bump = adjust_fits(self.o_segments, self.ei_segments, fits, CurveType.BUMP)
+        valley = adjust_fits(self.o_segments, self.ei_segments, fits, CurveType.VALLEY)
+
+        for row, (o, ei) in enumerate(zip(self.o_segments, self.ei_segments)):
+            grid = np.broadcast_to(o, (len(SEGMENTS), len(o)))
+            self.assertAlmostEqual(np.min(bump.evaluate(grid)[row] - ei), 0.0)
+            self.assertAlmostEqual(np.max(valley.evaluate(grid)[row] - ei), 0.0)
+
+    # Breaking points match the former single-segment implementation
+    def test_breaking_points(self):
+        starts, stops = [18, 10, 30], [58, 100, 200]
+
+        self.assertEqual(list(find_breaking_points(O, EI, starts, stops, 5)), [28, 70, 126])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.resampling import resample_models
+from src.models.batch_model import BatchModel
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data
+
+O = day_56_data["O."]
+EI = day_56_data["EI"]
+
+
+class TestReferenceStatistics(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.models = [OsmoModel(name=f"hc_{i}",
+                                 data={"O.": O + rng.normal(0, 2),
+                                       "EI": EI * (1 + rng.normal(0, 0.05))},
+                                 metadata={})
+                       for i in range(6)]
+        self.batch = BatchModel("hc")
+        for model in self.models[:4]:
+            self.batch.add_model(model)
+
+    # Incremental updates match statistics recomputed from the selected models
+    def test_incremental_updates(self):
+        statistics = self.batch.reference_statistics()
+        self.batch.add_model(self.models[4])
+        self.batch.add_model(self.models[5])
+        self.batch.change_model_selection(self.models[1].id, False)
+        self.batch.remove_model(self.models[2])
+
+        curves = resample_models(self.batch.selected_models(), statistics.grid)
+        counts = np.sum(~np.isnan(curves), axis=0)
+        covered = counts > 1
+
+        self.assertEqual(len(statistics), 4)
+        self.assertTrue(np.array_equal(statistics.count, counts))
+        self.assertTrue(np.allclose(statistics.mean[covered],
+                                    np.nanmean(curves[:, covered], axis=0)))
+        self.assertTrue(np.allclose(statistics.std[covered],
+                                    np.nanstd(curves[:, covered], axis=0, ddof=1)))
+
+    # The band is centered on the mean
+    def test_band(self):
+        statistics = self.batch.reference_statistics()
+        _, lower, upper = statistics.band(2.0)
+
+        self.assertTrue(np.all(upper >= lower))
+        covered = ~np.isnan(statistics.std)
+        self.assertTrue(np.allclose((lower + upper) / 2, statistics.mean[covered]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from src.ui.selection_delta import SelectionDelta
+
+try:
+    from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+    from src.ui.refresh_scheduler import FRAME_INTERVAL_MS, RefreshScheduler
+except ImportError:
+    QCoreApplication = None
+
+
+class TestSelectionDelta(unittest.TestCase):
+
+    # Opposite toggles of an element cancel out; the last state wins
+    def test_toggle(self):
+        delta = SelectionDelta()
+        self.assertFalse(delta)
+
+        delta.toggle("a", True)
+        delta.toggle("b", False)
+        delta.toggle("c", True)
+        delta.toggle("c", False)
+        self.assertEqual((delta.added, delta.removed), ({"a"}, {"b", "c"}))
+
+        delta.toggle("b", True)
+        self.assertEqual((delta.added, delta.removed), ({"a", "b"}, {"c"}))
+        self.assertTrue(delta)
+
+
+@unittest.skipIf(QCoreApplication is None, "PySide6 is not installed")
+class TestRefreshScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.apply_delta = mock.Mock()
+        self.refresh_all = mock.Mock()
+        self.scheduler = RefreshScheduler(self.apply_delta, self.refresh_all)
+
+    def run_frames(self, frames=5):
+        loop = QEventLoop()
+        QTimer.singleShot(frames * FRAME_INTERVAL_MS, loop.quit)
+        loop.exec()
+
+    # Toggles within one frame are applied as a single delta
+    def test_toggles_coalesce(self):
+        for i in range(50):
+            self.scheduler.element_toggled(f"element-{i}", True)
+        self.scheduler.element_toggled("element-0", False)
+        self.run_frames()
+
+        self.apply_delta.assert_called_once()
+        delta = self.apply_delta.call_args.args[0]
+        self.assertEqual(delta.added, {f"element-{i}" for i in range(1, 50)})
+        self.assertEqual(delta.removed, {"element-0"})
+        self.refresh_all.assert_not_called()
+
+    # A full refresh replaces the pending delta
+    def test_full_refresh_supersedes_delta(self):
+        self.scheduler.element_toggled("element-0", True)
+        self.scheduler.request_full_refresh()
+        self.scheduler.element_toggled("element-1", True)
+        self.run_frames()
+
+        self.refresh_all.assert_called_once()
+        self.apply_delta.assert_not_called()
+        self.assertFalse(self.scheduler.delta)
+        self.assertFalse(self.scheduler.dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from plugins.polynomial_plugin import PolynomialPlugin
+from src.controllers.report_export import ReportExport, ReportOptions, page_key, read_manifest
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_56_metadata, day_28
+
+OPTIONS = ReportOptions(formats=("png", "svg"), width=400, height=300, dpi=50)
+
+
+class TestReportExport(unittest.TestCase):
+
+    def setUp(self):
+        self.models = [
+            OsmoModel(data=day_56_data, metadata=day_56_metadata, name="day 56"),
+            OsmoModel(data=day_28, metadata=day_56_metadata, name="day_28"),
+        ]
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def export(self, options=OPTIONS, progress=None, use_processes=False):
+        report = ReportExport([(PolynomialPlugin, {"degree": 4})], self.folder.name, options,
+                              max_workers=2, use_processes=use_processes)
+        return report.run(self.models, progress)
+
+    # One file per model and format, listed in the manifest
+    def test_pages_and_manifest(self):
+        steps = []
+        rows = self.export(progress=lambda done, total: steps.append((done, total)))
+
+        self.assertEqual(steps, [(1, 2), (2, 2)])
+        self.assertEqual([row["files"] for row in rows],
+                         ["day_56.png;day_56.svg", "day_28.png;day_28.svg"])
+        self.assertEqual(set(read_manifest(self.folder.name)),
+                         {page_key(model) for model in self.models})
+        for name in ("day_56.png", "day_56.svg", "day_28.png", "day_28.svg"):
+            self.assertTrue(os.path.exists(os.path.join(self.folder.name, name)))
+
+    # Spawned worker processes export the same pages as threads
+    def test_process_pool(self):
+        options = ReportOptions(formats=("png",), combined_pdf=True, width=400, height=300,
+                                dpi=50)
+        rows = self.export(options, use_processes=True)
+
+        self.assertEqual([row["files"] for row in rows], ["day_56.png", "day_28.png"])
+        self.assertEqual([row["error"] for row in rows], ["", ""])
+        for name in ("day_56.png", "day_28.png", "report.pdf"):
+            self.assertTrue(os.path.exists(os.path.join(self.folder.name, name)))
+
+    # A rerun only exports the models whose files are missing
+    def test_resume(self):
+        self.export()
+        os.remove(os.path.join(self.folder.name, "day_28.svg"))
+        modified = os.path.getmtime(os.path.join(self.folder.name, "day_56.png"))
+
+        self.export()
+        self.assertEqual(os.path.getmtime(os.path.join(self.folder.name, "day_56.png")), modified)
+        self.assertTrue(os.path.exists(os.path.join(self.folder.name, "day_28.svg")))
+
+    # Models whose names map to the same file keep their own pages and manifest rows
+    def test_colliding_names(self):
+        self.models.append(OsmoModel(data=day_28, metadata=day_56_metadata, name="Day_56"))
+        rows = self.export(ReportOptions(formats=("png",), width=400, height=300, dpi=50))
+
+        files = [row["files"] for row in rows]
+        self.assertEqual(len(set(files)), 3)
+        self.assertEqual(files[1], "day_28.png")
+        for name in files:
+            self.assertTrue(os.path.exists(os.path.join(self.folder.name, name)))
+
+        os.remove(os.path.join(self.folder.name, files[2]))
+        rows = self.export(ReportOptions(formats=("png",), width=400, height=300, dpi=50))
+        self.assertEqual([row["files"] for row in rows], files)
+        self.assertTrue(os.path.exists(os.path.join(self.folder.name, files[2])))
+
+    # The combined PDF holds a page per model
+    def test_combined_pdf(self):
+        self.export(ReportOptions(formats=(), combined_pdf=True, width=400, height=300, dpi=50))
+
+        with open(os.path.join(self.folder.name, "report.pdf"), "rb") as file:
+            content = file.read()
+        self.assertEqual(content.count(b"/Type /Page") - content.count(b"/Type /Pages"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
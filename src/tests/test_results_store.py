@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from plugins.polynomial_plugin import PolynomialPlugin
+from src.models.osmo_model import OsmoModel
+from src.models.results_store import ResultsStore
+from src.setup import day_56_data, day_56_metadata, day_28
+
+
+class TestResultsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ResultsStore()
+        self.plugin = PolynomialPlugin(None, self.store)
+        self.model_a = OsmoModel(data=day_56_data, metadata=day_56_metadata, name="day_56")
+        self.model_b = OsmoModel(data=day_28, metadata=day_56_metadata, name="day_28")
+
+    # Writing the same key twice replaces the value instead of adding a row
+    def test_replace_on_write(self):
+        self.store.add_scalar(self.model_a, self.plugin, "ei_max", 0.5)
+        self.store.add_scalar(self.model_a, self.plugin, "ei_max", 0.6)
+
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.get_scalar(self.model_a.id, self.plugin.id, "ei_max"), 0.6)
+
+    # Queries filter on model, plugin and key
+    def test_query(self):
+        self.store.add_scalar(self.model_a, self.plugin, "ei_max", 0.5)
+        self.store.add_scalar(self.model_b, self.plugin, "ei_max", 0.7)
+        self.store.add_scalar(self.model_b, self.plugin, "area", 100.0)
+
+        table = self.store.query(key="ei_max")
+        self.assertTrue(np.array_equal(table["value"], [0.5, 0.7]))
+        self.assertEqual(list(self.store.query(model_id=self.model_b.id)["key"]),
+                         ["ei_max", "area"])
+
+    # The wide table has one row per model and one column per key
+    def test_pivot(self):
+        self.store.add_scalar(self.model_a, self.plugin, "ei_max", 0.5)
+        self.store.add_scalar(self.model_b, self.plugin, "area", 100.0)
+
+        names, keys, values = self.store.pivot()
+        self.assertEqual(names, ["day_56", "day_28"])
+        self.assertEqual(keys, ["ei_max", "area"])
+        self.assertEqual(values[0, 0], 0.5)
+        self.assertTrue(np.isnan(values[0, 1]))
+
+    # Removing a model drops its scalars and vectors only
+    def test_remove_by_model_id(self):
+        self.store.add_scalar(self.model_a, self.plugin, "ei_max", 0.5)
+        self.store.add_scalar(self.model_b, self.plugin, "ei_max", 0.7)
+        self.store.add_vector(self.model_a, self.plugin, "curve", [1, 2, 3])
+
+        self.store.remove_by_model_id(self.model_a.id)
+
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(self.store.get_vector(self.model_a.id, self.plugin.id, "curve"))
+        self.assertEqual(self.store.get_scalar(self.model_b.id, self.plugin.id, "ei_max"), 0.7)
+
+    # Headless plugins write results without a plot manager
+    def test_headless_plugin(self):
+        self.plugin.run_plugin(self.model_a)
+
+        coefficients = self.store.get_vector(self.model_a.id, self.plugin.id, "coefficients")
+        self.assertEqual(len(coefficients), self.plugin.parameters["degree"] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from src.analysis.similarity_index import SimilarityIndex
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_28
+
+
+def noisy_models(count, seed):
+    rng = np.random.default_rng(seed)
+    models = []
+    for i in range(count):
+        data = (day_56_data, day_28)[i % 2]
+        models.append(OsmoModel(name=f"m{i}",
+                                data={"O.": data["O."] + rng.normal(0, 3),
+                                      "EI": data["EI"] * (1 + rng.normal(0, 0.05))},
+                                metadata={"lower_limit": 100, "upper_limit": 500}))
+    return models
+
+
+class TestSimilarityIndex(unittest.TestCase):
+
+    # Neighbours come from the same underlying curve, whether indexed or still pending
+    def test_nearest_neighbours(self):
+        models = noisy_models(60, 0)
+        index = SimilarityIndex(min_pending=100)
+        index.add(models[:40])
+        for model in models[40:]:
+            index.add([model])
+
+        self.assertEqual(len(index), 60)
+        for model in models[::7]:
+            neighbours = index.query(model, k=5)
+            self.assertEqual(len(neighbours), 5)
+            self.assertNotIn(model.id, [neighbour.id for neighbour, _ in neighbours])
+            self.assertTrue(all(int(neighbour.name[1:]) % 2 == int(model.name[1:]) % 2
+                                for neighbour, _ in neighbours))
+            distances = [distance for _, distance in neighbours]
+            self.assertEqual(distances, sorted(distances))
+
+
+if __name__ == "__main__":
+    unittest.main()
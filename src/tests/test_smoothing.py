@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy.interpolate import make_smoothing_spline
+from scipy.ndimage import median_filter
+from scipy.signal import savgol_filter
+
+from plugins.osmo_example_plugin import OsmoExamplePlugin
+from src.analysis import smoothing
+from src.analysis.smoothing import SmoothingConfig
+from src.enums.enums import SmoothingMethod
+from src.models.osmo_model import OsmoModel
+from src.models.oxy_model import OxyModel
+from src.setup import day_56_data, day_28
+
+
+class ElementSink:
+    def add_element(self, element):
+        pass
+
+    def retain_elements(self, plugin_id, model_id, element_ids):
+        pass
+
+
+def osmo_models():
+    return [OsmoModel(data=dict(data), metadata={"lower_limit": 100, "upper_limit": 400},
+                      name=f"Osmo {i}") for i, data in enumerate([day_56_data, day_28])]
+
+
+class TestSmoothing(unittest.TestCase):
+
+    # Every method filters each curve as the underlying scipy filter does on its own
+    def test_filter_outputs(self):
+        models = osmo_models() + [OsmoModel(data={"O.": day_28["O."][:101] + 0.5,
+                                                  "EI": day_28["EI"][:101]},
+                                            metadata={}, name="Short")]
+        for method in SmoothingMethod:
+            config = SmoothingConfig(method=method, window=7, polyorder=2, lam=10.0)
+            smoothing.smooth_models(models, "EI", config)
+
+            for model in models:
+                if method == SmoothingMethod.SAVGOL:
+                    expected = savgol_filter(model.EI, 7, 2)
+                elif method == SmoothingMethod.MEDIAN:
+                    expected = median_filter(model.EI, size=7, mode="nearest")
+                else:
+                    expected = make_smoothing_spline(model.O, model.EI, lam=10.0)(model.O)
+                np.testing.assert_allclose(smoothing.get_smoothed(model, "EI", config),
+                                           expected, atol=1e-12, err_msg=method.value)
+
+    # Oxygenscans are smoothed against time, Osmoscans against O
+    def test_abscissa_from_model_type(self):
+        t = np.arange(50.0)
+        oxy = OxyModel(data={"t": t, "pO2": 100 - t, "EI": np.sin(t / 5)}, metadata={},
+                       name="Oxy")
+        osmo = osmo_models()[0]
+        self.assertIs(smoothing.abscissa(oxy), oxy.data["t"])
+        self.assertIs(smoothing.abscissa(osmo), osmo.data["O."])
+
+        config = SmoothingConfig(method=SmoothingMethod.SPLINE, lam=1.0)
+        np.testing.assert_allclose(smoothing.get_smoothed(oxy, "EI", config),
+                                   make_smoothing_spline(t, oxy.EI, lam=1.0)(t))
+
+    # Plugins with the same configuration share the smoothed channel computed once
+    def test_cache_shared_across_plugins(self):
+        models = osmo_models()
+        plugins = [OsmoExamplePlugin(ElementSink()) for _ in range(2)]
+        for plugin in plugins:
+            plugin.set_parameters(peak_smoothing_window=11)
+
+        with mock.patch("src.analysis.smoothing.smooth_curves",
+                        wraps=smoothing.smooth_curves) as smooth_curves:
+            for plugin in plugins:
+                plugin.prepare(models)
+                for model in models:
+                    plugin.run(model)
+        smooth_curves.assert_called_once()
+
+        for model in models:
+            self.assertEqual([key for key in model.cache if key[0] == "smoothed"],
+                             [("smoothed", "EI", plugins[0].smoothed_channels[0][1])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.models.osmo_model import OsmoModel
+from src.setup import day_56_data, day_56_metadata, day_28
+from src.utils.sparkline import SparklineCache, decimate_by_index, rasterize
+
+
+class TestSparkline(unittest.TestCase):
+
+    # Decimation keeps each bucket's extremes and the end points, in order
+    def test_decimate_by_index(self):
+        y = np.sin(np.linspace(0, 20, 10_000))
+        x = np.arange(len(y), dtype=float)
+        kept_x, kept_y = decimate_by_index(x, y, 50)
+
+        self.assertLessEqual(len(kept_x), 3 * 50 + 1)
+        self.assertTrue(np.all(np.diff(kept_x) > 0))
+        self.assertEqual((kept_x[0], kept_x[-1]), (0, len(y) - 1))
+        self.assertEqual((kept_y.min(), kept_y.max()), (y.min(), y.max()))
+
+    # Every column of a function's graph is drawn, and the image is connected
+    def test_rasterize(self):
+        x = np.linspace(0, 1, 100_000)
+        pixels = rasterize(x, x ** 2, width=40, height=10)
+
+        self.assertEqual(pixels.shape, (10, 40, 4))
+        drawn = pixels[:, :, 3] > 0
+        self.assertTrue(drawn.any(axis=0).all())
+        self.assertTrue(drawn[9, 0] and drawn[0, 39])  # Bottom left to top right
+
+    # Sparklines are cached by curve, not by model identity
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as folder:
+            cache = SparklineCache(folder)
+            model = OsmoModel(data=day_56_data, metadata=day_56_metadata, name="day_56")
+            copy = OsmoModel(data=day_56_data, metadata=day_56_metadata, name="copy")
+            other = OsmoModel(data=day_28, metadata=day_56_metadata, name="day_28")
+
+            self.assertIsNone(cache.cached(model))
+            path = cache.render(model)
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(cache.cached(copy), path)
+            self.assertIsNone(cache.cached(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
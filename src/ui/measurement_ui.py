@@ -1,15 +1,21 @@
+import functools
 import logging
 
-
+from PySide6.QtCore import QSize, QThreadPool
 from PySide6.QtGui import QIcon, Qt
 from PySide6.QtWidgets import QWidget, QFrame, QHBoxLayout, QStackedLayout, QVBoxLayout, \
-    QPushButton, QToolButton, QLabel, QTreeView, QDialog, QMessageBox, QTreeWidgetItem
+    QPushButton, QToolButton, QLabel, QTreeView, QDialog, QMessageBox, QTreeWidgetItem, \
+    QProgressDialog
 from matplotlib.backends.backend_qt import NavigationToolbar2QT
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 
 from src.ui.widgets.drag_drop_widget import DragDropWidget
 from src.ui.widgets.export_dialog import ExportDialog
 from src.ui.widgets.measurement_tree_widget import MeasurementTreeWidget
+from src.ui.refresh_scheduler import RefreshScheduler
+from src.controllers.report_export import ReportOptions
+from src.ui.workers import Worker
+from src.utils.sparkline import SPARKLINE_HEIGHT, SPARKLINE_WIDTH
 from src.utils.file_reader_helper import FileHelper
 
 logger = logging.getLogger(__name__)
@@ -35,8 +41,14 @@ class MeasurementUI(QWidget):
         self.right_layout = None
         self.canvas = None
         self.export_button = None
+        self.report_button = None
+        self.report_progress = None  # Progress dialog of the running report export
         self.toolbar = None
         self.tree = None
+        self.export_worker = None  # Export running in the background, if any
+        self.refresh_scheduler = RefreshScheduler(self.apply_selection_delta,
+                                                  self.update_canvas, self)
+        self.sparkline_workers = {}  # Model ID -> worker rendering its preview, None if failed
 
     def setup_main_layout(self):
         horizontal_layout = QHBoxLayout()
@@ -52,6 +64,10 @@ class MeasurementUI(QWidget):
         # Create a navigation toolbar for interactivity (zoom, pan, etc.)
         self.toolbar = NavigationToolbar2QT(self.canvas, self)
 
+        # Hover readout and click-to-select, both served by the plot's pick index
+        self.canvas.mpl_connect("motion_notify_event", self.on_canvas_hover)
+        self.canvas.mpl_connect("button_press_event", self.on_canvas_click)
+
         # Add the toolbar and canvas to the layout
         self.left_layout.addWidget(self.toolbar)
         self.left_layout.addWidget(self.canvas)
@@ -64,6 +80,12 @@ class MeasurementUI(QWidget):
         self.export_button.clicked.connect(self.open_export_dialog)
         export_layout.addWidget(self.export_button)
 
+        self.report_button = QPushButton("Export Report", self)
+        self.report_button.setToolTip("Export a page per selected measurement, drawn by the "
+                                      "selected plugins, into a folder in 'results'.")
+        self.report_button.clicked.connect(self.open_report_dialog)
+        export_layout.addWidget(self.report_button)
+
         export_help_button = QToolButton(self)
         export_help_button.setIcon(QIcon.fromTheme("help-about"))  # Standard "info" icon
         export_help_button.setToolTip(
@@ -105,6 +127,9 @@ class MeasurementUI(QWidget):
         self.tree.setHeaderHidden(True)  # Hide the header for simplicity
         self.tree.setSelectionMode(QTreeView.SelectionMode.MultiSelection)
         self.tree.setHeaderLabel("Measurement")
+        self.tree.setIconSize(QSize(SPARKLINE_WIDTH, SPARKLINE_HEIGHT))
+        # Previews are only loaded for rows scrolled into view
+        self.tree.verticalScrollBar().valueChanged.connect(self.load_visible_sparklines)
 
         self.right_layout.addWidget(self.tree)
 
@@ -145,8 +170,50 @@ class MeasurementUI(QWidget):
         width, height = self.canvas.size().width(), self.canvas.size().height()
         self.canvas.figure.set_size_inches(width / 100, height / 100)  # Set figure size in inches
 
-        # Enable export button if there is any plot data
-        self.export_button.setEnabled(any(ax.has_data() for ax in self.canvas.figure.axes))
+        self.update_export_button()
+        self.canvas.draw_idle()
+
+    def request_canvas_update(self):
+        """Schedule a full canvas update; requests within one frame are coalesced."""
+        self.refresh_scheduler.request_full_refresh()
+
+    def apply_selection_delta(self, delta):
+        """Show and hide only the elements toggled since the last refresh."""
+        self.canvas.figure = self.controller.update_selection(delta.added, delta.removed)
+        self.update_export_button()
+        self.canvas.draw_idle()
+
+    def on_canvas_hover(self, event):
+        if self.toolbar.mode:  # Leave the canvas alone while zooming or panning
+            return
+        if self.controller.update_hover(event.x, event.y, event.inaxes is not None):
+            self.canvas.draw_idle()
+
+    def on_canvas_click(self, event):
+        """Select the element under the cursor, and its measurement, in the tree."""
+        if event.button != 1 or self.toolbar.mode or event.inaxes is None:
+            return
+        picked = self.controller.pick_element(event.x, event.y)
+        if picked is None:
+            return
+        model_id, element_id = picked
+        model_item = self.find_item_by_model_id(model_id)
+        if model_item is None:
+            return
+        selected_item = model_item
+        for i in range(model_item.childCount()):
+            if model_item.child(i).data(0, Qt.ItemDataRole.UserRole) == element_id:
+                selected_item = model_item.child(i)
+                break
+        model_item.setExpanded(True)
+        self.tree.setCurrentItem(selected_item)
+        self.tree.scrollToItem(selected_item)
+
+    def update_export_button(self):
+        # Enable export button if any element is shown; hidden artists still count as data
+        self.export_button.setEnabled(self.export_worker is None
+                                      and self.controller.has_visible_elements())
+        self.report_button.setEnabled(self.export_worker is None)
 
     def update_measurement_tree_widget(self):
         """
@@ -162,6 +229,11 @@ class MeasurementUI(QWidget):
         # Track the selected state before the update
         selected_elements_before_update = self._track_selected_elements()
 
+        # Failed previews are retried once per update; only running renders stay tracked
+        self.sparkline_workers = {model_id: worker
+                                  for model_id, worker in self.sparkline_workers.items()
+                                  if worker is not None}
+
         # Fetch all models with their selection state from the controller
         all_models_with_selection = self.controller.get_all_measurements_with_selection()
 
@@ -178,10 +250,43 @@ class MeasurementUI(QWidget):
             self._restore_element_selection(model_item, model.id, selected_elements_before_update)
 
         # Refresh the canvas with the selected elements
-        self.update_canvas()
+        self.request_canvas_update()
 
         # Reconnect the itemChanged signal after updating the tree
         self.tree.itemChanged.connect(self.on_item_changed)
+        self.load_visible_sparklines()
+
+    def load_visible_sparklines(self):
+        """Show the curve previews of the visible measurement rows, rendering missing ones."""
+        viewport = self.tree.viewport().rect()
+        for i in range(self.tree.topLevelItemCount()):
+            item = self.tree.topLevelItem(i)
+            model_id = item.data(0, Qt.ItemDataRole.UserRole)
+            if not item.icon(0).isNull() or model_id in self.sparkline_workers:
+                continue
+            if not self.tree.visualItemRect(item).intersects(viewport):
+                continue
+
+            path = self.controller.get_cached_sparkline(model_id)
+            if path is not None:
+                item.setIcon(0, QIcon(path))
+                continue
+            # Bound slots of the widget run in the GUI thread; the job returns the model ID
+            worker = Worker(self.controller.create_sparkline_job(model_id))
+            worker.signals.finished.connect(self.on_sparkline_finished)
+            self.sparkline_workers[model_id] = worker
+            QThreadPool.globalInstance().start(worker)
+
+    def on_sparkline_finished(self, result):
+        model_id, path = result
+        if path is None:
+            # Keeps the row from being retried on scroll, until the next tree update
+            self.sparkline_workers[model_id] = None
+            return
+        self.sparkline_workers.pop(model_id, None)
+        item = self.find_item_by_model_id(model_id)
+        if item is not None:
+            item.setIcon(0, QIcon(path))
 
     def _track_selected_elements(self):
         """Return selected elements in the tree."""
@@ -267,9 +372,11 @@ class MeasurementUI(QWidget):
             else:
                 # Remove child elements when the model is deselected
                 item.takeChildren()
-
-        # Update canvas after selection change
-        self.update_canvas()
+            self.request_canvas_update()
+        else:  # It's an element item, only its own visibility changes
+            element_id = item.data(0, Qt.ItemDataRole.UserRole)
+            self.refresh_scheduler.element_toggled(
+                element_id, item.checkState(0) == Qt.CheckState.Checked)
 
         # Reconnect the signal after handling the item change
         self.tree.itemChanged.connect(self.on_item_changed)
@@ -300,24 +407,91 @@ class MeasurementUI(QWidget):
                 filename = settings.get("filename", "")
                 if filename:
                     try:
-                        self.controller.save_plot(
+                        job = self.controller.create_export_job(
                             filename, settings["width"], settings["height"],
                             settings["dpi"], settings["x_label"],
-                            settings["y_label"], settings["title"], settings["grid"]
+                            settings["y_label"], settings["title"], settings["grid"],
+                            settings["format"]
                         )
-                        QMessageBox.information(self, "Export Successful",
-                                                f"Plot saved as {filename}")
-                        dialog.accept()
-                        break
                     except Exception as e:
-                        logger.error(f"Failed to save plot: {e}")
+                        logger.error(f"Failed to prepare the plot export: {e}")
                         QMessageBox.critical(self, "Export Error",
                                              f"An error occurred while saving the plot: {e}")
+                        continue
+                    self.start_export(job)
+                    dialog.accept()
+                    break
                 else:
                     QMessageBox.warning(self, "Filename is missing", "Please name your file")
             else:
                 break
 
+    def open_report_dialog(self):
+        x_label, y_label, _ = self.get_figure_labels()
+        dialog = ExportDialog(self, x_label, y_label, "Report", report=True)
+
+        while dialog.exec() == QDialog.DialogCode.Accepted:
+            settings = dialog.get_settings()
+            if settings is None:
+                logger.warning("Report settings validation failed. Dialog remains open.")
+                continue
+            if not settings["filename"]:
+                QMessageBox.warning(self, "Report name is missing", "Please name your report")
+                continue
+            options = ReportOptions(formats=(settings["format"],),
+                                    combined_pdf=settings["combined_pdf"],
+                                    width=settings["width"], height=settings["height"],
+                                    dpi=settings["dpi"], x_label=settings["x_label"],
+                                    y_label=settings["y_label"], grid=settings["grid"])
+
+            self.report_progress = QProgressDialog("Exporting report pages...", None, 0, 0, self)
+            self.report_progress.setWindowTitle("Export Report")
+            self.report_progress.setWindowModality(Qt.WindowModality.WindowModal)
+            self.report_progress.setMinimumDuration(0)
+            self.start_export(functools.partial(self.controller.export_report,
+                                                settings["filename"], options),
+                              self.on_report_finished, self.on_report_progress)
+            break
+
+    def start_export(self, job, on_finished=None, on_progress=None):
+        """Render and save the plot in the background, so large exports keep the UI responsive."""
+        self.export_worker = Worker(job, report_progress=on_progress is not None)
+        self.export_worker.signals.finished.connect(on_finished or self.on_export_finished)
+        self.export_worker.signals.failed.connect(self.on_export_failed)
+        if on_progress is not None:
+            self.export_worker.signals.progress.connect(on_progress)
+        self.export_button.setEnabled(False)
+        self.report_button.setEnabled(False)
+        QThreadPool.globalInstance().start(self.export_worker)
+
+    def on_report_progress(self, done, total):
+        if self.report_progress is not None:
+            self.report_progress.setMaximum(total)
+            self.report_progress.setValue(done)
+
+    def close_report_progress(self):
+        if self.report_progress is not None:
+            self.report_progress.close()
+            self.report_progress = None
+
+    def on_report_finished(self, folder):
+        self.export_worker = None
+        self.close_report_progress()
+        self.update_export_button()
+        QMessageBox.information(self, "Export Successful", f"Report saved in {folder}")
+
+    def on_export_finished(self, filepath):
+        self.export_worker = None
+        self.update_export_button()
+        QMessageBox.information(self, "Export Successful", f"Plot saved as {filepath}")
+
+    def on_export_failed(self, message):
+        self.export_worker = None
+        self.close_report_progress()
+        self.update_export_button()
+        QMessageBox.critical(self, "Export Error",
+                             f"An error occurred while saving the plot: {message}")
+
     def on_files_dropped(self, file_paths):
         """Handle files dropped onto the models list."""
         csv_files = FileHelper.collect_csv_files(file_paths)  # Collect valid CSV files
@@ -337,4 +511,5 @@ class MeasurementUI(QWidget):
 
     def cleanup(self):
         """Detach controller from the view."""
+        self.refresh_scheduler.timer.stop()
         self.controller = None
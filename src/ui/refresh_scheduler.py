@@ -0,0 +1,50 @@
+from PySide6.QtCore import QObject, QTimer
+
+from src.ui.selection_delta import SelectionDelta
+
+# Requests arriving within one frame are coalesced into a single refresh
+FRAME_INTERVAL_MS = 16
+
+
+class RefreshScheduler(QObject):
+    """
+    Coalesces canvas refresh requests into one refresh per frame interval.
+
+    Element toggles are kept as a selection delta, so the refresh only touches the
+    elements that changed. Anything else (tree rebuilds, settings changes) marks the
+    whole view dirty and the next refresh rebuilds the selection from the tree.
+    """
+
+    def __init__(self, apply_delta, refresh_all, parent=None):
+        super().__init__(parent)
+        self.apply_delta = apply_delta  # Called with a SelectionDelta
+        self.refresh_all = refresh_all
+        self.delta = SelectionDelta()
+        self.dirty = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def element_toggled(self, element_id, checked: bool):
+        self.delta.toggle(element_id, checked)
+        self._schedule()
+
+    def request_full_refresh(self):
+        self.dirty = True
+        self._schedule()
+
+    def _schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Run the pending refresh now; a full refresh supersedes the delta."""
+        self.timer.stop()
+        delta, self.delta = self.delta, SelectionDelta()
+        if self.dirty:
+            self.dirty = False
+            self.refresh_all()
+        elif delta:
+            self.apply_delta(delta)
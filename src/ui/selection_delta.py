@@ -0,0 +1,17 @@
+class SelectionDelta:
+    """Element check state changes since the last refresh; opposite changes cancel out."""
+
+    def __init__(self):
+        self.added = set()
+        self.removed = set()
+
+    def toggle(self, element_id, checked: bool):
+        if checked:
+            self.removed.discard(element_id)
+            self.added.add(element_id)
+        else:
+            self.added.discard(element_id)
+            self.removed.add(element_id)
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
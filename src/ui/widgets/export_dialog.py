@@ -1,5 +1,7 @@
 from PySide6.QtWidgets import QDialog, QFormLayout, QLineEdit, QPushButton, QVBoxLayout, \
-    QMessageBox, QCheckBox
+    QMessageBox, QCheckBox, QComboBox
+
+from src.utils.plot_export_helper import CANVASES
 
 DEFAULT_WIDTH = 1920
 DEFAULT_HEIGHT = 1080
@@ -11,14 +13,20 @@ DEFAULT_TITLE = "Plot"
 
 class ExportDialog(QDialog):
     def __init__(self, parent=None, x_label=DEFAULT_X_LABEL, y_label=DEFAULT_Y_LABEL,
-                 title=DEFAULT_TITLE):
+                 title=DEFAULT_TITLE, report=False):
+        """
+        Settings of a plot export, or with report=True of a batch report export, which
+        writes a page per selected measurement into a folder.
+        """
         super().__init__(parent)
-        self.setWindowTitle("Export Plot Settings")
+        self.report = report
+        self.setWindowTitle("Export Report Settings" if report else "Export Plot Settings")
         self.layout = QFormLayout(self)
 
         # Add form fields for export settings
         self.filename_input = QLineEdit(title, self)  # Set to title as default value
-        self.layout.addRow("Filename (required):", self.filename_input)
+        self.layout.addRow("Report folder (required):" if report else "Filename (required):",
+                           self.filename_input)
 
         self.width_input = QLineEdit(str(DEFAULT_WIDTH), self)
         self.layout.addRow("Width (pixels):", self.width_input)
@@ -36,8 +44,18 @@ class ExportDialog(QDialog):
         self.y_label_input = QLineEdit(y_label, self)
         self.layout.addRow("Y Label:", self.y_label_input)
 
+        # Report pages are titled with their measurement names
         self.title_input = QLineEdit(title, self)
-        self.layout.addRow("Title:", self.title_input)
+        if not report:
+            self.layout.addRow("Title:", self.title_input)
+
+        self.format_input = QComboBox(self)
+        self.format_input.addItems(list(CANVASES))  # PNG first, as the default
+        self.layout.addRow("Format:", self.format_input)
+
+        self.combined_pdf_checkbox = QCheckBox("Also combine all pages into one PDF", self)
+        if report:
+            self.layout.addRow(self.combined_pdf_checkbox)
 
         # Grid checkbox (default: checked)
         self.grid_checkbox = QCheckBox("Enable Grid", self)
@@ -85,5 +103,7 @@ class ExportDialog(QDialog):
             "x_label": x_label,
             "y_label": y_label,
             "title": title,
-            "grid": grid_enabled
+            "grid": grid_enabled,
+            "format": self.format_input.currentText(),
+            "combined_pdf": self.report and self.combined_pdf_checkbox.isChecked()
         }
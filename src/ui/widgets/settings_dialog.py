@@ -2,7 +2,8 @@ from functools import partial
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget,
-    QStackedWidget, QFrame, QSizePolicy, QSpacerItem, QListWidgetItem, QLabel, QWidget
+    QStackedWidget, QFrame, QSizePolicy, QSpacerItem, QListWidgetItem, QLabel, QWidget,
+    QMessageBox
 )
 from PySide6.QtCore import Qt
 
@@ -69,6 +70,13 @@ class ViewSettingsDialog(QDialog):
         self.hc_models_list = QListWidget(self.hc_widget)
         self.hc_layout.addWidget(self.hc_models_list)
 
+        # Deselects HC members that stand out from the rest of their batch
+        self.exclude_outliers_button = QPushButton("Exclude Outliers", self.hc_widget)
+        self.exclude_outliers_button.setToolTip(
+            "Deselect measurements that differ strongly from the rest of their HC batch.")
+        self.exclude_outliers_button.clicked.connect(self.exclude_outliers)
+        self.hc_layout.addWidget(self.exclude_outliers_button)
+
         # "Update Canvas" button
         self.update_canvas_button = QPushButton("Update Canvas", self.hc_widget)
         self.update_canvas_button.clicked.connect(self.update_canvas)
@@ -171,6 +179,13 @@ class ViewSettingsDialog(QDialog):
         selected = item.checkState() == Qt.CheckState.Checked
         self.controller.update_plugin_selection(plugin_id, selected, is_batch)
 
+    def exclude_outliers(self):
+        """Handle the Exclude Outliers button click."""
+        reports = self.controller.exclude_hc_outliers()
+        excluded = sum(len(report.outlier_ids) for report in reports.values())
+        QMessageBox.information(self, "Outlier Screening",
+                                f"Excluded {excluded} outlier(s) from {len(reports)} HC batch(es).")
+
     def update_canvas(self):
         """Handle the Update Canvas button click."""
         # Logic to update the canvas goes here
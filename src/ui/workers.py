@@ -0,0 +1,38 @@
+import logging
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSignals(QObject):
+    """Signals of a Worker; they are delivered in the thread the worker was created in."""
+    finished = Signal(object)  # Return value of the function
+    failed = Signal(str)  # Error message
+    progress = Signal(int, int)  # (steps done, total), for functions reporting progress
+
+
+class Worker(QRunnable):
+    """Runs a function on a QThreadPool and reports its result or error through signals."""
+
+    def __init__(self, function, *args, report_progress=False, **kwargs):
+        """
+        With report_progress, the function is called with a `progress(done, total)`
+        keyword argument that emits the progress signal.
+        """
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if report_progress:
+            self.kwargs["progress"] = self.signals.progress.emit
+
+    def run(self):
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            logger.error(f"Background task failed: {e}")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
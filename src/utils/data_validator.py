@@ -20,3 +20,9 @@ class DataValidator:
             return False
 
         return True
+
+    @staticmethod
+    def is_sorted(values: np.ndarray) -> bool:
+        """Check that values are finite and non-decreasing."""
+        values = np.asarray(values, dtype=float)
+        return bool(np.all(np.isfinite(values)) and np.all(np.diff(values) >= 0))
@@ -0,0 +1,125 @@
+from typing import Optional
+
+import numpy as np
+
+from src.utils.data_validator import DataValidator
+from src.utils.sparkline import decimate_by_index
+
+# Curves shorter than this are always drawn at full resolution
+MIN_DECIMATION_POINTS = 5000
+
+
+class DecimationPyramid:
+    """
+    Multi-resolution min/max summaries of a curve with sorted x.
+
+    Level k splits the samples into buckets of 2**k and keeps the index of the minimum
+    and maximum y of every bucket; each level is built from the one below it. A view
+    is drawn from the coarsest level whose buckets still fit within one pixel, so every
+    pixel column keeps its extremes (and the line its envelope) while at most about
+    four points per pixel are drawn, whatever the zoom.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        # NaN never wins a bucket unless the whole bucket is NaN
+        low = np.where(np.isnan(self.y), np.inf, self.y)
+        high = np.where(np.isnan(self.y), -np.inf, self.y)
+
+        indices = np.arange(len(self.y))
+        self.levels = [(indices, indices)]  # Level 0: every sample is its own bucket
+        while len(self.levels[-1][0]) > 1:
+            min_idx, max_idx = self.levels[-1]
+            if len(min_idx) % 2:
+                min_idx, max_idx = np.append(min_idx, min_idx[-1]), np.append(max_idx, max_idx[-1])
+            min_pairs, max_pairs = min_idx.reshape(-1, 2), max_idx.reshape(-1, 2)
+            take_min = low[min_pairs[:, 1]] < low[min_pairs[:, 0]]
+            take_max = high[max_pairs[:, 1]] > high[max_pairs[:, 0]]
+            self.levels.append((min_pairs[np.arange(len(min_pairs)), take_min.astype(int)],
+                                max_pairs[np.arange(len(max_pairs)), take_max.astype(int)]))
+
+    def __len__(self):
+        return len(self.x)
+
+    def view(self, x_min: float, x_max: float, pixels: int) -> tuple[np.ndarray, np.ndarray]:
+        """The curve between x_min and x_max, reduced to about four points per pixel."""
+        # One extra sample on each side keeps the line running off the edges of the view
+        start = max(int(np.searchsorted(self.x, x_min, side="left")) - 1, 0)
+        stop = min(int(np.searchsorted(self.x, x_max, side="right")) + 1, len(self.x))
+        count = stop - start
+        pixels = max(int(pixels), 1)
+        if count <= 4 * pixels:
+            return self.x[start:stop], self.y[start:stop]
+
+        level = min(int(np.log2(count / pixels)), len(self.levels) - 1)
+        size = 1 << level
+        # Whole buckets come from the pyramid, the partial buckets at the edges from the samples
+        first, last = -(-start // size), stop // size
+        min_idx, max_idx = self.levels[level]
+        min_idx, max_idx = min_idx[first:last], max_idx[first:last]
+        buckets = np.column_stack([np.minimum(min_idx, max_idx), np.maximum(min_idx, max_idx)])
+        indices = np.concatenate([self._extremes(start, first * size), buckets.ravel(),
+                                  self._extremes(last * size, stop)])
+        # Keep the exact end points of the range
+        indices = np.concatenate([[start], indices, [stop - 1]])
+        indices = indices[np.concatenate([[True], np.diff(indices) != 0])]
+        return self.x[indices], self.y[indices]
+
+    def _extremes(self, start: int, stop: int) -> np.ndarray:
+        """Indices of the minimum and maximum y between two samples, in x order."""
+        if stop <= start:
+            return np.empty(0, dtype=int)
+        values = self.y[start:stop]
+        if np.all(np.isnan(values)):
+            return np.array([start])
+        low, high = start + np.nanargmin(values), start + np.nanargmax(values)
+        return np.array([min(low, high), max(low, high)])
+
+
+class IndexDecimation:
+    """
+    Min/max decimation in drawing order, for curves whose x is not sorted.
+
+    The samples inside the view are split into runs in drawing order, and each run
+    keeps its first, lowest and highest point, so the line keeps its envelope at about
+    three points per pixel. Samples outside the view are dropped, and the line is
+    broken with NaN where it leaves the view, so no segment bridges the gap.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+    def __len__(self):
+        return len(self.x)
+
+    def view(self, x_min: float, x_max: float, pixels: int) -> tuple[np.ndarray, np.ndarray]:
+        """The curve between x_min and x_max, reduced to about three points per pixel."""
+        inside = (self.x >= x_min) & (self.x <= x_max)
+        # One extra sample on each side of every visible run keeps the line running off the view
+        visible = inside.copy()
+        visible[:-1] |= inside[1:]
+        visible[1:] |= inside[:-1]
+        indices = np.flatnonzero(visible)
+        indices, _ = decimate_by_index(indices, self.y[indices], max(int(pixels), 1))
+
+        # Consecutive points from different visible runs are separated by a NaN point
+        hidden_before = np.cumsum(~visible)[indices]
+        breaks = np.flatnonzero(np.diff(hidden_before) != 0) + 1
+        return np.insert(self.x[indices], breaks, np.nan), np.insert(self.y[indices], breaks,
+                                                                     np.nan)
+
+
+def build_pyramid(x, y, min_points: int = MIN_DECIMATION_POINTS) \
+        -> Optional[DecimationPyramid | IndexDecimation]:
+    """
+    A decimation structure for curves long enough to benefit from one, else None.
+
+    Curves with sorted x get a DecimationPyramid, others an IndexDecimation.
+    """
+    if len(x) < min_points:
+        return None
+    if not DataValidator.is_sorted(x):
+        return IndexDecimation(x, y)
+    return DecimationPyramid(x, y)
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+from matplotlib import image
+
+from src.analysis.resampling import extract_curve
+
+SPARKLINE_WIDTH = 64
+SPARKLINE_HEIGHT = 20
+SPARKLINE_COLOR = (31, 119, 180, 255)  # RGBA, the first color of the default cycle
+POINTS_PER_COLUMN = 4  # Curves are decimated to about this many points per pixel column
+
+
+def decimate_by_index(x: np.ndarray, y: np.ndarray,
+                      buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the first, minimum and maximum y of each of `buckets` runs of samples, in order.
+
+    Works on curves in drawing order, so x does not need to be sorted.
+    """
+    if len(y) <= 3 * buckets:
+        return x, y
+    edges = np.linspace(0, len(y), buckets + 1).astype(int)[:-1]
+    filled = np.where(np.isnan(y), np.nanmean(y), y)
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.append(edges, len(y))))
+    order = np.lexsort((filled, bucket_of))  # Samples by bucket, then by y
+    counts = np.bincount(bucket_of, minlength=buckets)
+    starts = np.cumsum(counts) - counts
+    indices = np.unique(np.concatenate([edges, order[starts], order[starts + counts - 1],
+                                        [len(y) - 1]]))
+    return x[indices], y[indices]
+
+
+def rasterize(x: np.ndarray, y: np.ndarray, width: int = SPARKLINE_WIDTH,
+              height: int = SPARKLINE_HEIGHT, color=SPARKLINE_COLOR) -> np.ndarray:
+    """
+    Draw a polyline scaled to fit a (height, width) RGBA image with a transparent background.
+
+    Every segment is sampled at one point per pixel step along its longer axis, so all
+    segments are drawn in one vectorized pass.
+    """
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = np.asarray(x, dtype=float)[finite], np.asarray(y, dtype=float)[finite]
+    if not x.size:
+        return canvas
+
+    x, y = decimate_by_index(x, y, POINTS_PER_COLUMN * width)
+    columns = _scale(x, width)
+    rows = (height - 1) - _scale(y, height)  # Image rows grow downwards
+    if len(columns) == 1:
+        canvas[int(round(rows[0])), int(round(columns[0]))] = color
+        return canvas
+
+    steps = np.maximum(np.ceil(np.maximum(np.abs(np.diff(columns)), np.abs(np.diff(rows)))), 1)
+    steps = steps.astype(int)
+    segment = np.repeat(np.arange(len(steps)), steps)
+    fraction = (np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)) \
+        / np.repeat(steps, steps)
+    pixel_columns = columns[segment] + fraction * np.diff(columns)[segment]
+    pixel_rows = rows[segment] + fraction * np.diff(rows)[segment]
+    pixel_columns = np.append(pixel_columns, columns[-1])
+    pixel_rows = np.append(pixel_rows, rows[-1])
+
+    canvas[np.round(pixel_rows).astype(int), np.round(pixel_columns).astype(int)] = color
+    return canvas
+
+
+def _scale(values: np.ndarray, size: int) -> np.ndarray:
+    """Map values linearly onto [0, size - 1]; constant values map to the middle."""
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.full(len(values), (size - 1) / 2)
+    return (values - low) / (high - low) * (size - 1)
+
+
+def model_fingerprint(model, width: int = SPARKLINE_WIDTH,
+                      height: int = SPARKLINE_HEIGHT) -> str:
+    """
+    Hash of the model's curve and the sparkline size; equal curves share a sparkline.
+
+    Cached on the model, so looking up a sparkline does not hash the data again.
+    """
+    key = ("sparkline_fingerprint", width, height)
+    if key not in model.cache:
+        x, y = extract_curve(model)
+        digest = hashlib.sha1(type(model).__name__.encode())
+        digest.update(np.ascontiguousarray(x, dtype=float).tobytes())
+        digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+        digest.update(f"{width}x{height}".encode())
+        model.cache[key] = digest.hexdigest()
+    return model.cache[key]
+
+
+class SparklineCache:
+    """Sparkline PNG files in a cache folder, named by model fingerprint."""
+
+    def __init__(self, folder: str, width: int = SPARKLINE_WIDTH,
+                 height: int = SPARKLINE_HEIGHT):
+        self.folder = folder
+        self.width = width
+        self.height = height
+
+    def path(self, model) -> str:
+        fingerprint = model_fingerprint(model, self.width, self.height)
+        return os.path.join(self.folder, f"{fingerprint}.png")
+
+    def cached(self, model) -> Optional[str]:
+        """The sparkline file of the model if it was rendered before, else None."""
+        path = self.path(model)
+        return path if os.path.exists(path) else None
+
+    def render(self, model) -> str:
+        """Render the model's sparkline unless cached, and return its file path."""
+        path = self.path(model)
+        if not os.path.exists(path):
+            os.makedirs(self.folder, exist_ok=True)
+            pixels = rasterize(*extract_curve(model), self.width, self.height)
+            # Write under a temporary name first, so readers never see a partial file
+            partial = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+            image.imsave(partial, pixels, format="png")
+            os.replace(partial, path)
+        return path
@@ -1,10 +1,15 @@
+import functools
 import itertools
 import logging
 import os
 
-from matplotlib import pyplot as plt
-from src.models.plot_element import PlotElement
-from src.utils.plot_export_helper import save_plot_with_clone
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.figure import Figure
+
+from src.models.plot_element import PlotElement, bounds_limits, data_bounds
+from src.utils.plot_export_helper import ExportSnapshot, export_plot
+from src.views.pick_index import PICK_RADIUS_PIXELS, PickIndex, PickResult
 
 logger = logging.getLogger(__name__)
 
@@ -15,49 +20,130 @@ class PlotManager:
     def __init__(self):
         """Initialize an empty dictionary to store plot elements."""
         self.elements = {}  # Store plot elements by their unique ID
-        self.fig, self.ax = plt.subplots()  # Initialize the figure and axis for plotting
-        plt.ion()  # Enable interactive mode
+        # The figure is independent of pyplot; the view embeds it in its own canvas
+        self.fig = Figure()
+        self.ax = self.fig.add_subplot()
+        self.ax.grid(True)
+
+        # Retained-mode state: artists are created once per element and then only shown or hidden
+        self._artists = {}  # Element ID -> matplotlib artists, created on first display
+        self._colors = {}  # Element ID -> color, stable across updates
+        self._color_cycle = itertools.cycle(rcParams["axes.prop_cycle"].by_key()["color"])
+        self._displayed = {}  # Element IDs currently shown, in display order (dict as ordered set)
+        self._batch_ids = set()  # Batch elements are always shown
+
+        # Legend handles and data bounds of the shown elements, updated per shown or hidden
+        # element; the limits follow the data until the user zooms or pans
+        self._legend_handles = {}  # Element ID -> legend handle, in display order
+        self._legend_changed = False
+        self._bounds = None  # (x min, x max, y min, y max) of the shown data, None without data
+        self._bounds_stale = False  # A hidden element defined an edge of the bounds
+        self._auto_limits = None  # The limits last set from the data, None before the first
+
+        # Hover and click picking; the index is rebuilt lazily after the shown elements or
+        # the view change, as it holds the points drawn at one view
+        self._pick_index = None
+        self._hover = self.ax.annotate("", xy=(0, 0), xytext=(10, 10), textcoords="offset points",
+                                       bbox={"boxstyle": "round", "fc": "white", "alpha": 0.9},
+                                       visible=False, zorder=10)
+        self._hover_target = None  # (element ID, x, y) of the shown readout
+
+        # Element IDs by model and plugin ID, in insertion order (dicts as ordered sets)
+        self._ids_by_model = {}
+        self._ids_by_plugin = {}
+
+        # Long lines are drawn decimated to the view; zooming, panning or resizing the
+        # canvas re-decimates them
+        self._decimated = set()  # IDs of the rendered elements with decimated curves
+        self.ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        self.fig.canvas.mpl_connect("resize_event", self._on_resize)
 
     def get_figure(self):
         """Return the figure object for external manipulation."""
         return self.fig
 
     def add_element(self, element: PlotElement):
-        """Add a plot element to the manager."""
+        """
+        Add a plot element to the manager, replacing any element with the same ID.
+
+        A replaced element keeps its color; if it was shown, it is drawn again from the
+        new data on the next update.
+        """
         if not isinstance(element, PlotElement):
             raise TypeError(
                 "Only instances of PlotElement (or its subclasses) can be added."
             )
+        color = self._colors.get(element.id)
+        self._remove(element.id)
+        if color is not None:
+            self._colors[element.id] = color
+
         # Use the element's ID as the dictionary key
         self.elements[element.id] = element
+        self._ids_by_model.setdefault(element.model_id, {})[element.id] = None
+        self._ids_by_plugin.setdefault(element.plugin_id, {})[element.id] = None
+        if element.is_batch:
+            self._batch_ids.add(element.id)
 
     def remove_element_by_id(self, element_id):
-        """Remove a plot element by its ID."""
-        if element_id in self.elements:
-            del self.elements[element_id]
+        """Remove a plot element by its ID, together with its artists."""
+        if self._remove(element_id):
+            self._update_legend_and_limits()
 
     def get_elements_by_model_id(self, model_id):
-        elements_selection = [element for element in self.elements.values() if
-                              element.model_id == model_id]
-        return elements_selection
+        return [self.elements[element_id] for element_id in self._ids_by_model.get(model_id, {})]
 
     def remove_elements_by_model_id(self, model_id):
         """Remove all plot elements associated with a given model ID."""
-        elements_to_remove = [element_id for element_id, element in self.elements.items() if
-                              element.model_id == model_id]
-        logger.info(f"Elements to be removed: {elements_to_remove}")
-        for element_id in elements_to_remove:
-            self.remove_element_by_id(element_id)
-        logger.info(f"Remaining elements: {self.elements}")
+        self._remove_all(self._ids_by_model.get(model_id, {}))
 
     def remove_elements_by_plugin_id(self, plugin_id):
-        """Remove all plot elements associated with a given model ID."""
-        elements_to_remove = [element_id for element_id, element in self.elements.items() if
-                              element.plugin_id == plugin_id]
-        logger.info(f"Elements to be removed: {elements_to_remove}")
-        for element_id in elements_to_remove:
-            self.remove_element_by_id(element_id)
-        logger.info(f"Remaining elements: {self.elements}")
+        """Remove all plot elements associated with a given plugin ID."""
+        self._remove_all(self._ids_by_plugin.get(plugin_id, {}))
+
+    def retain_elements(self, plugin_id, model_id, element_ids):
+        """Remove the elements of a plugin on a model that are not among element_ids."""
+        plugin_ids = self._ids_by_plugin.get(plugin_id, {})
+        model_ids = self._ids_by_model.get(model_id, {})
+        smaller, larger = sorted((plugin_ids, model_ids), key=len)
+        self._remove_all([element_id for element_id in smaller
+                          if element_id in larger and element_id not in element_ids])
+
+    def _remove_all(self, element_ids):
+        """Remove several elements, updating the legend and limits once."""
+        element_ids = list(element_ids)
+        if not element_ids:
+            return
+        displayed = [self._remove(element_id) for element_id in element_ids]
+        logger.info(f"Removed {len(element_ids)} elements, {len(self.elements)} remaining.")
+        if any(displayed):
+            self._update_legend_and_limits()
+
+    def _remove(self, element_id) -> bool:
+        """Drop an element from the indexes and the axes; True if it was shown."""
+        element = self.elements.pop(element_id, None)
+        if element is None:
+            return False
+        self._discard_from_index(self._ids_by_model, element.model_id, element_id)
+        self._discard_from_index(self._ids_by_plugin, element.plugin_id, element_id)
+        self._batch_ids.discard(element_id)
+        self._colors.pop(element_id, None)
+        self._decimated.discard(element_id)
+        displayed = element_id in self._displayed
+        if displayed:
+            self._hide(element_id, element)
+            self._reset_picking()
+        for artist in self._artists.pop(element_id, []):
+            artist.remove()
+        return displayed
+
+    @staticmethod
+    def _discard_from_index(index, key, element_id):
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(element_id, None)
+            if not ids:
+                del index[key]
 
     def get_element_by_id(self, element_id):
         """Retrieve a plot element by its ID."""
@@ -68,58 +154,217 @@ class PlotManager:
         return self.elements
 
     def visualize_selected_elements(self, selected_element_ids):
-        """Visualize all selected elements."""
-        # Store the current state of the title, and labels
-        title = self.ax.get_title()
-        x_label = self.ax.get_xlabel()
-        y_label = self.ax.get_ylabel()
+        """
+        Show the selected elements and all batch elements, hiding every other element.
 
-        self.ax.clear()
+        Artists are kept per element, so only the elements whose visibility changes are
+        touched; an element is rendered the first time it is shown.
+        """
+        target = dict.fromkeys(element_id for element_id in selected_element_ids
+                               if element_id in self.elements)
+        target.update(dict.fromkeys(self._batch_ids))
 
-        # Get default color cycle
-        color_cycle = itertools.cycle(plt.rcParams["axes.prop_cycle"].by_key()["color"])
+        hidden = [element_id for element_id in self._displayed if element_id not in target]
+        shown = [element_id for element_id in target if element_id not in self._displayed]
+        for element_id in hidden:
+            self._hide(element_id, self.elements[element_id])
+        for element_id in shown:
+            self._display(element_id)
 
-        # Collect elements that should be rendered
-        elements_to_render = [self.get_element_by_id(eid) for eid in selected_element_ids if
-                              self.get_element_by_id(eid)]
+        if hidden or shown:
+            self._update_legend_and_limits()
 
-        # Always render HC elements
-        always_visible_elements = [element for element in self.elements.values() if
-                                   element.is_batch]
+    def update_selection(self, added, removed):
+        """
+        Show the added and hide the removed elements, leaving all others as they are.
 
-        # Store colors for elements
-        element_colors = {}
+        Batch elements stay shown; unknown IDs are ignored.
+        """
+        hidden = [element_id for element_id in removed
+                  if element_id in self._displayed and element_id not in self._batch_ids]
+        shown = [element_id for element_id in itertools.chain(added, self._batch_ids)
+                 if element_id in self.elements and element_id not in self._displayed]
+        for element_id in hidden:
+            self._hide(element_id, self.elements[element_id])
+        for element_id in dict.fromkeys(shown):
+            self._display(element_id)
 
-        # Render all elements with assigned colors
-        for element in elements_to_render + always_visible_elements:
-            if element not in element_colors:
-                element_colors[element] = next(color_cycle)  # Assign unique color
+        if hidden or shown:
+            self._update_legend_and_limits()
 
-            element.render(self.ax, color=element_colors[element])  # Pass color to render
+    def has_visible_elements(self) -> bool:
+        return bool(self._displayed)
 
-        # Reapply the title, labels, and grid state
-        self.ax.set_title(title)
-        self.ax.set_xlabel(x_label)
-        self.ax.set_ylabel(y_label)
-        self.ax.grid(True)
+    def _display(self, element_id):
+        """Show an element and add it to the legend handles and the data bounds."""
+        self._show(element_id)
+        self._displayed[element_id] = None
+        artists = self._artists[element_id]
+        if artists and not artists[0].get_label().startswith("_"):
+            self._legend_handles[element_id] = artists[0]
+            self._legend_changed = True
 
-        # Add a legend only if there are any plot elements
-        if self.ax.has_data():
-            self.ax.legend()  # Add a legend for better readability
+        bounds = np.asarray(self.elements[element_id].bounds)
+        if self._bounds_stale or np.all(np.isnan(bounds)):
+            return
+        if self._bounds is None:
+            self._bounds = bounds.copy()
+        else:
+            self._bounds[[0, 2]] = np.fmin(self._bounds[[0, 2]], bounds[[0, 2]])
+            self._bounds[[1, 3]] = np.fmax(self._bounds[[1, 3]], bounds[[1, 3]])
 
-    def save_plot(self, filename, width, height, dpi, x_label, y_label, title, grid):
-        """Export the plot as an image with the specified parameters."""
-        try:
-            # Ensure the results folder exists
-            os.makedirs(RESULTS_FOLDER, exist_ok=True)
+    def _hide(self, element_id, element: PlotElement):
+        """Hide a shown element and drop it from the legend handles and the data bounds."""
+        self._set_visible(element_id, False)
+        del self._displayed[element_id]
+        if self._legend_handles.pop(element_id, None) is not None:
+            self._legend_changed = True
+        # Only an element on an edge shrinks the bounds; they are recomputed when needed
+        if self._bounds is not None and np.any(np.asarray(element.bounds) == self._bounds):
+            self._bounds_stale = True
+
+    def _show(self, element_id):
+        """Show an element, rendering it if it has no artists yet."""
+        if element_id in self._artists:
+            self._set_visible(element_id, True)
+        else:
+            if element_id not in self._colors:
+                self._colors[element_id] = next(self._color_cycle)  # Assign unique color
+            element = self.elements[element_id]
+            self._artists[element_id] = element.render(self.ax, color=self._colors[element_id])
+            if any(pyramid is not None for pyramid in element.decimation_pyramids()):
+                self._decimated.add(element_id)
+        self._decimate(element_id)
+
+    def _view(self) -> tuple[float, float, int]:
+        """(x min, x max, pixels) of the axes, as used to decimate the shown lines."""
+        x_min, x_max = sorted(self.ax.get_xlim())
+        return x_min, x_max, int(self.ax.bbox.width)
 
-            # Construct the file path to save the plot
-            filepath = os.path.join(RESULTS_FOLDER, filename + ".png")
+    def _decimate(self, element_id):
+        """Reduce the element's long lines to the points visible at the current view."""
+        if element_id in self._decimated:
+            self.elements[element_id].update_decimation(self._artists[element_id], self._view())
 
-            # Save the plot using the helper function
-            save_plot_with_clone(self.fig, filename=filepath, width=width, height=height, dpi=dpi,
-                                 x_label=x_label, y_label=y_label, title=title, grid=grid)
+    def _redecimate(self):
+        for element_id in self._decimated.intersection(self._displayed):
+            self._decimate(element_id)
 
+    def _on_xlim_changed(self, ax):
+        """Re-decimate the shown lines after a zoom, pan or limit update."""
+        self._redecimate()
+
+    def _on_resize(self, event):
+        """Re-decimate the shown lines to the new width of the axes."""
+        self._redecimate()
+
+    def _set_visible(self, element_id, visible: bool):
+        for artist in self._artists.get(element_id, []):
+            artist.set_visible(visible)
+
+    def _update_legend_and_limits(self):
+        """
+        Update the legend from the shown elements and fit the limits to their data.
+
+        The limits are left alone once the user zoomed or panned, until nothing is shown.
+        """
+        self._reset_picking()  # Called whenever the shown elements change
+        if self._legend_changed:
+            self._legend_changed = False
+            legend = self.ax.get_legend()
+            if self._legend_handles:
+                # Add a legend for better readability
+                self.ax.legend(handles=list(self._legend_handles.values()))
+            elif legend is not None:
+                legend.remove()
+
+        if not self._displayed:
+            self._bounds, self._bounds_stale, self._auto_limits = None, False, None
+            return
+        if self._user_view():
+            return
+        if self._bounds_stale:
+            self._bounds = data_bounds(self.elements[element_id] for element_id in self._displayed)
+            self._bounds_stale = False
+        if self._bounds is not None:
+            x_limits, y_limits = bounds_limits(self._bounds)
+            self.ax.set_xlim(x_limits)
+            self.ax.set_ylim(y_limits)
+            self._auto_limits = (self.ax.get_xlim(), self.ax.get_ylim())
+
+    def _user_view(self) -> bool:
+        """Whether the limits changed since they were last fitted to the data."""
+        return self._auto_limits is not None \
+            and (self.ax.get_xlim(), self.ax.get_ylim()) != self._auto_limits
+
+    def pick(self, x_pixel, y_pixel, radius=PICK_RADIUS_PIXELS) -> PickResult | None:
+        """The point of a shown element nearest to a position in display pixels, if close."""
+        if not self._displayed:
+            return None
+        view = self._view()
+        if self._pick_index is None or self._pick_index.view != view:
+            self._pick_index = PickIndex((self.elements[element_id]
+                                          for element_id in self._displayed), view)
+        x, y = self.ax.transData.inverted().transform((x_pixel, y_pixel))
+        (x_min, x_max), (y_min, y_max) = self.ax.get_xlim(), self.ax.get_ylim()
+        return self._pick_index.nearest(x, y, self.ax.bbox.width / abs(x_max - x_min),
+                                        self.ax.bbox.height / abs(y_max - y_min), radius)
+
+    def _reset_picking(self):
+        """Drop the pick index and the hover readout, e.g. after the shown elements changed."""
+        self._pick_index = None
+        self._hover_target = None
+        self._hover.set_visible(False)
+
+    def update_hover(self, x_pixel, y_pixel, inside_axes=True) -> bool:
+        """
+        Point the hover readout at the element point under the cursor, or hide it.
+
+        Returns:
+            True if the readout changed and the canvas needs a redraw.
+        """
+        result = self.pick(x_pixel, y_pixel) if inside_axes else None
+        target = (result.element_id, result.x, result.y) if result else None
+        if target == self._hover_target:
+            return False
+
+        self._hover_target = target
+        self._hover.set_visible(result is not None)
+        if result is not None:
+            element = self.elements[result.element_id]
+            self._hover.xy = (result.x, result.y)
+            self._hover.set_text(f"{element.label} - {element.model_name}\n"
+                                 f"x = {result.x:.4g}, y = {result.y:.4g}")
+        return True
+
+    def export_job(self, filename, width, height, dpi, x_label, y_label, title, grid,
+                   file_format="png"):
+        """
+        Prepare an export of the shown elements as a callable returning the file path.
+
+        The shown elements, their colors and the axis limits are captured now; the job
+        renders them offscreen, so it can run in a background thread while the plot changes.
+        """
+        # Ensure the results folder exists
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+
+        # Construct the file path to save the plot
+        filepath = os.path.join(RESULTS_FOLDER, f"{filename}.{file_format}")
+
+        snapshot = ExportSnapshot(
+            elements=[(self.elements[element_id], self._colors.get(element_id))
+                      for element_id in self._displayed],
+            x_limits=tuple(self.ax.get_xlim()), y_limits=tuple(self.ax.get_ylim()))
+        return functools.partial(export_plot, snapshot, filepath, width=width, height=height,
+                                 dpi=dpi, x_label=x_label, y_label=y_label, title=title,
+                                 grid=grid, file_format=file_format)
+
+    def save_plot(self, filename, width, height, dpi, x_label, y_label, title, grid,
+                  file_format="png"):
+        """Export the plot as an image with the specified parameters."""
+        try:
+            filepath = self.export_job(filename, width, height, dpi, x_label, y_label, title,
+                                       grid, file_format)()
             logger.info(f"Plot saved successfully as {filepath}")
         except Exception as e:
             logger.error(f"Failed to save plot: {e}")